@@ -6,28 +6,32 @@ Lightweight & fast (< 100 MB)
 """
 
 import streamlit as st
-import requests
-import pandas as pd
 from datetime import datetime
 import io
-from urllib.parse import quote
 import os
+import functools
+import hashlib
+import secrets
+import time
+from datetime import timedelta
 
-# Import du module culturel (inchangé)
-from cultural_context import CulturalContextEngine
+# Cœur headless (sans Streamlit) : pipeline, quotas, cache, moteur culturel, historique
+from speakeasy.batch_translate import (BatchJob, INPUT_FORMATS, OUTPUT_FORMATS, describe_estimate, detect_format,
+                                        read_segments)
+from speakeasy.core import SpeakEasy
+from speakeasy.history_export import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_history
+from speakeasy.history_store import ConversationHistory, format_timestamp
+from speakeasy.metrics import METRICS, start_metrics_server
+from speakeasy.mymemory_client import MyMemoryQuotaError
+from speakeasy.resilience import CLOSED
+from speakeasy.session_store import SessionStore
 
 # OpenAI API Configuration (optional - graceful fallback if not available)
 try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
     # Try to get API key from Streamlit secrets or environment
     openai_api_key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY", ""))
-    if openai_api_key:
-        client = OpenAI(api_key=openai_api_key)
-    else:
-        OPENAI_AVAILABLE = False
-except (ImportError, Exception):
-    OPENAI_AVAILABLE = False
+except Exception:
+    openai_api_key = os.getenv("OPENAI_API_KEY", "")
 
 # Configuration de la page
 st.set_page_config(
@@ -470,14 +474,91 @@ st.markdown("""
     section[data-testid="stSidebar"] .stSelectbox [role="button"] span {
         color: #0f172a !important;
     }
+    
+    /* Badge de durée des reruns (?timings=1) */
+    .rerun-timing {
+        display: inline-block;
+        font-size: 0.7rem;
+        font-weight: 600;
+        color: #64748b;
+        background: rgba(148, 163, 184, 0.15);
+        border-radius: 8px;
+        padding: 2px 8px;
+        font-family: ui-monospace, monospace;
+    }
 </style>
 """, unsafe_allow_html=True)
 
+# Historique : entrées gardées en mémoire par session et taille des pages affichées
+HISTORY_MAX_ENTRIES = 1000
+HISTORY_PAGE_SIZE = 20
+# Intervalle de rafraîchissement du fragment historique (nouvelles traductions sans réexécuter la page)
+HISTORY_REFRESH_SECONDS = 2
+
+# Reprise de l'historique par lien (?resume=<jeton>) : désactivée par défaut, car une URL se partage
+HISTORY_RESUME_LINKS = os.getenv("SPEAKEASY_HISTORY_RESUME_LINKS") == "1"
+
 # Initialisation du state
-if 'cultural_engine' not in st.session_state:
-    st.session_state.cultural_engine = CulturalContextEngine()
-if 'conversation_history' not in st.session_state:
-    st.session_state.conversation_history = []
+# L'identifiant d'historique reste dans la session Streamlit, pas dans l'URL (sauf reprise activée)
+if 'history_session_id' not in st.session_state:
+    token = st.query_params.get("resume", "") if HISTORY_RESUME_LINKS else ""
+    # Seuls les jetons imprévisibles générés ici (token_urlsafe(32), 43 caractères) sont repris
+    if len(token) != 43 or not all(c.isalnum() or c in "-_" for c in token):
+        token = secrets.token_urlsafe(32)
+    st.session_state.history_session_id = token
+    if HISTORY_RESUME_LINKS:
+        st.query_params["resume"] = token
+# Les anciens liens ?sid= exposaient l'historique : le paramètre est ignoré et retiré
+if "sid" in st.query_params:
+    del st.query_params["sid"]
+
+# Dossier des fichiers de jobs batch (entrées, résultats, checkpoints)
+BATCH_DIR = os.path.join(".speakeasy", "batch")
+# Dossier des exports d'historique
+EXPORT_DIR = os.path.join(".speakeasy", "exports")
+
+@st.cache_resource
+def get_speakeasy():
+    """Traducteur headless partagé par toutes les sessions (quotas, cache, circuit breakers)"""
+    return SpeakEasy(openai_api_key=openai_api_key)
+
+def get_history_store():
+    """Historique SQLite partagé (None si désactivé ou indisponible)"""
+    return get_speakeasy().history_store
+
+@st.cache_resource
+def get_session_store():
+    """États de session sous budget mémoire (sessions inactives déchargées sur disque)"""
+    return SessionStore()
+
+def get_session_state():
+    """État lourd de la session (dernière traduction, historique de secours), rechargé à la demande"""
+    return get_session_store().session(st.session_state.history_session_id)
+
+def get_session_history():
+    """Historique de la session : SQLite durable, ou en mémoire à défaut"""
+    history = get_speakeasy().history(st.session_state.history_session_id)
+    if history is not None:
+        return history
+    state = get_session_state()
+    history = state.get("conversation_history")
+    if history is None:
+        # Bornée aussi en texte pour tenir dans le budget mémoire de la session
+        history = state["conversation_history"] = ConversationHistory(
+            max_entries=HISTORY_MAX_ENTRIES, max_text_chars=get_session_store().budget_bytes // 8)
+    return history
+
+def get_cultural_engine():
+    """Moteur culturel immuable, chargé une seule fois par processus"""
+    return get_speakeasy().cultural_engine
+
+def get_translation_cache():
+    """Cache de traductions partagé entre toutes les sessions"""
+    return get_speakeasy().cache
+
+def get_translation_memory():
+    """Mémoire de traduction floue alimentée par toutes les traductions"""
+    return get_speakeasy().memory
 
 # Mapping des codes de langue
 LANGUAGE_NAMES = {
@@ -505,113 +586,483 @@ CONVERSATION_MODES = {
     "Academic Discussion": "academic"
 }
 
-def enhance_translation_with_ai(text, translation, src_lang, dest_lang, mode):
-    """Améliorer la traduction avec OpenAI GPT-4 (si disponible)"""
-    if not OPENAI_AVAILABLE or not openai_api_key:
-        return translation
+def get_rate_limiter():
+    """Quotas MyMemory / OpenAI partagés (l'interface passe avant les jobs batch)"""
+    return get_speakeasy().limiter
+
+def get_ai_enhancer():
+    """Amélioration OpenAI GPT partagée (si disponible)"""
+    return get_speakeasy().enhancer
+
+OPENAI_AVAILABLE = get_speakeasy().ai_available
+
+def get_mymemory_client():
+    """Client MyMemory partagé (pool de connexions, timeouts, retries, circuit breaker)"""
+    return get_speakeasy().client
+
+def get_translation_pipeline():
+    """Pipeline concurrent partagé (MyMemory, amélioration et insight IA en parallèle)"""
+    return get_speakeasy().pipeline
+
+@st.cache_resource
+def get_metrics_server():
+    """Endpoint Prometheus /metrics (si SPEAKEASY_METRICS_PORT est défini)"""
+    port = os.getenv("SPEAKEASY_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(METRICS, int(port))
+    except (OSError, ValueError):
+        return None
+
+get_metrics_server()
+
+def show_admin_panel():
+    """Panneau admin caché (?admin=1) : percentiles des étapes et compteurs"""
+    with st.expander("Admin metrics", expanded=True):
+        percentiles = METRICS.percentiles()
+        if percentiles:
+            st.dataframe(
+                [{"stage": stage, "count": p["count"], "p50 ms": round(p["p50"], 1),
+                  "p95 ms": round(p["p95"], 1), "p99 ms": round(p["p99"], 1)}
+                 for stage, p in percentiles.items()],
+                hide_index=True, use_container_width=True
+            )
+        else:
+            st.caption("No requests yet")
+        renders = METRICS.percentiles("speakeasy_ui_render_seconds")
+        if renders:
+            st.dataframe(
+                [{"section": section, "runs": p["count"], "p50 ms": round(p["p50"], 1),
+                  "p95 ms": round(p["p95"], 1)} for section, p in renders.items()],
+                hide_index=True, use_container_width=True
+            )
+        # Empreinte mémoire des sessions (les plus lourdes d'abord)
+        sessions = get_session_store().stats()
+        st.caption(f"Sessions in memory: {sessions['sessions']}, {sessions['bytes'] / 1024:,.0f} KB "
+                   f"(budget {sessions['budget_bytes'] / 1024:,.0f} KB each), "
+                   f"{sessions['spilled_sessions']} idle sessions spilled")
+        footprints = get_session_store().footprints()[:10]
+        if footprints:
+            st.dataframe(
+                [{"session": f["session"][:8], "KB": round(f["bytes"] / 1024, 1), "values": f["values"],
+                  "spilled": f["spilled"], "idle s": f["idle_seconds"]} for f in footprints],
+                hide_index=True, use_container_width=True
+            )
+        for name, value in METRICS.counters().items():
+            st.caption(f"{name}: {value:g}")
+        st.download_button("Prometheus metrics", data=METRICS.render_prometheus(),
+                           file_name="speakeasy_metrics.txt", mime="text/plain")
+
+def translate_text(text, src_lang, dest_lang, mode, on_partial=None):
+    """Traduire le texte avec MyMemory Translation API + AI Enhancement
     
+    on_partial (optionnel) reçoit la traduction de base dès qu'elle est prête,
+    puis l'amélioration IA au fil du streaming.
+    """
     try:
-        # Créer un prompt pour améliorer la traduction
-        prompt = f"""You are a professional translator. Improve this translation to be more natural and contextually appropriate.
-
-Original text ({src_lang}): {text}
-Current translation ({dest_lang}): {translation}
-Context: {mode}
-
-Provide ONLY the improved translation, nothing else. Keep it concise and natural."""
-
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Plus économique que GPT-4
-            messages=[
-                {"role": "system", "content": "You are a professional translator. Respond only with the improved translation."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3
+        # MyMemory, amélioration IA et insight IA en parallèle, puis contexte culturel et historique
+        result = get_speakeasy().translate(
+            text, src_lang, dest_lang, mode,
+            history=get_session_history(),
+            ai_enabled=OPENAI_AVAILABLE,
+            on_partial=on_partial
         )
-        
-        improved = response.choices[0].message.content.strip()
-        return improved if improved else translation
+        return result["translation"], result["cultural_context"], result["memory_match"]
     
     except Exception as e:
-        # Fallback silencieux vers la traduction originale
-        return translation
+        return f"Erreur de traduction: {str(e)}", None, None
 
-def generate_ai_cultural_insight(text, src_lang, dest_lang, mode):
-    """Générer un insight culturel dynamique avec l'IA (si disponible)"""
-    if not OPENAI_AVAILABLE or not openai_api_key:
-        return None
+def run_batch_job(uploaded, src_lang, dest_lang, mode, output_format, concurrency, ai_enabled):
+    """Lancer (ou reprendre) un job batch sur un fichier uploadé"""
+    content = uploaded.getvalue()
+    file_format = detect_format(uploaded.name)
+    
+    # Le même fichier avec les mêmes paramètres (IA comprise) reprend depuis son checkpoint
+    job_id = hashlib.sha1(content).hexdigest()[:16]
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    input_path = os.path.join(BATCH_DIR, f"{job_id}.{file_format}")
+    enhancement = "ai" if ai_enabled else "plain"
+    output_path = os.path.join(BATCH_DIR, f"{job_id}_{src_lang}_{dest_lang}_{mode}_{enhancement}.{output_format}")
+    if not os.path.exists(input_path):
+        with open(input_path, "wb") as f:
+            f.write(content)
+    
+    total = sum(1 for _ in read_segments(input_path, file_format))
+    job = BatchJob(get_translation_pipeline(), input_path, output_path, src_lang, dest_lang, mode,
+                   concurrency=concurrency, ai_enabled=ai_enabled)
+    
+    # Coût estimé avant le lancement (quota journalier MyMemory ou tokens OpenAI)
+    estimate = job.estimate()
+    if estimate is not None:
+        st.caption(describe_estimate(estimate, get_rate_limiter().stats()))
+    progress = st.progress(0.0, text="Starting...")
+    
+    def on_progress(stats):
+        processed = stats["done"] + stats["failed"] + stats["skipped"]
+        progress.progress(
+            min(processed / total, 1.0) if total else 1.0,
+            text=f"{processed}/{total} segments - {stats['segments_per_sec']:.1f} segments/s"
+        )
     
+    st.session_state.last_batch_output = output_path
     try:
-        prompt = f"""As a cultural expert, provide ONE brief, specific cultural insight for this translation scenario.
-
-Text: "{text}"
-From: {src_lang} → To: {dest_lang}
-Context: {mode}
-
-Provide a single, practical cultural tip (max 2 sentences). Be specific and actionable."""
-
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a cross-cultural communication expert. Provide brief, actionable insights."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=100,
-            temperature=0.7
+        stats = job.run(on_progress=on_progress)
+    except MyMemoryQuotaError as e:
+        st.error(f"Batch stopped: {e}. Start it again later to resume.")
+        return
+    
+    progress.progress(1.0, text="Done")
+    st.success(
+        f"{stats['done']} translated, {stats['failed']} failed, {stats['skipped']} resumed "
+        f"in {stats['elapsed']:.1f}s ({stats['segments_per_sec']:.1f} segments/s)"
+    )
+
+def export_history_file(history, export_format, filters):
+    """Exporter l'historique filtré dans un fichier (un seul export gardé par session)"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"speakeasy_history_{st.session_state.history_session_id[:8]}_"
+                                    f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}")
+    previous = st.session_state.get("last_history_export")
+    if previous and os.path.exists(previous["path"]):
+        os.remove(previous["path"])
+    
+    with open(path, "wb") as f:
+        stats = export_history(history, f, export_format, **filters)
+    return {"path": path, "format": export_format, **stats}
+
+def timed_section(name):
+    """Chronométrer une section (script complet ou fragment) : métriques admin et badge ?timings=1"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Le badge est réservé en haut de la section puis rempli à la fin
+            badge = st.empty() if st.query_params.get("timings") == "1" else None
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                METRICS.observe("speakeasy_ui_render_seconds", seconds, section=name)
+                if badge is not None:
+                    badge.markdown(f'<span class="rerun-timing">{name}: {seconds * 1000:.1f} ms</span>',
+                                   unsafe_allow_html=True)
+        return wrapper
+    return decorator
+
+@st.cache_data(show_spinner=False)
+def render_culture_sections(language_code):
+    """Blocs Markdown d'une culture, construits une seule fois par langue"""
+    full_context = get_cultural_engine().get_cultural_context(language_code, "general")
+    if "message" in full_context:
+        return {"message": full_context["message"], "tip": full_context.get("tip", "")}
+    
+    left, right, taboos = [], [], []
+    # Greetings
+    if "greetings" in full_context:
+        greetings = full_context["greetings"]
+        left.append(("markdown", "\n".join(
+            ["### Greetings", "", "**Formal:**", ""] + [f"- {g}" for g in greetings.get("formal", [])]
+            + ["", "**Informal:**", ""] + [f"- {g}" for g in greetings.get("informal", [])]
+        )))
+        left.append(("info", greetings.get("tips", "")))
+    # Gestures
+    if "gestures" in full_context:
+        gestures = full_context["gestures"]
+        left.append(("markdown", f"### Gestures\n\n**Positive:** {gestures.get('positive', '')}\n\n"
+                                 f"**Negative:** {gestures.get('negative', '')}"))
+    # Business Etiquette
+    if "business" in full_context:
+        business = full_context["business"]
+        right.append(("markdown", f"### Business Etiquette\n\n**Etiquette:** {business.get('etiquette', '')}\n\n"
+                                  f"**Tips:** {business.get('tips', '')}"))
+    # Dining
+    if "dining" in full_context:
+        right.append(("markdown", f"### Dining Customs\n\n{full_context['dining']}"))
+    # Taboos
+    if "taboos" in full_context:
+        taboos.append(("markdown", "### Important Taboos & Things to Avoid"))
+        taboos.append(("html", "".join(f'<div class="cultural-tip">{taboo}</div>' for taboo in full_context["taboos"])))
+    return {"left": left, "right": right, "taboos": taboos}
+
+def render_blocks(blocks):
+    """Afficher des blocs précalculés (markdown, html ou info)"""
+    for kind, content in blocks:
+        if kind == "info":
+            st.info(content)
+        else:
+            st.markdown(content, unsafe_allow_html=kind == "html")
+
+@st.fragment
+@timed_section("translation")
+def translation_panel(source_language, target_language, conversation_mode, stream_output):
+    """Panneau de traduction : un clic sur Translate ne réexécute que ce fragment"""
+    st.header("Instant Translation")
+    
+    col1, col2 = st.columns(2)
+    
+    # Zone de traduction créée d'abord pour pouvoir y streamer le résultat
+    with col2:
+        st.subheader(f"{LANGUAGE_NAMES[target_language]}")
+        translation_box = st.empty()
+    
+    with col1:
+        st.subheader(f"{LANGUAGE_NAMES[source_language]}")
+        input_text = st.text_area(
+            "Enter your text",
+            height=200,
+            placeholder="Type or paste your text here...",
+            key="text_input"
         )
         
-        insight = response.choices[0].message.content.strip()
-        return insight if insight else None
+        if st.button("Translate", type="primary", use_container_width=True):
+            if input_text.strip():
+                def show_partial(partial):
+                    translation_box.markdown(f'<div class="translation-box"><h3>{partial}</h3></div>',
+                                             unsafe_allow_html=True)
+                
+                with st.spinner("Translating..."):
+                    translation, cultural_context, memory_match = translate_text(
+                        input_text,
+                        source_language,
+                        target_language,
+                        conversation_mode,
+                        on_partial=show_partial if stream_output else None
+                    )
+                    
+                    # Le résultat est rendu plus bas dans ce même passage (pas de st.rerun)
+                    if translation:
+                        state = get_session_state()
+                        state["last_translation"] = translation
+                        state["last_cultural_context"] = cultural_context
+                        state["last_memory_match"] = memory_match
+            else:
+                st.warning("Please enter text to translate.")
     
-    except Exception:
-        return None
-
-def translate_text(text, src_lang, dest_lang, mode):
-    """Traduire le texte avec MyMemory Translation API + AI Enhancement"""
-    try:
-        # Utiliser MyMemory Translation API (pas besoin de package externe)
-        url = f"https://api.mymemory.translated.net/get?q={quote(text)}&langpair={src_lang}|{dest_lang}"
-        response = requests.get(url)
-        data = response.json()
+    with col2:
+        state = get_session_state()
+        if 'last_translation' in state:
+            translation_box.markdown(f'<div class="translation-box"><h3>{state["last_translation"]}</h3></div>', 
+                                     unsafe_allow_html=True)
+            
+            # Traduction de base reprise de la mémoire de traduction locale (sans appel réseau)
+            memory_match = state.get("last_memory_match")
+            if memory_match is not None:
+                st.caption(f"Translation memory match: {memory_match:.0%}")
+            
+            # Cultural context
+            context = state.get("last_cultural_context")
+            if context:
+                st.markdown("---")
+                st.subheader("Cultural Context")
+                
+                if context.get('tips'):
+                    for tip in context['tips']:
+                        st.markdown(f'<div class="cultural-tip">{tip}</div>', 
+                                  unsafe_allow_html=True)
+                
+                if context.get('key_taboo'):
+                    st.markdown(f'<div class="info-box"><strong>Important Taboo:</strong> {context["key_taboo"]}</div>', 
+                              unsafe_allow_html=True)
+        else:
+            translation_box.info("Translation will appear here...")
+    
+    # Examples
+    with st.expander("Example Phrases"):
+        st.markdown("""
+        **Greetings:**
+        - Hello, how are you?
+        - Good morning, nice to meet you
+        
+        **Business:**
+        - I'd like to schedule a meeting
+        - Could you send me the report?
         
-        if response.status_code == 200 and data.get('responseStatus') == 200:
-            base_translation = data['responseData']['translatedText']
+        **Travel:**
+        - Where is the nearest train station?
+        - How much does this cost?
+        """)
+
+@st.fragment
+@timed_section("explorer")
+def cultural_explorer():
+    """Explorateur culturel : recherche et changement de langue ne réexécutent que ce fragment"""
+    st.header("Cultural Explorer")
+    
+    st.markdown("""
+    Explore cultural contexts, etiquette, and important customs for different languages and regions.
+    """)
+    
+    # Recherche plein texte dans toute la base culturelle
+    search_query = st.text_input(
+        "Search all cultures",
+        placeholder="e.g. OK sign offensive, gifts, punctuality...",
+        key="cultural_search"
+    )
+    if search_query.strip():
+        results = get_cultural_engine().search(search_query, limit=10)
+        if results:
+            for result in results:
+                st.markdown(f'<div class="cultural-tip"><strong>{result["name"]}</strong> · {result["field"]}: {result["text"]}</div>',
+                            unsafe_allow_html=True)
         else:
-            # Fallback simple si l'API ne fonctionne pas
-            base_translation = f"[Traduction de: {text}]"
+            st.info("No matching cultural entries.")
+        st.markdown("---")
+    
+    # Language selection
+    cultural_lang = st.selectbox(
+        "Select a language/culture",
+        options=list(LANGUAGE_NAMES.keys()),
+        format_func=lambda x: LANGUAGE_NAMES.get(x, x),
+        key="cultural_selector"
+    )
+    
+    # Sections précalculées par langue (le moteur normalise les codes comme 'zh-cn')
+    sections = render_culture_sections(cultural_lang)
+    
+    if "message" not in sections:
+        col1, col2 = st.columns(2)
+        with col1:
+            render_blocks(sections["left"])
+        with col2:
+            render_blocks(sections["right"])
+        render_blocks(sections["taboos"])
+    else:
+        st.warning(sections["message"])
+        st.info(sections["tip"])
+
+def read_history(history, method, *args, **filters):
+    """Lecture d'historique mémorisée tant que sa version ne change pas (rafraîchissements sans requête)"""
+    reads = st.session_state.setdefault("history_reads", {})
+    if reads.get("version") != history.version:
+        reads.clear()
+        reads["version"] = history.version
+    key = (method, args, tuple(sorted(filters.items())))
+    if key not in reads:
+        reads[key] = getattr(history, method)(*args, **filters)
+    return reads[key]
+
+@st.fragment(run_every=HISTORY_REFRESH_SECONDS)
+@timed_section("history")
+def history_panel():
+    """Historique paginé : filtres, pages et exports ne réexécutent que ce fragment"""
+    st.header("Conversation History")
+    
+    # Le fragment se rafraîchit seul ; les lectures ne sont refaites que si l'historique a changé
+    history = get_session_history()
+    total = read_history(history, "count")
+    if total:
+        # Filtres (langues, mode, dates) appliqués directement dans la requête
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            pair = st.selectbox(
+                "Language pair",
+                options=[None] + read_history(history, "language_pairs"),
+                format_func=lambda p: "All" if p is None else f"{p[0].upper()} → {p[1].upper()}",
+                key="history_pair"
+            )
+        with fcol2:
+            mode_filter = st.selectbox(
+                "Mode",
+                options=[None] + list(CONVERSATION_MODES.values()),
+                format_func=lambda m: "All" if m is None else m.capitalize(),
+                key="history_mode"
+            )
+        with fcol3:
+            dates = st.date_input("Dates", value=(), key="history_dates")
         
-        # AI Enhancement (invisible - améliore la qualité)
-        translation = enhance_translation_with_ai(text, base_translation, src_lang, dest_lang, mode)
+        filters = {}
+        if pair is not None:
+            filters["source_lang"], filters["target_lang"] = pair
+        if mode_filter is not None:
+            filters["mode"] = mode_filter
+        if len(dates) == 2:
+            filters["since"] = int(datetime.combine(dates[0], datetime.min.time()).timestamp())
+            filters["until"] = int(datetime.combine(dates[1] + timedelta(days=1), datetime.min.time()).timestamp())
         
-        # Obtenir le contexte culturel de base
-        cultural_context = st.session_state.cultural_engine.get_context_for_conversation(
-            src_lang, dest_lang, mode
-        )
+        matching = read_history(history, "count", **filters) if filters else total
+        st.subheader(f"Total: {matching} translations" if matching == total else f"{matching} of {total} translations")
+        
+        # Seule la page visible est lue et rendue
+        page_count = max(1, (matching - 1) // HISTORY_PAGE_SIZE + 1)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1,
+                               key="history_page") - 1 if page_count > 1 else 0
         
-        # Enrichir avec un insight IA dynamique (si disponible)
-        ai_insight = generate_ai_cultural_insight(text, src_lang, dest_lang, mode)
-        if ai_insight and cultural_context:
-            # Ajouter l'insight IA aux tips existants
-            if 'tips' not in cultural_context:
-                cultural_context['tips'] = []
-            cultural_context['tips'].insert(0, f"AI Insight: {ai_insight}")
+        # Display recent translations
+        for row in read_history(history, "query", page, HISTORY_PAGE_SIZE, **filters):
+            with st.expander(f"{format_timestamp(row['timestamp'])} - {row['source_lang'].upper()} → {row['target_lang'].upper()}"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Original:**")
+                    st.markdown(f"_{row['original']}_")
+                
+                with col2:
+                    st.markdown("**Translation:**")
+                    st.markdown(f"**{row['translation']}**")
+                
+                st.caption(f"Mode: {row['mode']}")
         
-        # Sauvegarder dans l'historique
-        st.session_state.conversation_history.append({
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "original": text,
-            "translation": translation,
-            "source_lang": src_lang,
-            "target_lang": dest_lang,
-            "mode": mode
-        })
+        # Export (entrées filtrées), écrit par blocs dans un fichier
+        st.markdown("---")
+        ecol1, ecol2 = st.columns([1, 3])
+        with ecol1:
+            export_format = st.selectbox("Export format", options=list(EXPORT_FORMATS),
+                                         format_func=str.upper, key="history_export_format")
+        with ecol2:
+            st.write("")
+            if st.button("Export history"):
+                st.session_state.last_history_export = export_history_file(history, export_format, filters)
         
-        return translation, cultural_context
+        if 'last_history_export' in st.session_state and os.path.exists(st.session_state.last_history_export["path"]):
+            export = st.session_state.last_history_export
+            st.caption(f"{export['rows']} rows, {export['bytes'] / 1024:.0f} KB "
+                       f"({export['rows_per_sec']:,.0f} rows/s)")
+            with open(export["path"], "rb") as f:
+                st.download_button(
+                    label=f"Download {export['format'].upper()}",
+                    data=f,
+                    file_name=os.path.basename(export["path"]),
+                    mime=EXPORT_MIME_TYPES[export["format"]]
+                )
+    else:
+        st.info("No translations yet. Start translating to build your history!")
+
+@st.fragment
+@timed_section("batch")
+def batch_panel(source_language, target_language, conversation_mode):
+    """Traduction batch (upload, job, téléchargement) dans son propre fragment"""
+    st.header("Batch Translation")
     
-    except Exception as e:
-        return f"Erreur de traduction: {str(e)}", None
+    st.markdown("""
+    Upload a file of segments (CSV with a `text` column, TXT with one segment per line, or JSONL with a `text` field).
+    Segments are translated in parallel and streamed to a result file; re-running the same file resumes where it stopped.
+    """)
+    
+    uploaded = st.file_uploader("Segments file", type=list(INPUT_FORMATS), key="batch_file")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        batch_format = st.selectbox("Output format", options=list(OUTPUT_FORMATS), key="batch_format")
+    with col2:
+        batch_concurrency = st.slider("Concurrency", min_value=1, max_value=16, value=8, key="batch_concurrency")
+    with col3:
+        batch_ai = st.checkbox("AI enhancement", value=False, disabled=not OPENAI_AVAILABLE, key="batch_ai")
+    
+    if uploaded is not None and st.button("Start batch", type="primary"):
+        run_batch_job(uploaded, source_language, target_language, conversation_mode,
+                      batch_format, batch_concurrency, batch_ai)
+    
+    # Résultat du dernier job (téléchargeable même s'il a été interrompu)
+    if 'last_batch_output' in st.session_state and os.path.exists(st.session_state.last_batch_output):
+        with open(st.session_state.last_batch_output, "rb") as f:
+            st.download_button(
+                label="Download results",
+                data=f,
+                file_name=os.path.basename(st.session_state.last_batch_output),
+                mime="text/csv" if st.session_state.last_batch_output.endswith(".csv") else "application/jsonl"
+            )
 
+@timed_section("script")
 def main():
     # Header
     st.markdown('<h1 class="main-header">SpeakEasy Translator</h1>', unsafe_allow_html=True)
@@ -645,12 +1096,16 @@ def main():
         )
         conversation_mode = CONVERSATION_MODES[conversation_mode_name]
         
+        # Affichage progressif de l'amélioration IA
+        stream_output = st.checkbox("Stream AI output", value=True, disabled=not OPENAI_AVAILABLE,
+                                    help="Show the base translation immediately, then the AI-enhanced text as it arrives")
+        
         st.markdown("---")
         
         # Quick actions
         st.subheader("Actions")
         if st.button("Clear history"):
-            st.session_state.conversation_history = []
+            get_session_history().clear()
             st.success("History cleared!")
         
         st.markdown("---")
@@ -659,7 +1114,7 @@ def main():
         st.subheader("About")
         
         # Afficher le statut AI de manière discrète
-        ai_status = "AI-Enhanced ✓" if OPENAI_AVAILABLE and openai_api_key else "Standard Mode"
+        ai_status = "AI-Enhanced ✓" if OPENAI_AVAILABLE else "Standard Mode"
         
         st.info(f"""
         **Version:** {ai_status}
@@ -669,192 +1124,58 @@ def main():
         - Fast & lightweight (< 100 MB)
         """)
         
+        cache_stats = get_translation_cache().stats()
+        st.caption(
+            f"Cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits / "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%})"
+        )
+        memory_stats = get_translation_memory().stats()
+        st.caption(
+            f"Translation memory: {memory_stats['segments']:,} segments, "
+            f"{memory_stats['exact'] + memory_stats['fuzzy']} served locally ({memory_stats['fuzzy']} fuzzy)"
+        )
+        # Fournisseurs en panne (circuit ouvert ou en test)
+        for breaker in (get_mymemory_client().breaker, get_ai_enhancer().breaker if OPENAI_AVAILABLE else None):
+            if breaker is not None and breaker.state != CLOSED:
+                st.warning(f"{breaker.name} is failing - requests are skipped until it recovers")
+        
+        # Quotas restants et attente dans les files
+        limits = get_rate_limiter().stats()
+        chars = limits["mymemory"]["buckets"]["chars"]
+        st.caption(f"MyMemory quota: {chars['available']:,.0f} / {chars['capacity']:,.0f} chars left today")
+        if OPENAI_AVAILABLE:
+            tokens = limits["openai"]["buckets"]["tokens"]
+            st.caption(f"OpenAI: {tokens['available']:,.0f} / {tokens['capacity']:,.0f} tokens/min, "
+                       f"{get_ai_enhancer().usage()['rate_limited']} rate-limited")
+        waits = [f"{name} {w['avg'] * 1000:.0f} ms avg" for provider in limits.values()
+                 for name, w in provider["waits"].items() if w["max"] > 0]
+        if waits:
+            st.caption("Queue wait: " + ", ".join(waits))
+        
+        flight_stats = get_translation_pipeline().coalescing_stats()
+        if flight_stats["shared"]:
+            st.caption(f"Coalesced: {flight_stats['shared']} upstream calls saved")
+        
+        if st.query_params.get("admin") == "1":
+            show_admin_panel()
+        
         st.markdown("---")
         st.caption("SpeakEasy Translator | AI-Powered | ESSEC-Centrale 2025")
     
-    # Main content
-    tab1, tab2, tab3 = st.tabs(["Text Translation", "Cultural Insights", "History"])
+    # Main content : chaque onglet est un fragment qui se réexécute seul
+    tab1, tab2, tab3, tab4 = st.tabs(["Text Translation", "Cultural Insights", "History", "Batch Translation"])
     
-    # Tab 1: Translation
     with tab1:
-        st.header("Instant Translation")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader(f"{LANGUAGE_NAMES[source_language]}")
-            input_text = st.text_area(
-                "Enter your text",
-                height=200,
-                placeholder="Type or paste your text here...",
-                key="text_input"
-            )
-            
-            if st.button("Translate", type="primary", use_container_width=True):
-                if input_text.strip():
-                    with st.spinner("Translating..."):
-                        translation, cultural_context = translate_text(
-                            input_text,
-                            source_language,
-                            target_language,
-                            conversation_mode
-                        )
-                        
-                        if translation:
-                            st.session_state.last_translation = translation
-                            st.session_state.last_cultural_context = cultural_context
-                            st.rerun()
-                else:
-                    st.warning("Please enter text to translate.")
-        
-        with col2:
-            st.subheader(f"{LANGUAGE_NAMES[target_language]}")
-            
-            if 'last_translation' in st.session_state:
-                st.markdown(f'<div class="translation-box"><h3>{st.session_state.last_translation}</h3></div>', 
-                          unsafe_allow_html=True)
-                
-                # Cultural context
-                if 'last_cultural_context' in st.session_state and st.session_state.last_cultural_context:
-                    st.markdown("---")
-                    st.subheader("Cultural Context")
-                    context = st.session_state.last_cultural_context
-                    
-                    if context.get('tips'):
-                        for tip in context['tips']:
-                            st.markdown(f'<div class="cultural-tip">{tip}</div>', 
-                                      unsafe_allow_html=True)
-                    
-                    if context.get('key_taboo'):
-                        st.markdown(f'<div class="info-box"><strong>Important Taboo:</strong> {context["key_taboo"]}</div>', 
-                                  unsafe_allow_html=True)
-            else:
-                st.info("Translation will appear here...")
-        
-        # Examples
-        with st.expander("Example Phrases"):
-            st.markdown("""
-            **Greetings:**
-            - Hello, how are you?
-            - Good morning, nice to meet you
-            
-            **Business:**
-            - I'd like to schedule a meeting
-            - Could you send me the report?
-            
-            **Travel:**
-            - Where is the nearest train station?
-            - How much does this cost?
-            """)
+        translation_panel(source_language, target_language, conversation_mode, stream_output)
     
-    # Tab 2: Cultural Insights
     with tab2:
-        st.header("Cultural Explorer")
-        
-        st.markdown("""
-        Explore cultural contexts, etiquette, and important customs for different languages and regions.
-        """)
-        
-        # Language selection
-        cultural_lang = st.selectbox(
-            "Select a language/culture",
-            options=list(LANGUAGE_NAMES.keys()),
-            format_func=lambda x: LANGUAGE_NAMES.get(x, x),
-            key="cultural_selector"
-        )
-        
-        # Convert language code if necessary
-        cultural_lang_code = cultural_lang.replace('-cn', '')
-        
-        # Get cultural context
-        full_context = st.session_state.cultural_engine.get_cultural_context(cultural_lang_code, "general")
-        
-        if "message" not in full_context:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Greetings
-                if "greetings" in full_context:
-                    st.subheader("Greetings")
-                    greetings = full_context["greetings"]
-                    
-                    st.markdown("**Formal:**")
-                    for greeting in greetings.get("formal", []):
-                        st.markdown(f"- {greeting}")
-                    
-                    st.markdown("**Informal:**")
-                    for greeting in greetings.get("informal", []):
-                        st.markdown(f"- {greeting}")
-                    
-                    st.info(greetings.get("tips", ""))
-                
-                # Gestures
-                if "gestures" in full_context:
-                    st.subheader("Gestures")
-                    gestures = full_context["gestures"]
-                    
-                    st.markdown(f"**Positive:** {gestures.get('positive', '')}")
-                    st.markdown(f"**Negative:** {gestures.get('negative', '')}")
-            
-            with col2:
-                # Business Etiquette
-                if "business" in full_context:
-                    st.subheader("Business Etiquette")
-                    business = full_context["business"]
-                    
-                    st.markdown(f"**Etiquette:** {business.get('etiquette', '')}")
-                    st.markdown(f"**Tips:** {business.get('tips', '')}")
-                
-                # Dining
-                if "dining" in full_context:
-                    st.subheader("Dining Customs")
-                    st.markdown(full_context["dining"])
-            
-            # Taboos
-            if "taboos" in full_context:
-                st.subheader("Important Taboos & Things to Avoid")
-                for taboo in full_context["taboos"]:
-                    st.markdown(f'<div class="cultural-tip">{taboo}</div>', unsafe_allow_html=True)
-        else:
-            st.warning(full_context["message"])
-            st.info(full_context.get("tip", ""))
+        cultural_explorer()
     
-    # Tab 3: History
     with tab3:
-        st.header("Conversation History")
-        
-        if st.session_state.conversation_history:
-            df = pd.DataFrame(st.session_state.conversation_history)
-            
-            st.subheader(f"Total: {len(df)} translations")
-            
-            # Display recent translations
-            for idx, row in df.iloc[::-1].iterrows():
-                with st.expander(f"{row['timestamp']} - {row['source_lang'].upper()} → {row['target_lang'].upper()}"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**Original:**")
-                        st.markdown(f"_{row['original']}_")
-                    
-                    with col2:
-                        st.markdown("**Translation:**")
-                        st.markdown(f"**{row['translation']}**")
-                    
-                    st.caption(f"Mode: {row['mode']}")
-            
-            # Export
-            st.markdown("---")
-            if st.button("Export to CSV"):
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"speakeasy_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-        else:
-            st.info("No translations yet. Start translating to build your history!")
+        history_panel()
+    
+    with tab4:
+        batch_panel(source_language, target_language, conversation_mode)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: cold import time of the headless core
+
+Starts a fresh interpreter per run and times the import of `speakeasy.core`
+against the eager imports the app used to pay up front (openai, requests,
+pandas) and against the Streamlit shell, then reports which heavy modules
+each variant actually loaded.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 7] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("openai", "requests", "pandas", "pyarrow", "numpy", "streamlit")
+
+VARIANTS = {
+    "python": "pass",
+    "core": "from speakeasy.core import SpeakEasy",
+    "core+eager": "import openai, requests, pandas; from speakeasy.core import SpeakEasy",
+    "core+streamlit": "import streamlit; from speakeasy.core import SpeakEasy",
+}
+
+# Runs in the child: time the statement, then list the heavy modules it pulled in
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, runs):
+    """Median wall time (ms) of `statement` in a fresh interpreter, plus the heavy modules loaded"""
+    samples, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, cwd=ROOT)
+        if output.returncode != 0:
+            return None
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded = result["loaded"]
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1), "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per variant")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in VARIANTS.items():
+        result = measure(statement, args.runs)
+        results[name] = result
+        if result is None:
+            print(f"{name:<16} unavailable (missing dependency)")
+            continue
+        print(f"{name:<16} {result['median_ms']:>8.1f} ms (min {result['min_ms']:.1f})  "
+              f"loaded: {', '.join(result['loaded']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
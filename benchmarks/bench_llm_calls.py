@@ -0,0 +1,95 @@
+"""
+Benchmark: separate enhancement + insight completions vs one structured completion
+
+Runs the same phrases through both OpenAI paths and compares wall-clock latency,
+request count and token usage.
+
+Usage:
+    OPENAI_API_KEY=... python benchmarks/bench_llm_calls.py [--runs 20] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speakeasy.ai_enhancement import AIEnhancer  # noqa: E402
+
+PHRASES = [
+    ("Hello, how are you?", "Bonjour, comment allez-vous ?", "en", "fr", "casual"),
+    ("I'd like to schedule a meeting", "Je voudrais planifier une réunion", "en", "fr", "business"),
+    ("Where is the nearest train station?", "¿Dónde está la estación de tren más cercana?", "en", "es", "travel"),
+    ("Could you send me the report?", "Könnten Sie mir den Bericht schicken?", "en", "de", "business"),
+    ("How much does this cost?", "Quanto costa questo?", "en", "it", "travel"),
+]
+
+
+def two_calls(enhancer, executor, text, translation, src_lang, dest_lang, mode):
+    """Current path: enhancement and insight as two parallel completions"""
+    insight = executor.submit(enhancer.cultural_insight, text, src_lang, dest_lang, mode)
+    improved = enhancer.enhance_translation(text, translation, src_lang, dest_lang, mode)
+    return {"translation": improved or translation, "insight": insight.result()}
+
+
+def one_call(enhancer, executor, text, translation, src_lang, dest_lang, mode):
+    """Structured path: both fields in one JSON completion"""
+    result = enhancer.enhance_with_insight(text, translation, src_lang, dest_lang, mode) or {}
+    return {"translation": result.get("translation") or translation, "insight": result.get("insight")}
+
+
+def run(name, path, runs, base_url):
+    enhancer = AIEnhancer(base_url=base_url)
+    if not enhancer.available:
+        sys.exit("OPENAI_API_KEY is not set (or the openai package is missing)")
+
+    latencies = []
+    insights = 0
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for i in range(runs):
+            started = time.perf_counter()
+            result = path(enhancer, executor, *PHRASES[i % len(PHRASES)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            insights += result["insight"] is not None
+
+    usage = enhancer.usage()
+    latencies.sort()
+    return {
+        "path": name,
+        "runs": runs,
+        "latency_ms_p50": statistics.median(latencies),
+        "latency_ms_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "requests_per_translation": usage["requests"] / runs,
+        "prompt_tokens_per_translation": usage["prompt_tokens"] / runs,
+        "completion_tokens_per_translation": usage["completion_tokens"] / runs,
+        "insight_rate": insights / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20, help="Translations per path")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint (default: OpenAI)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = [
+        run("two_calls", two_calls, args.runs, args.base_url),
+        run("one_call", one_call, args.runs, args.base_url),
+    ]
+
+    print(f"{'metric':<36}{'two_calls':>14}{'one_call':>14}")
+    for metric in list(results[0])[2:]:
+        print(f"{metric:<36}" + "".join(f"{result[metric]:>14.2f}" for result in results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark: end-to-end translation pipeline against the local mock upstreams
+
+Replays a JSONL corpus of {"text", "src", "dest", "mode"} requests through
+TranslationPipeline for every combination of concurrency, cache state (cold or
+warm) and input length, and reports latency percentiles, throughput, upstream
+calls and memory as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--concurrency 1,8,32] [--ai] [--json results.json]
+    python benchmarks/bench_pipeline.py --json new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speakeasy.ai_enhancement import AIEnhancer  # noqa: E402
+from speakeasy.mock_server import MockConfig, start_mock_server  # noqa: E402
+from speakeasy.mymemory_client import MyMemoryClient  # noqa: E402
+from speakeasy.segmentation import DEFAULT_MAX_BYTES, byte_length  # noqa: E402
+from speakeasy.translation_cache import TranslationCache  # noqa: E402
+from speakeasy.translation_pipeline import create_pipeline  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.jsonl")
+
+# Input length buckets (UTF-8 bytes)
+LENGTHS = {
+    "short": (0, 80),
+    "medium": (80, DEFAULT_MAX_BYTES),
+    "long": (DEFAULT_MAX_BYTES, float("inf")),
+    "all": (0, float("inf")),
+}
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(DEFAULT_CORPUS), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def replay(pipeline, requests, concurrency, ai_enabled):
+    """Send every request with `concurrency` callers; returns (latencies in ms, errors, elapsed seconds)"""
+
+    def send(request):
+        started = time.perf_counter()
+        try:
+            pipeline.translate(request["text"], request["src"], request["dest"], request["mode"],
+                               ai_enabled=ai_enabled)
+            failed = False
+        except Exception:
+            failed = True
+        return (time.perf_counter() - started) * 1000, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, requests))
+    elapsed = time.perf_counter() - started
+    return sorted(latency for latency, _ in results), sum(failed for _, failed in results), elapsed
+
+
+def upstream_calls(mock):
+    with mock.lock:
+        return dict(mock.stats)
+
+
+def run_scenario(base_url, mock, requests, concurrency, cache_state, length, args):
+    """One (concurrency, cache, length) combination on a fresh pipeline and cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranslationCache(os.path.join(tmp, "cache.sqlite3"))
+        client = MyMemoryClient(base_url=base_url + "/get", pool_size=max(20, concurrency))
+        enhancer = AIEnhancer(api_key="mock" if args.ai else "", base_url=base_url + "/v1")
+        pipeline = create_pipeline(client=client, enhancer=enhancer, cache=cache,
+                                   max_workers=max(8, concurrency * 2))
+        try:
+            if cache_state == "warm":
+                replay(pipeline, requests, concurrency, args.ai)
+
+            before = upstream_calls(mock)
+            if args.trace_memory:
+                tracemalloc.start()
+            latencies, errors, elapsed = replay(pipeline, requests, concurrency, args.ai)
+            peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+            if args.trace_memory:
+                tracemalloc.stop()
+            after = upstream_calls(mock)
+        finally:
+            pipeline.shutdown()
+            client.close()
+
+    return {
+        "concurrency": concurrency,
+        "cache": cache_state,
+        "length": length,
+        "requests": len(requests),
+        "errors": errors,
+        "latency_ms_p50": round(percentile(latencies, 50), 2),
+        "latency_ms_p95": round(percentile(latencies, 95), 2),
+        "latency_ms_p99": round(percentile(latencies, 99), 2),
+        "requests_per_sec": round(len(requests) / elapsed, 2) if elapsed else 0.0,
+        "upstream_mymemory": after["mymemory"] - before["mymemory"],
+        "upstream_openai": after["openai"] - before["openai"],
+        "traced_peak_mb": round(peak / 2 ** 20, 2) if peak is not None else None,
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                            / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1),
+    }
+
+
+def compare(results, baseline_path):
+    """Print the change of every scenario against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    key = lambda r: (r["concurrency"], r["cache"], r["length"])  # noqa: E731
+    old = {key(r): r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} ({baseline.get('commit') or 'unknown commit'})")
+    print(f"{'scenario':<22}{'p95 ms':>18}{'p99 ms':>18}{'req/s':>18}")
+    for result in results:
+        previous = old.get(key(result))
+        if previous is None:
+            continue
+        cells = []
+        for metric in ("latency_ms_p95", "latency_ms_p99", "requests_per_sec"):
+            change = (result[metric] - previous[metric]) / previous[metric] * 100 if previous[metric] else 0.0
+            cells.append(f"{result[metric]:>10.1f} ({change:+.0f}%)")
+        print(f"{'c%d/%s/%s' % key(result):<22}" + "".join(f"{cell:>18}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL requests to replay")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--cache", default="cold,warm", help="Cache states: cold, warm")
+    parser.add_argument("--lengths", default="short,medium,long", help=f"Input lengths: {', '.join(LENGTHS)}")
+    parser.add_argument("--ai", action="store_true", help="Enable the (mock) OpenAI stages")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mock upstream base latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Mock upstream mean extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock upstream 5xx probability")
+    parser.add_argument("--seed", type=int, default=1, help="Mock upstream random seed")
+    parser.add_argument("--trace-memory", action="store_true", help="Report the tracemalloc peak (slower)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous --json output to compare against")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    mock = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    server, base_url = start_mock_server(config=mock)
+
+    results = []
+    try:
+        for length in args.lengths.split(","):
+            low, high = LENGTHS[length]
+            requests = [r for r in corpus if low <= byte_length(r["text"]) < high]
+            if not requests:
+                continue
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                for cache_state in args.cache.split(","):
+                    result = run_scenario(base_url, mock, requests, concurrency,
+                                          cache_state, length, args)
+                    results.append(result)
+                    print(f"{length:<7} c={concurrency:<3} {cache_state:<5} "
+                          f"p50 {result['latency_ms_p50']:>8.1f} ms  p95 {result['latency_ms_p95']:>8.1f} ms  "
+                          f"p99 {result['latency_ms_p99']:>8.1f} ms  {result['requests_per_sec']:>8.1f} req/s  "
+                          f"upstream {result['upstream_mymemory']}+{result['upstream_openai']}  "
+                          f"errors {result['errors']}")
+    finally:
+        server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
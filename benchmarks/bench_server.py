@@ -0,0 +1,203 @@
+"""
+Benchmark: HTTP service throughput on one core and on several processes
+
+Starts the mock upstreams and `python -m speakeasy.server` with each process
+count, replays the corpus as POST /translate over keep-alive connections for a
+fixed duration, and reports requests/sec and latency percentiles. The single
+process run is pinned to one CPU where the platform allows it. With a warm cache
+(the default) the numbers measure the service itself, not the upstreams.
+
+Usage:
+    python benchmarks/bench_server.py [--processes 1,4] [--connections 64] [--duration 10] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speakeasy.mock_server import MockConfig, start_mock_server  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "corpus.jsonl")
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def encode(request, port):
+    body = json.dumps({"text": request["text"], "src": request["src"], "dest": request["dest"],
+                       "mode": request["mode"], "ai": False}).encode("utf-8")
+    head = (f"POST /translate HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def send(reader, writer, payload):
+    """Send one request on a keep-alive connection; returns the response status"""
+    writer.write(payload)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def warm_up(port, payloads):
+    """Send every request once so that the measured run hits the cache"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for payload in payloads:
+            await send(reader, writer, payload)
+    finally:
+        writer.close()
+
+
+async def client(port, payloads, offset, deadline, latencies, statuses):
+    """One keep-alive connection sending requests back to back until the deadline"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    index = offset
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await send(reader, writer, payloads[index % len(payloads)])
+            index += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def load_process(args):
+    """Drive `connections` connections from one load-generator process"""
+    port, payloads, connections, duration, seed = args
+
+    async def run():
+        latencies, statuses = [], {}
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(port, payloads, seed * connections + i, deadline, latencies, statuses)
+                               for i in range(connections)))
+        return latencies, statuses
+
+    return asyncio.run(run())
+
+
+def wait_ready(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def run_scenario(base_url, corpus, processes, args):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, MYMEMORY_URL=base_url + "/get", OPENAI_API_KEY="",
+                   SPEAKEASY_CACHE_PATH=os.path.join(tmp, "cache.sqlite3"), MYMEMORY_DAILY_CHARS="1000000000")
+        pinned = processes == 1 and hasattr(os, "sched_setaffinity")
+        preexec = (lambda: os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})) if pinned else None
+        server = subprocess.Popen([sys.executable, "-m", "speakeasy.server", "--port", str(port),
+                                   "--processes", str(processes), "--workers", str(args.workers)],
+                                  cwd=ROOT, env=env, stdout=subprocess.DEVNULL, preexec_fn=preexec)
+        try:
+            if not wait_ready(port):
+                raise RuntimeError("server did not start")
+            payloads = [encode(request, port) for request in corpus]
+            if not args.cold:
+                asyncio.run(warm_up(port, payloads))
+            per_process = max(1, args.connections // args.load_processes)
+            with multiprocessing.Pool(args.load_processes) as pool:
+                started = time.perf_counter()
+                results = pool.map(load_process, [(port, payloads, per_process, args.duration, i)
+                                                   for i in range(args.load_processes)])
+                elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    latencies = sorted(latency for process_latencies, _ in results for latency in process_latencies)
+    statuses = {}
+    for _, process_statuses in results:
+        for status, count in process_statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    return {
+        "processes": processes,
+        "pinned_one_core": pinned,
+        "connections": per_process * args.load_processes,
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms_p50": round(percentile(latencies, 50), 2),
+        "latency_ms_p95": round(percentile(latencies, 95), 2),
+        "latency_ms_p99": round(percentile(latencies, 99), 2),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL requests to replay")
+    parser.add_argument("--processes", default=f"1,{os.cpu_count() or 1}", help="Server process counts")
+    parser.add_argument("--workers", type=int, default=16, help="Translation threads per server process")
+    parser.add_argument("--connections", type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument("--load-processes", type=int, default=2, help="Load-generator processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per scenario")
+    parser.add_argument("--cold", action="store_true", help="Skip the warm-up pass (measure the upstreams)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock upstream base latency")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    mock, base_url = start_mock_server(config=MockConfig(args.latency_ms, args.latency_ms / 2, seed=1))
+    results = []
+    try:
+        for processes in dict.fromkeys(int(p) for p in args.processes.split(",")):
+            result = run_scenario(base_url, corpus, processes, args)
+            results.append(result)
+            core = " (1 core)" if result["pinned_one_core"] else ""
+            print(f"{processes} process(es){core:<9} {result['requests_per_sec']:>9.1f} req/s  "
+                  f"p50 {result['latency_ms_p50']:>7.1f} ms  p95 {result['latency_ms_p95']:>7.1f} ms  "
+                  f"p99 {result['latency_ms_p99']:>7.1f} ms  statuses {result['statuses']}")
+    finally:
+        mock.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: per-session memory of the cultural engine
+
+Compares the old behaviour (one CulturalContextEngine with a freshly built
+nested dict per Streamlit session) with the shared, frozen process-wide engine,
+then the memory held by session states (last translation, cultural context,
+in-memory history) while active and after the SessionStore spilled them idle.
+
+Usage:
+    python benchmarks/bench_session_memory.py [--sessions 300] [--history 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speakeasy.cultural_context import DEFAULT_DATA_DIR, CulturalContextEngine  # noqa: E402
+from speakeasy.history_store import ConversationHistory  # noqa: E402
+from speakeasy.session_store import SessionStore  # noqa: E402
+
+
+def load_all_cultures():
+    """Old behaviour: the whole database as plain nested dicts"""
+    cultures = {}
+    for file_name in sorted(os.listdir(DEFAULT_DATA_DIR)):
+        if file_name != "index.json":
+            with open(os.path.join(DEFAULT_DATA_DIR, file_name), encoding="utf-8") as f:
+                cultures[file_name[:-5]] = json.load(f)
+    return cultures
+
+
+def measure(make_session, sessions):
+    """Allocate `sessions` simulated session states and return the traced bytes"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    states = [make_session() for _ in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del states
+    return used
+
+
+def measure_session_store(engine, sessions, history_entries):
+    """Traced bytes of `sessions` active session states, then after an idle sweep"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(os.path.join(tmp, "sessions.sqlite3"), idle_seconds=0)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for index in range(sessions):
+            state = store.session(f"session-{index}")
+            history = ConversationHistory()
+            for entry in range(history_entries):
+                history.append(f"Could you send me the report number {entry}?",
+                               f"Pourriez-vous m'envoyer le rapport numéro {entry} ?", "en", "fr", "business")
+            context = dict(engine.get_context_for_conversation("en", "fr", "business"))
+            context["tips"] = ("AI Insight: keep it formal",) + tuple(context["tips"])
+            state["conversation_history"] = history
+            state["last_cultural_context"] = context
+            state["last_translation"] = "Pourriez-vous m'envoyer le rapport ?"
+        active = tracemalloc.get_traced_memory()[0] - baseline
+        store.sweep()
+        idle = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        store.close()
+    return active, idle
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=300, help="Simulated browser sessions")
+    parser.add_argument("--history", type=int, default=200, help="In-memory history entries per session")
+    args = parser.parse_args()
+
+    # Before: every session state held its own engine with its own nested dict
+    before = measure(lambda: {"cultural_engine": load_all_cultures()}, args.sessions)
+
+    # After: sessions only reference the process-wide engine (every culture loaded)
+    shared = CulturalContextEngine()
+    for language_code in shared.get_all_supported_languages():
+        shared.get_context_for_conversation("en", language_code)
+    after = measure(lambda: {"cultural_engine": shared}, args.sessions)
+
+    print(f"sessions:            {args.sessions}")
+    print(f"before: {before / 1024:10.1f} KiB total, {before / args.sessions:10.0f} B/session")
+    print(f"after:  {after / 1024:10.1f} KiB total, {after / args.sessions:10.0f} B/session")
+
+    # Session states: all active, then spilled to disk once idle
+    active, idle = measure_session_store(shared, args.sessions, args.history)
+    print(f"states active: {active / 1024:10.1f} KiB total, {active / args.sessions:10.0f} B/session")
+    print(f"states idle:   {idle / 1024:10.1f} KiB total, {idle / args.sessions:10.0f} B/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: translation memory lookup latency as the memory grows
+
+Fills a TranslationMemory with synthetic sentences, then times lookups of
+near-duplicates of stored sentences (one or two typos, which should be served
+locally) and of unseen sentences (which should miss), and reports latency
+percentiles and hit rates.
+
+Usage:
+    python benchmarks/bench_translation_memory.py [--segments 200000] [--queries 2000] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speakeasy.translation_memory import TranslationMemory  # noqa: E402
+
+SYLLABLES = ["ba", "co", "de", "fi", "gu", "ha", "jo", "ki", "lu", "ma", "ne", "po", "ra", "si", "tu", "vo", "ze"]
+
+
+def make_vocabulary(rng, size):
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+
+
+def make_sentence(rng, vocabulary):
+    words = [rng.choice(vocabulary) for _ in range(rng.randint(6, 14))]
+    return " ".join(words).capitalize() + rng.choice([".", "?", "!"])
+
+
+def add_typos(rng, sentence, count):
+    """Replace `count` letters of a sentence"""
+    chars = list(sentence)
+    letters = [i for i, char in enumerate(chars) if char.isalpha()]
+    for index in rng.sample(letters, min(count, len(letters))):
+        chars[index] = "x" if chars[index] != "x" else "y"
+    return "".join(chars)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def time_lookups(memory, queries):
+    latencies, hits = [], 0
+    for text in queries:
+        started = time.perf_counter()
+        match = memory.lookup(text, "en", "fr")
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += match is not None
+    latencies.sort()
+    return {
+        "hit_rate": round(hits / len(queries), 4),
+        "latency_ms_p50": round(percentile(latencies, 50), 3),
+        "latency_ms_p95": round(percentile(latencies, 95), 3),
+        "latency_ms_p99": round(percentile(latencies, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=200_000, help="Sentences stored before timing")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups per scenario")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct synthetic words")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Fuzzy match threshold")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "translation_memory.sqlite3")
+        memory = TranslationMemory(path, threshold=args.threshold)
+
+        stored = []
+        started = time.perf_counter()
+        for _ in range(0, args.segments, 10_000):
+            rows = [(make_sentence(rng, vocabulary), "fr") for _ in range(min(10_000, args.segments - len(stored)))]
+            memory.add_many(rows, "en", "fr")
+            stored.extend(text for text, _ in rows)
+        fill_seconds = time.perf_counter() - started
+        segments = memory.stats()["segments"]
+        print(f"Stored {segments:,} segments in {fill_seconds:.1f} s "
+              f"({segments / fill_seconds:,.0f}/s, {os.path.getsize(path) / 1e6:.0f} MB)")
+
+        samples = rng.sample(stored, min(args.queries, len(stored)))
+        scenarios = {
+            "exact": samples,
+            "one_typo": [add_typos(rng, text, 1) for text in samples],
+            "two_typos": [add_typos(rng, text, 2) for text in samples],
+            "unseen": [make_sentence(rng, vocabulary) for _ in samples],
+        }
+        results = {}
+        for name, queries in scenarios.items():
+            results[name] = time_lookups(memory, queries)
+            result = results[name]
+            print(f"{name:<10} hit rate {result['hit_rate']:>6.1%}  p50 {result['latency_ms_p50']:>6.2f} ms  "
+                  f"p95 {result['latency_ms_p95']:>6.2f} ms  p99 {result['latency_ms_p99']:>6.2f} ms")
+        memory.close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"segments": segments, "fill_seconds": round(fill_seconds, 1), "config": vars(args),
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+SpeakEasy Translator core library
+Headless translation pipeline, usable without Streamlit
+
+Submodules are imported on first attribute access, so `import speakeasy` stays
+cheap and heavy dependencies (openai, requests, pyarrow) load only when used.
+"""
+
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "SpeakEasy": "core",
+    "TranslationPipeline": "translation_pipeline",
+    "create_pipeline": "translation_pipeline",
+    "TranslationBackend": "backends",
+    "create_backend": "backends",
+    "CulturalContextEngine": "cultural_context",
+    "TranslationCache": "translation_cache",
+    "TranslationMemory": "translation_memory",
+    "ConversationHistory": "history_store",
+    "SQLiteHistoryStore": "history_store",
+    "SessionStore": "session_store",
+    "MyMemoryClient": "mymemory_client",
+    "MyMemoryError": "mymemory_client",
+    "AIEnhancer": "ai_enhancement",
+    "RateLimiter": "rate_limiter",
+    "create_rate_limiter": "rate_limiter",
+    "METRICS": "metrics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
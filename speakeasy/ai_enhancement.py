@@ -0,0 +1,400 @@
+"""
+AI Enhancement Module for SpeakEasy Translator
+OpenAI GPT helpers for translation enhancement and dynamic cultural insights
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from .metrics import METRICS
+from .rate_limiter import RateLimiter, RateLimitExceeded, estimate_tokens
+from .resilience import CircuitBreaker, CircuitOpenError
+
+DEFAULT_MODEL = "gpt-3.5-turbo"  # Cheaper than GPT-4
+
+
+class AIEnhancementError(Exception):
+    """Raised when GPT can't provide a translation (only by the methods used as a translation backend)"""
+
+
+class AIEnhancer:
+    """
+    OpenAI-backed translation enhancer
+
+    The helpers never raise on an API problem but report it: without an API key (or
+    on any API error) the enhancement and the insight return None and the stream
+    raises AIEnhancementError, so that callers know nothing was enhanced. With a rate
+    limiter, requests that don't fit the shared OpenAI RPM/TPM budget fail the same
+    way (and are counted as 'rate_limited'). With a circuit breaker, an OpenAI outage
+    (timeouts, connection errors, 5xx) makes every method fail immediately instead of
+    waiting on a dead API (counted as 'short_circuited').
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_MODEL, base_url: Optional[str] = None,
+                 limiter: Optional[RateLimiter] = None, breaker: Optional[CircuitBreaker] = None,
+                 request_timeout: float = 20.0):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+        self.model = model
+        self.limiter = limiter
+        self.breaker = breaker
+        self.client = None
+        if self.api_key:
+            # OpenAI is optional (graceful fallback) and only imported when a key is set (~0.7 s)
+            try:
+                from openai import OpenAI
+                self.client = OpenAI(api_key=self.api_key, base_url=base_url, timeout=request_timeout)
+            except Exception:
+                self.client = None
+
+        self._lock = threading.Lock()
+        self._usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "rate_limited": 0,
+                       "errors": 0, "short_circuited": 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether AI enhancement can be used"""
+        return self.client is not None
+
+    def _record_usage(self, response) -> None:
+        """Add a completion's token usage to the counters"""
+        if self.breaker is not None:
+            self.breaker.record_success()
+        METRICS.inc("speakeasy_upstream_responses_total", provider="openai", status=200)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            METRICS.inc("speakeasy_openai_tokens_total", usage.prompt_tokens or 0, kind="prompt")
+            METRICS.inc("speakeasy_openai_tokens_total", usage.completion_tokens or 0, kind="completion")
+        with self._lock:
+            self._usage["requests"] += 1
+            if usage is not None:
+                self._usage["prompt_tokens"] += usage.prompt_tokens or 0
+                self._usage["completion_tokens"] += usage.completion_tokens or 0
+
+    def usage(self) -> Dict:
+        """Get request, token, rate-limit and error counters"""
+        with self._lock:
+            return dict(self._usage)
+
+    def _acquire(self, messages: list, max_tokens: int) -> bool:
+        """Reserve one request and its estimated tokens from the shared OpenAI budget, if the circuit allows it"""
+        # The circuit first: while it is open, no rate-limit or quota budget is spent on requests never sent
+        if self.breaker is not None:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                with self._lock:
+                    self._usage["short_circuited"] += 1
+                return False
+        if self.limiter is not None:
+            tokens = sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+            try:
+                self.limiter.acquire("openai", {"requests": 1, "tokens": tokens})
+            except RateLimitExceeded:
+                if self.breaker is not None:
+                    self.breaker.release()
+                with self._lock:
+                    self._usage["rate_limited"] += 1
+                return False
+        return True
+
+    def _parse_json(self, response, call: str) -> Optional[Dict]:
+        """Decode a JSON-mode completion (None, counted as an invalid response, unless it is an object)"""
+        try:
+            data = json.loads(response.choices[0].message.content)
+        except (AttributeError, IndexError, TypeError, ValueError):
+            data = None
+        if not isinstance(data, dict):
+            self._on_invalid_response(call)
+            return None
+        return data
+
+    def _on_invalid_response(self, call: str) -> None:
+        """Record a completion whose content can't be used (its HTTP response was already counted)"""
+        METRICS.inc("speakeasy_openai_invalid_responses_total", call=call)
+        with self._lock:
+            self._usage["errors"] += 1
+
+    def _on_error(self, error: Exception) -> None:
+        """Record a failed completion (circuit breaker, and limiter back-off on a 429)"""
+        status = getattr(error, "status_code", None)
+        METRICS.inc("speakeasy_upstream_responses_total", provider="openai", status=status or type(error).__name__)
+        with self._lock:
+            self._usage["errors"] += 1
+        if self.breaker is not None:
+            # Timeouts, connection errors and 5xx mean OpenAI is down; 4xx and bad JSON don't
+            outage = (status is None and type(error).__module__.startswith("openai")) or (status or 0) >= 500
+            if outage:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        if self.limiter is None or status != 429:
+            return
+        with self._lock:
+            self._usage["rate_limited"] += 1
+        retry_after = None
+        try:
+            retry_after = float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            pass
+        self.limiter.exhaust("openai", retry_after=retry_after if retry_after is not None else 1.0)
+
+    @staticmethod
+    def _enhancement_messages(text: str, translation: str, src_lang: str, dest_lang: str, mode: str) -> list:
+        """Build the chat messages asking GPT to improve a translation"""
+        prompt = f"""You are a professional translator. Improve this translation to be more natural and contextually appropriate.
+
+Original text ({src_lang}): {text}
+Current translation ({dest_lang}): {translation}
+Context: {mode}
+
+Provide ONLY the improved translation, nothing else. Keep it concise and natural."""
+
+        return [
+            {"role": "system", "content": "You are a professional translator. Respond only with the improved translation."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def translate(self, text: str, src_lang: str, dest_lang: str) -> str:
+        """
+        Translate text with GPT (used when OpenAI is the translation backend)
+
+        Raises:
+            AIEnhancementError: Unlike the enhancement helpers there is no fallback
+        """
+        return self.translate_batch([text], src_lang, dest_lang)[0]
+
+    def translate_batch(self, texts: list, src_lang: str, dest_lang: str) -> list:
+        """
+        Translate several segments in one JSON completion
+
+        Returns:
+            Translations in the order of `texts`
+
+        Raises:
+            AIEnhancementError: If GPT is unavailable, rate-limited, failing or returns the wrong count
+        """
+        if not self.available:
+            raise AIEnhancementError("OpenAI is not configured")
+
+        prompt = f"""Translate each segment from {src_lang} to {dest_lang}.
+
+Segments (JSON array): {json.dumps(texts, ensure_ascii=False)}
+
+Return a JSON object with one field "translations": an array with the translation of every segment, in the same order."""
+        messages = [
+            {"role": "system", "content": "You are a professional translator. Respond only with a JSON object."},
+            {"role": "user", "content": prompt}
+        ]
+        max_tokens = sum(len(text) for text in texts) // 2 + 50 * len(texts)
+        if not self._acquire(messages, max_tokens):
+            raise AIEnhancementError("OpenAI rate limit or circuit open")
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+            self._record_usage(response)
+        except Exception as e:
+            self._on_error(e)
+            raise AIEnhancementError(f"OpenAI translation failed: {e}") from e
+
+        # The response was counted as a success: a bad body is counted apart
+        translations = self._parse_json(response, "translate_batch")
+        translations = translations.get("translations") if translations is not None else None
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            if translations is not None:
+                self._on_invalid_response("translate_batch")
+            raise AIEnhancementError("OpenAI returned a malformed translation list")
+        return [str(translation).strip() for translation in translations]
+
+    def enhance_translation(self, text: str, translation: str, src_lang: str, dest_lang: str,
+                            mode: str) -> Optional[str]:
+        """Improve a translation with GPT (None if GPT is unavailable or failed)"""
+        messages = self._enhancement_messages(text, translation, src_lang, dest_lang, mode)
+        if not self.available or not self._acquire(messages, 200):
+            return None
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=200,
+                temperature=0.3
+            )
+            self._record_usage(response)
+
+            improved = response.choices[0].message.content.strip()
+            return improved if improved else None
+
+        except Exception as e:
+            # The caller keeps the original translation
+            self._on_error(e)
+            return None
+
+    def stream_enhancement(self, text: str, translation: str, src_lang: str, dest_lang: str, mode: str,
+                           stall_timeout: float = 5.0, deadline: float = 8.0) -> Iterator[str]:
+        """
+        Stream an improved translation from GPT
+
+        Args:
+            stall_timeout: Seconds without a new chunk after which the stream is abandoned
+            deadline: Seconds after which the whole stream is abandoned, however steadily it flows
+
+        Returns:
+            Iterator of the enhanced text accumulated so far; the last value is the final translation
+
+        Raises:
+            AIEnhancementError: If GPT is unavailable, or the stream failed, stalled, passed its
+                deadline or came back empty (the partials already yielded must then be discarded)
+        """
+        messages = self._enhancement_messages(text, translation, src_lang, dest_lang, mode)
+        if not self.available or not self._acquire(messages, 200):
+            raise AIEnhancementError("OpenAI is not configured, rate-limited or failing")
+
+        started = time.monotonic()
+        improved, usage_chunk = "", None
+        stream = timer = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=200,
+                temperature=0.3,
+                stream=True,
+                # The last chunk then carries the token usage
+                stream_options={"include_usage": True},
+                # The read timeout applies to every chunk, so a stalled stream raises
+                timeout=min(stall_timeout, deadline)
+            )
+            # Closing the stream at the deadline also interrupts a read waiting for the next chunk
+            timer = threading.Timer(max(0.0, deadline - (time.monotonic() - started)), stream.close)
+            timer.daemon = True
+            timer.start()
+            for chunk in stream:
+                if time.monotonic() - started > deadline:
+                    raise TimeoutError(f"no complete answer after {deadline:g}s")
+                if getattr(chunk, "usage", None) is not None:
+                    usage_chunk = chunk
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    improved += delta
+                    yield improved
+            if time.monotonic() - started > deadline:
+                raise TimeoutError(f"no complete answer after {deadline:g}s")
+            self._record_usage(usage_chunk)
+        except Exception as e:
+            if time.monotonic() - started > deadline and not isinstance(e, TimeoutError):
+                # Closed by the timer
+                e = TimeoutError(f"no complete answer after {deadline:g}s")
+            self._on_error(e)
+            raise AIEnhancementError(f"OpenAI stream failed: {e}") from e
+        finally:
+            # Also when the caller stops iterating early
+            if timer is not None:
+                timer.cancel()
+            if stream is not None:
+                stream.close()
+
+        improved = improved.strip()
+        if not improved:
+            raise AIEnhancementError("OpenAI returned an empty enhancement")
+        yield improved
+
+    def cultural_insight(self, text: str, src_lang: str, dest_lang: str, mode: str) -> Optional[str]:
+        """Generate one dynamic cultural insight with GPT (None if unavailable)"""
+        if not self.available:
+            return None
+
+        prompt = f"""As a cultural expert, provide ONE brief, specific cultural insight for this translation scenario.
+
+Text: "{text}"
+From: {src_lang} → To: {dest_lang}
+Context: {mode}
+
+Provide a single, practical cultural tip (max 2 sentences). Be specific and actionable."""
+        messages = [
+            {"role": "system", "content": "You are a cross-cultural communication expert. Provide brief, actionable insights."},
+            {"role": "user", "content": prompt}
+        ]
+        if not self._acquire(messages, 100):
+            return None
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=100,
+                temperature=0.7
+            )
+            self._record_usage(response)
+
+            insight = response.choices[0].message.content.strip()
+            return insight if insight else None
+
+        except Exception as e:
+            self._on_error(e)
+            return None
+
+    def enhance_with_insight(self, text: str, translation: str, src_lang: str, dest_lang: str,
+                             mode: str) -> Optional[Dict]:
+        """
+        Improve a translation and generate a cultural insight in one JSON completion
+
+        Each field is checked on its own: a missing or invalid field is None.
+
+        Returns:
+            Dictionary with 'translation' and 'insight' (each None if unusable), or None if GPT is
+            unavailable, rate-limited or failed, or returned no JSON object
+        """
+        if not self.available:
+            return None
+
+        prompt = f"""You are a professional translator and cross-cultural communication expert.
+
+Original text ({src_lang}): {text}
+Current translation ({dest_lang}): {translation}
+Context: {mode}
+
+Return a JSON object with two string fields:
+- "translation": the current translation improved to be more natural and contextually appropriate (translation only, concise)
+- "insight": ONE practical, specific cultural tip for this scenario (max 2 sentences)"""
+        messages = [
+            {"role": "system", "content": "You are a professional translator and cultural expert. Respond only with a JSON object."},
+            {"role": "user", "content": prompt}
+        ]
+        if not self._acquire(messages, 300):
+            return None
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=300,
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+            self._record_usage(response)
+        except Exception as e:
+            self._on_error(e)
+            return None
+
+        data = self._parse_json(response, "enhance_with_insight")
+        if data is None:
+            return None
+        result = {"translation": None, "insight": None}
+        improved = data.get("translation")
+        if isinstance(improved, str) and improved.strip():
+            result["translation"] = improved.strip()
+        insight = data.get("insight")
+        if isinstance(insight, str) and insight.strip():
+            result["insight"] = insight.strip()
+        return result
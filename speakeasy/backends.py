@@ -0,0 +1,144 @@
+"""
+Translation Backends Module for SpeakEasy Translator
+Common interface over the translation providers (MyMemory, OpenAI)
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol, runtime_checkable
+
+from .ai_enhancement import AIEnhancer
+from .mymemory_client import MyMemoryClient
+from .rate_limiter import estimate_tokens
+from .segmentation import DEFAULT_MAX_BYTES
+from .translation_memory import TranslationMemory
+
+# USD per 1K tokens (gpt-3.5-turbo list prices)
+OPENAI_PRICES = {"input": 0.0005, "output": 0.0015}
+
+# Tokens of the batch translation prompt around the segments
+OPENAI_PROMPT_TOKENS = 60
+
+
+@runtime_checkable
+class TranslationBackend(Protocol):
+    """
+    What the pipeline needs from a translation provider
+
+    translate() raises on failure (the pipeline has no translation to fall back on).
+    """
+
+    name: str
+
+    def translate(self, text: str, src_lang: str, dest_lang: str) -> str:
+        """Translate one segment"""
+
+    def translate_batch(self, texts: List[str], src_lang: str, dest_lang: str) -> List[str]:
+        """Translate several segments, in order"""
+
+    def capabilities(self) -> Dict:
+        """
+        Describe the provider
+
+        Returns:
+            Dictionary with 'batch' (translate_batch sends one request), 'max_bytes' (UTF-8 size
+            of one request), 'max_batch' (segments per translate_batch request) and 'quota_unit'
+            ('chars' or 'tokens', the rate-limiter bucket the provider's requests draw from)
+        """
+
+    def cost(self, texts: List[str]) -> Dict:
+        """
+        Estimate what translating segments costs (translate_batch in requests of 'max_batch')
+
+        Returns:
+            Dictionary with 'provider' (the backend name), 'requests', 'quota' (units of 'quota_unit'
+            taken from the provider's quota), 'quota_unit', 'daily' (whether that quota is a daily
+            cap) and 'usd'
+        """
+
+
+class MyMemoryBackend:
+    """MyMemory (free, character quota, one segment per request)"""
+
+    name = "mymemory"
+
+    def __init__(self, client: Optional[MyMemoryClient] = None, batch_concurrency: int = 4,
+                 memory: Optional[TranslationMemory] = None):
+        self.client = client if client is not None else MyMemoryClient()
+        self.batch_concurrency = batch_concurrency
+        self.memory = memory
+
+    def translate(self, text: str, src_lang: str, dest_lang: str) -> str:
+        result = self.client.translate(text, src_lang, dest_lang)
+        # The other translation-memory matches returned with the response seed the local memory
+        if self.memory is not None and result["matches"]:
+            self.memory.add_matches(result["matches"], src_lang, dest_lang)
+        return result["translation"]
+
+    def translate_batch(self, texts: List[str], src_lang: str, dest_lang: str) -> List[str]:
+        # No batch endpoint: fan out over the pooled connections
+        with ThreadPoolExecutor(max_workers=self.batch_concurrency) as executor:
+            return list(executor.map(lambda text: self.translate(text, src_lang, dest_lang), texts))
+
+    def capabilities(self) -> Dict:
+        return {"batch": False, "max_bytes": DEFAULT_MAX_BYTES, "max_batch": 1, "quota_unit": "chars"}
+
+    def cost(self, texts: List[str]) -> Dict:
+        # Free, but every character counts against the daily quota
+        return {"provider": self.name, "requests": len(texts), "quota": sum(len(text) for text in texts), "quota_unit": "chars",
+                "daily": True, "usd": 0.0}
+
+
+class OpenAIBackend:
+    """OpenAI chat completions used as the translator (paid, token limits, native batching)"""
+
+    name = "openai"
+
+    def __init__(self, enhancer: Optional[AIEnhancer] = None):
+        self.enhancer = enhancer if enhancer is not None else AIEnhancer()
+
+    def translate(self, text: str, src_lang: str, dest_lang: str) -> str:
+        return self.enhancer.translate(text, src_lang, dest_lang)
+
+    def translate_batch(self, texts: List[str], src_lang: str, dest_lang: str) -> List[str]:
+        return self.enhancer.translate_batch(texts, src_lang, dest_lang)
+
+    def capabilities(self) -> Dict:
+        return {"batch": True, "max_bytes": 4000, "max_batch": 20, "quota_unit": "tokens"}
+
+    def cost(self, texts: List[str]) -> Dict:
+        max_batch = self.capabilities()["max_batch"]
+        requests = input_tokens = output_tokens = 0
+        for start in range(0, len(texts), max_batch):
+            batch = texts[start:start + max_batch]
+            # Prompt around the JSON array of segments, and about as many tokens back
+            requests += 1
+            input_tokens += OPENAI_PROMPT_TOKENS + estimate_tokens(json.dumps(batch, ensure_ascii=False))
+            output_tokens += estimate_tokens(json.dumps({"translations": batch}, ensure_ascii=False))
+        usd = (input_tokens * OPENAI_PRICES["input"] + output_tokens * OPENAI_PRICES["output"]) / 1000
+        return {"provider": self.name, "requests": requests, "quota": input_tokens + output_tokens, "quota_unit": "tokens",
+                "daily": False, "usd": usd}
+
+
+BACKENDS = {"mymemory": MyMemoryBackend, "openai": OpenAIBackend}
+
+
+def create_backend(name: Optional[str] = None, client: Optional[MyMemoryClient] = None,
+                   enhancer: Optional[AIEnhancer] = None,
+                   memory: Optional[TranslationMemory] = None) -> TranslationBackend:
+    """
+    Build a backend by name
+
+    Args:
+        name: 'mymemory' or 'openai' (default: SPEAKEASY_BACKEND, then 'mymemory')
+        client: MyMemory client for the MyMemory backend
+        enhancer: AI enhancer for the OpenAI backend
+        memory: Translation memory the MyMemory backend seeds with its matches
+    """
+    name = (name or os.getenv("SPEAKEASY_BACKEND") or "mymemory").lower()
+    if name == "mymemory":
+        return MyMemoryBackend(client, memory=memory)
+    if name == "openai":
+        return OpenAIBackend(enhancer)
+    raise ValueError(f"Unknown translation backend: {name} (expected {', '.join(BACKENDS)})")
@@ -0,0 +1,396 @@
+"""
+Batch Translation Module for SpeakEasy Translator
+Translates CSV / TXT / JSONL files of segments with bounded concurrency,
+streaming results to disk and checkpointing so interrupted jobs can resume
+
+Usage:
+    python -m speakeasy.batch_translate phrases.csv -o phrases_fr.jsonl --src en --dest fr
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .mymemory_client import MyMemoryQuotaError
+from .rate_limiter import BATCH, request_priority
+
+INPUT_FORMATS = ("csv", "txt", "jsonl")
+OUTPUT_FORMATS = ("csv", "jsonl")
+OUTPUT_FIELDS = ["index", "original", "translation", "error"]
+
+
+def detect_format(path: str) -> str:
+    """Get the file format from its extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "ndjson":
+        extension = "jsonl"
+    if extension not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported file format: .{extension} (expected {', '.join(INPUT_FORMATS)})")
+    return extension
+
+
+def read_segments(path: str, file_format: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Stream segments from a file
+
+    Args:
+        path: Input file
+        file_format: 'csv' (a 'text' column, or the first column), 'txt' (one segment
+            per line) or 'jsonl' (a 'text' field); detected from the extension if omitted
+
+    Returns:
+        Iterator of (index, text) tuples; blank segments are skipped but keep their index stable
+    """
+    file_format = file_format or detect_format(path)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format == "csv":
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            lowered = [column.strip().lower() for column in header]
+            column = lowered.index("text") if "text" in lowered else 0
+            rows = (row[column] if len(row) > column else "" for row in reader)
+        elif file_format == "jsonl":
+            rows = (_jsonl_text(line) for line in f if line.strip())
+        else:
+            rows = (line.rstrip("\r\n") for line in f)
+
+        index = 0
+        for text in rows:
+            if text and text.strip():
+                yield index, text
+                index += 1
+
+
+def _jsonl_text(line: str) -> str:
+    """Get the text of a JSONL record"""
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return str(record.get("text", ""))
+    return str(record)
+
+
+class BatchJob:
+    """
+    Resumable batch translation job
+
+    Results are appended to the output file as they finish (in completion order,
+    each with its input index). Every `checkpoint_every` segments the output is
+    flushed to disk and its size recorded in a checkpoint file; a rerun with the
+    same arguments (including whether AI is enabled) truncates the output back to the last checkpoint and skips every
+    segment already written.
+
+    With a batching backend (pipeline.batching), segments are grouped by
+    `pipeline.batch_size` and their base translations prefetched in one request
+    per group; each segment then goes through the pipeline on its own worker.
+    """
+
+    def __init__(self, pipeline, input_path: str, output_path: str, src_lang: str, dest_lang: str,
+                 mode: str = "casual", concurrency: int = 8, ai_enabled: bool = False,
+                 checkpoint_every: int = 100):
+        self.pipeline = pipeline
+        self.input_path = input_path
+        self.output_path = output_path
+        self.output_format = "csv" if output_path.lower().endswith(".csv") else "jsonl"
+        self.checkpoint_path = output_path + ".checkpoint.json"
+        self.src_lang = src_lang
+        self.dest_lang = dest_lang
+        self.mode = mode
+        self.concurrency = max(1, concurrency)
+        self.ai_enabled = ai_enabled
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.stats = {"done": 0, "failed": 0, "skipped": 0, "elapsed": 0.0, "segments_per_sec": 0.0}
+
+    def run(self, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Run (or resume) the job
+
+        Args:
+            on_progress: Called from the calling thread with the stats after each write
+
+        Returns:
+            Final stats ('done', 'failed', 'skipped', 'elapsed', 'segments_per_sec')
+
+        Raises:
+            MyMemoryQuotaError: If the daily quota runs out (the job can be resumed later)
+        """
+        completed, offset = self._resume()
+        started = time.monotonic()
+
+        with open(self.output_path, "a", newline="", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="speakeasy-batch") as executor:
+            writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS) if self.output_format == "csv" else None
+            if writer is not None and offset == 0:
+                writer.writeheader()
+
+            in_flight = {}
+            since_checkpoint = 0
+            group_size = self.pipeline.batch_size if self.pipeline.batching else 1
+            group = []
+            try:
+                for index, text in read_segments(self.input_path):
+                    if index in completed:
+                        self.stats["skipped"] += 1
+                        continue
+                    group.append((index, text))
+                    if len(group) < group_size:
+                        continue
+                    # Bounded window: never read much further ahead than what is being translated
+                    while len(in_flight) >= self.concurrency * 2:
+                        since_checkpoint += self._drain(in_flight, out, writer, started, on_progress)
+                        if since_checkpoint >= self.checkpoint_every:
+                            self._checkpoint(out)
+                            since_checkpoint = 0
+                    self._submit_group(executor, in_flight, group)
+                    group = []
+                if group:
+                    self._submit_group(executor, in_flight, group)
+
+                while in_flight:
+                    since_checkpoint += self._drain(in_flight, out, writer, started, on_progress)
+                    if since_checkpoint >= self.checkpoint_every:
+                        self._checkpoint(out)
+                        since_checkpoint = 0
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                self._checkpoint(out)
+
+        return dict(self.stats)
+
+    def _submit_group(self, executor: ThreadPoolExecutor, in_flight: Dict, group: List[Tuple[int, str]]) -> None:
+        """
+        Submit one task per segment, after a task prefetching the group's base translations
+
+        The prefetch is queued ahead of its segments, so a segment task never waits on a
+        prefetch that no worker has picked up; each segment then runs its AI stages on its
+        own worker, and `concurrency` still bounds the segments in flight.
+        """
+        prefetched = None
+        if len(group) > 1:
+            prefetched = executor.submit(self._prefetch, [text for _, text in group])
+        for index, text in group:
+            in_flight[executor.submit(self._translate_one, text, prefetched)] = (index, text)
+
+    def _prefetch(self, texts: List[str]) -> None:
+        """Fetch the base translations of a group in batched requests (behind interactive requests)"""
+        with request_priority(BATCH):
+            self.pipeline.prefetch(texts, self.src_lang, self.dest_lang, self.mode)
+
+    def _translate_one(self, text: str, prefetched: Optional[Future] = None) -> str:
+        """Translate one segment through the pipeline (behind interactive requests for the shared quotas)"""
+        if prefetched is not None:
+            # Its base translation is then a cache hit
+            prefetched.result()
+        with request_priority(BATCH):
+            return self.pipeline.translate(text, self.src_lang, self.dest_lang, self.mode,
+                                           ai_enabled=self.ai_enabled)["translation"]
+
+    def _drain(self, in_flight: Dict, out, writer, started: float, on_progress) -> int:
+        """Write every finished segment, waiting for at least one"""
+        finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        for future in finished:
+            index, text = in_flight.pop(future)
+            row = {"index": index, "original": text, "translation": "", "error": ""}
+            try:
+                row["translation"] = future.result()
+                self.stats["done"] += 1
+            except MyMemoryQuotaError:
+                # Leave the segment unwritten so a resumed job retries it
+                raise
+            except Exception as e:
+                row["error"] = str(e)
+                self.stats["failed"] += 1
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        elapsed = time.monotonic() - started
+        self.stats["elapsed"] = elapsed
+        self.stats["segments_per_sec"] = (self.stats["done"] + self.stats["failed"]) / elapsed if elapsed else 0.0
+        if on_progress is not None:
+            on_progress(dict(self.stats))
+        return len(finished)
+
+    def _checkpoint(self, out) -> None:
+        """Flush the output to disk and record how much of it is complete"""
+        out.flush()
+        os.fsync(out.fileno())
+        state = {
+            "input": os.path.abspath(self.input_path),
+            "src_lang": self.src_lang,
+            "dest_lang": self.dest_lang,
+            "mode": self.mode,
+            "ai_enabled": self.ai_enabled,
+            "offset": out.tell(),
+            "updated_at": time.time(),
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        """
+        Read the checkpoint of this job
+
+        Returns:
+            The checkpoint state, or None if the job has not started (or lost its output)
+
+        Raises:
+            ValueError: If the checkpoint belongs to a job with other arguments
+        """
+        if not os.path.exists(self.checkpoint_path) or not os.path.exists(self.output_path):
+            return None
+
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        # AI-enhanced and plain rows must not end up in the same file
+        job = (os.path.abspath(self.input_path), self.src_lang, self.dest_lang, self.mode, self.ai_enabled)
+        if (state.get("input"), state.get("src_lang"), state.get("dest_lang"), state.get("mode"),
+                state.get("ai_enabled")) != job:
+            raise ValueError(f"{self.checkpoint_path} belongs to another job; remove it to start over")
+        return state
+
+    def _completed(self, offset: int) -> set:
+        """Collect the indices written in the first `offset` bytes of the output"""
+        with open(self.output_path, "rb") as f:
+            lines = f.read(offset).decode("utf-8").splitlines(keepends=True)
+        if self.output_format == "csv":
+            return {int(row["index"]) for row in csv.DictReader(lines)}
+        return {json.loads(line)["index"] for line in lines}
+
+    def _resume(self) -> Tuple[set, int]:
+        """Restore the output to the last checkpoint and collect the indices already written"""
+        state = self._load_checkpoint()
+        if state is None:
+            open(self.output_path, "w").close()
+            return set(), 0
+
+        offset = state.get("offset", 0)
+        with open(self.output_path, "r+b") as f:
+            f.truncate(offset)
+        return self._completed(offset), offset
+
+    def estimate(self) -> Optional[Dict]:
+        """
+        Estimate what the segments left to translate cost the backend, before running the job
+
+        An upper bound: segments found in the cache or the translation memory cost nothing,
+        and the AI enhancement (if enabled) is not included.
+
+        Returns:
+            The backend's cost estimate (see TranslationBackend.cost) plus 'segments', or None if
+            the pipeline has no cost model
+
+        Raises:
+            ValueError: If the checkpoint belongs to a job with other arguments
+        """
+        if self.pipeline.estimate_cost is None:
+            return None
+        state = self._load_checkpoint()
+        completed = self._completed(state.get("offset", 0)) if state is not None else set()
+
+        # Whole batches per chunk, so the request counts of the chunks add up
+        chunk_size = self.pipeline.batch_size * 50
+        total, chunk = None, []
+        for index, text in read_segments(self.input_path):
+            if index in completed:
+                continue
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                total = self._add_cost(total, chunk)
+                chunk = []
+        if chunk or total is None:
+            total = self._add_cost(total, chunk)
+        return total
+
+    def _add_cost(self, total: Optional[Dict], texts: List[str]) -> Dict:
+        """Add the estimated cost of some segments to a running total"""
+        cost = self.pipeline.estimate_cost(texts)
+        if total is None:
+            return dict(cost, segments=len(texts))
+        for key in ("requests", "quota", "usd"):
+            total[key] += cost[key]
+        total["segments"] += len(texts)
+        return total
+
+def describe_estimate(estimate: Dict, limits: Optional[Dict] = None) -> str:
+    """
+    Summarize a BatchJob.estimate() in one line
+
+    Args:
+        limits: RateLimiter.stats(), to compare a daily quota with what is left of it
+    """
+    line = (f"Estimated cost: up to {estimate['segments']:,} segments in {estimate['requests']:,} "
+            f"{estimate['provider']} requests, {estimate['quota']:,} {estimate['quota_unit']}")
+    if estimate["usd"]:
+        line += f", ${estimate['usd']:.4f}"
+    bucket = ((limits or {}).get(estimate["provider"]) or {}).get("buckets", {}).get(estimate["quota_unit"])
+    if estimate["daily"] and bucket is not None:
+        line += f" ({bucket['available']:,.0f} left today)"
+        if estimate["quota"] > bucket["available"]:
+            line += " - the job will stop when the quota runs out and can be resumed later"
+    return line
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="SpeakEasy batch translation")
+    parser.add_argument("input", help="CSV, TXT or JSONL file of segments")
+    parser.add_argument("-o", "--output", help="Output file (.jsonl or .csv, default: <input>.<dest>.jsonl)")
+    parser.add_argument("--src", default="en", help="Source language code")
+    parser.add_argument("--dest", default="fr", help="Target language code")
+    parser.add_argument("--mode", default="casual", choices=["casual", "business", "travel", "academic"])
+    parser.add_argument("--concurrency", type=int, default=8, help="Segments translated at the same time")
+    parser.add_argument("--ai", action="store_true", help="Enable OpenAI enhancement (needs OPENAI_API_KEY)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Segments between checkpoints")
+    parser.add_argument("--estimate", action="store_true", help="Only print the estimated cost and exit")
+    args = parser.parse_args(argv)
+
+    from .rate_limiter import create_rate_limiter
+    from .translation_cache import TranslationCache
+    from .translation_pipeline import create_pipeline
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}.{args.dest}.jsonl"
+    limiter = create_rate_limiter()
+    pipeline = create_pipeline(cache=TranslationCache(), limiter=limiter)
+    job = BatchJob(pipeline, args.input, output, args.src, args.dest, args.mode,
+                   concurrency=args.concurrency, ai_enabled=args.ai, checkpoint_every=args.checkpoint_every)
+
+    def report(stats):
+        sys.stderr.write(
+            f"\r{stats['done']} translated, {stats['failed']} failed, {stats['skipped']} resumed "
+            f"({stats['segments_per_sec']:.1f} segments/s)"
+        )
+
+    try:
+        # Pre-flight: what the job will take from the backend's quota (or budget)
+        estimate = job.estimate()
+        if estimate is not None:
+            sys.stderr.write(describe_estimate(estimate, limiter.stats()) + "\n")
+        if args.estimate:
+            return 0
+        stats = job.run(on_progress=report)
+    except MyMemoryQuotaError as e:
+        sys.stderr.write(f"\nStopped: {e}\nRun the same command again to resume.\n")
+        return 2
+    except KeyboardInterrupt:
+        sys.stderr.write("\nInterrupted - run the same command again to resume.\n")
+        return 130
+    finally:
+        pipeline.shutdown()
+
+    sys.stderr.write(f"\nDone in {stats['elapsed']:.1f}s -> {output}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
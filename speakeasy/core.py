@@ -0,0 +1,134 @@
+"""
+Core Module for SpeakEasy Translator
+Headless translator wiring the pipeline, quotas, cache, cultural engine and history
+"""
+
+import os
+import sqlite3
+from typing import Callable, Dict, Optional
+
+from .ai_enhancement import AIEnhancer
+from .cultural_context import CulturalContextEngine
+from .history_store import DEFAULT_HISTORY_PATH, SQLiteHistoryStore
+from .metrics import METRICS
+from .mymemory_client import MyMemoryClient
+from .rate_limiter import RateLimiter, create_rate_limiter
+from .resilience import CircuitBreaker
+from .translation_cache import DEFAULT_CACHE_PATH, TranslationCache
+from .translation_memory import DEFAULT_MEMORY_PATH, DEFAULT_THRESHOLD, TranslationMemory
+from .translation_pipeline import create_pipeline
+
+
+class SpeakEasy:
+    """
+    Everything a translation needs, without Streamlit
+
+    One instance is meant to be shared by a whole process (the Streamlit app, the
+    HTTP service, workers): the cache, quotas, circuit breakers and connection
+    pools only help if every request goes through the same ones.
+    """
+
+    def __init__(self, openai_api_key: Optional[str] = None, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 history_path: Optional[str] = DEFAULT_HISTORY_PATH, single_call: Optional[bool] = None,
+                 hedge: Optional[bool] = None, limiter: Optional[RateLimiter] = None,
+                 memory_path: Optional[str] = DEFAULT_MEMORY_PATH, memory_threshold: float = DEFAULT_THRESHOLD,
+                 **pipeline_options):
+        """
+        Args:
+            openai_api_key: OpenAI key (default: OPENAI_API_KEY; AI stages are skipped without one)
+            cache_path: SQLite file of the translation cache (None keeps it in memory)
+            history_path: SQLite file of the history (None disables the durable history)
+            single_call: One OpenAI completion for enhancement + insight (default: SPEAKEASY_SINGLE_LLM_CALL=1)
+            hedge: Hedged MyMemory requests (default: SPEAKEASY_HEDGE_MYMEMORY=1)
+            limiter: Provider quotas (default: the full free-tier limits)
+            memory_path: SQLite file of the translation memory (None keeps it in memory)
+            memory_threshold: Similarity from which a stored segment is reused (default 1: exact matches only)
+            **pipeline_options: Extra TranslationPipeline options (timeouts, concurrency)
+        """
+        if single_call is None:
+            single_call = os.getenv("SPEAKEASY_SINGLE_LLM_CALL", "") == "1"
+        if hedge is None:
+            hedge = os.getenv("SPEAKEASY_HEDGE_MYMEMORY", "") == "1"
+
+        self.limiter = limiter if limiter is not None else create_rate_limiter()
+        self.cache = TranslationCache(cache_path)
+        self.client = MyMemoryClient(limiter=self.limiter, breaker=CircuitBreaker("MyMemory"), hedge=hedge)
+        self.enhancer = AIEnhancer(api_key=openai_api_key, limiter=self.limiter, breaker=CircuitBreaker("OpenAI"))
+        self.memory = TranslationMemory(memory_path, threshold=memory_threshold)
+        self.pipeline = create_pipeline(client=self.client, enhancer=self.enhancer, cache=self.cache,
+                                        memory=self.memory, single_call=single_call, **pipeline_options)
+        self.cultural_engine = CulturalContextEngine()
+        self.history_store = None
+        if history_path:
+            try:
+                self.history_store = SQLiteHistoryStore(history_path)
+            except (OSError, sqlite3.Error):
+                self.history_store = None
+
+    @property
+    def ai_available(self) -> bool:
+        """Whether the OpenAI stages can run"""
+        return self.enhancer.available
+
+    def translate(self, text: str, src_lang: str, dest_lang: str, mode: str, history=None,
+                  ai_enabled: Optional[bool] = None, on_partial: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Translate text with its cultural context (one traced request)
+
+        Args:
+            history: ConversationHistory / SessionHistory to append the translation to
+            ai_enabled: Run the OpenAI stages (default: whenever OpenAI is available)
+            on_partial: Called with the base translation, then with the streamed enhancement
+
+        Returns:
+            Dictionary with 'translation', 'base', 'insight', 'cultural_context', 'memory_match'
+            (translation-memory similarity when the base was reused locally), 'cached',
+            'coalesced' and 'timed_out'
+
+        Raises:
+            MyMemoryError: If no base translation could be fetched
+        """
+        if ai_enabled is None:
+            ai_enabled = self.ai_available
+
+        # Each stage is a span; the whole call is one trace
+        with METRICS.trace("translate_text", src=src_lang, dest=dest_lang, mode=mode) as trace:
+            with METRICS.span("pipeline"):
+                result = self.pipeline.translate(text, src_lang, dest_lang, mode,
+                                                 ai_enabled=ai_enabled, on_partial=on_partial)
+            trace["cached"] = result["cached"]
+
+            with METRICS.span("cultural_lookup"):
+                cultural_context = self.cultural_engine.get_context_for_conversation(src_lang, dest_lang, mode)
+
+            # Copy before adding the insight: the precomputed context is shared
+            if result["insight"] and cultural_context:
+                cultural_context = dict(cultural_context)
+                cultural_context["tips"] = (f"AI Insight: {result['insight']}",) + tuple(cultural_context.get("tips", ()))
+
+            if history is not None:
+                with METRICS.span("history_append"):
+                    history.append(text, result["translation"], src_lang, dest_lang, mode)
+
+        return {
+            "translation": result["translation"],
+            "base": result["base"],
+            "insight": result["insight"],
+            "cultural_context": cultural_context,
+            "memory_match": result.get("memory_match"),
+            "cached": result["cached"],
+            "coalesced": result.get("coalesced", False),
+            "timed_out": result["timed_out"],
+        }
+
+    def history(self, session_id: str):
+        """Durable history of one session (None if the history store is disabled)"""
+        return self.history_store.session(session_id) if self.history_store is not None else None
+
+    def close(self) -> None:
+        """Stop worker threads, flush the history and close connections"""
+        self.pipeline.shutdown()
+        self.client.close()
+        self.memory.close()
+        if self.history_store is not None:
+            self.history_store.close()
@@ -0,0 +1,471 @@
+"""
+Cultural Context Module for SpeakEasy Translator
+Provides cultural insights, etiquette tips, and contextual information
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from .cultural_search import SEARCH_INDEX_FILE, CulturalSearchIndex, fingerprint
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively convert a JSON-like structure to immutable containers
+    
+    Dicts become read-only mappings, lists become tuples and strings are interned,
+    so a single instance can be shared safely by every session and thread.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(k): freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Convert a frozen structure back to plain dicts and lists (e.g. for JSON)"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# Conversation modes with precomputed insights
+CONVERSATION_MODES = ("casual", "business", "travel", "academic")
+
+# Language codes used by the app or by translation APIs that differ from the database keys
+LANGUAGE_ALIASES = {
+    "zh-cn": "zh", "zh-tw": "zh", "zh-hk": "zh", "zh-sg": "zh", "zh-hans": "zh", "zh-hant": "zh",
+    "cmn": "zh", "yue": "zh",
+    "pt-br": "pt", "pt-pt": "pt",
+    "iw": "he", "in": "id", "ji": "yi", "jw": "jv", "nb": "no", "nn": "no",
+    "fil": "tl",
+}
+
+
+def normalize_language_code(language_code: str) -> str:
+    """
+    Canonicalize a language code
+    
+    Lowercases, accepts '_' as separator and resolves aliases; other regional
+    variants ('fr-CA', 'es_MX') fall back to their primary language.
+    """
+    code = language_code.strip().lower().replace("_", "-")
+    if code in LANGUAGE_ALIASES:
+        return LANGUAGE_ALIASES[code]
+    return code.split("-", 1)[0]
+
+
+# On-disk database: cultural_data/index.json lists every culture, one JSON file per language
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cultural_data")
+SCHEMA_VERSION = 1
+
+# Expected shape of a culture file (field -> type, or nested schema)
+CULTURE_SCHEMA = {
+    "name": str,
+    "greetings": {"formal": [str], "informal": [str], "tips": str},
+    "business": {"etiquette": str, "tips": str},
+    "taboos": [str],
+    "gestures": {"positive": str, "negative": str},
+    "dining": str,
+}
+REQUIRED_FIELDS = ("schema_version", "code", "version", "name")
+
+
+class CulturalDataError(ValueError):
+    """Raised when a cultural data file is missing or doesn't match the schema"""
+
+
+def _check_schema(value: Any, schema: Any, path: str, errors: List[str]) -> None:
+    """Collect schema violations of value against schema"""
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return
+        for key, item in value.items():
+            if key in schema:
+                _check_schema(item, schema[key], f"{path}.{key}", errors)
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected a list")
+            return
+        for i, item in enumerate(value):
+            _check_schema(item, schema[0], f"{path}[{i}]", errors)
+    elif not isinstance(value, schema):
+        errors.append(f"{path}: expected {schema.__name__}")
+
+
+def validate_culture(data: Any, language_code: Optional[str] = None) -> List[str]:
+    """
+    Validate a culture document against the schema
+    
+    Args:
+        data: Decoded culture file
+        language_code: Expected 'code' field (optional)
+    
+    Returns:
+        List of error messages (empty if valid)
+    """
+    if not isinstance(data, dict):
+        return ["culture: expected an object"]
+    errors = [f"culture: missing '{field}'" for field in REQUIRED_FIELDS if field not in data]
+    if data.get("schema_version") not in (None, SCHEMA_VERSION):
+        errors.append(f"culture: unsupported schema_version {data.get('schema_version')}")
+    if language_code is not None and "code" in data and data["code"] != language_code:
+        errors.append(f"culture: code '{data['code']}' doesn't match '{language_code}'")
+    _check_schema(data, CULTURE_SCHEMA, "culture", errors)
+    return errors
+
+
+def validate_data_dir(data_dir: str = DEFAULT_DATA_DIR) -> Dict[str, List[str]]:
+    """
+    Validate the index and every culture file of a data directory
+    
+    Returns:
+        Errors per file (only files with errors are listed)
+    """
+    problems = {}
+    try:
+        index = _read_index(data_dir)
+    except CulturalDataError as e:
+        return {"index.json": [str(e)]}
+    for language_code, entry in index.items():
+        try:
+            with open(os.path.join(data_dir, entry["file"]), encoding="utf-8") as f:
+                errors = validate_culture(json.load(f), language_code)
+        except (OSError, ValueError) as e:
+            errors = [str(e)]
+        if errors:
+            problems[entry["file"]] = errors
+    return problems
+
+
+def _read_index(data_dir: str) -> Dict[str, Dict]:
+    """Read and check the database index"""
+    path = os.path.join(data_dir, "index.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CulturalDataError(f"Can't read {path}: {e}") from e
+    if not isinstance(index, dict) or index.get("schema_version") != SCHEMA_VERSION:
+        raise CulturalDataError(f"{path}: unsupported schema_version {index.get('schema_version')!r}")
+    languages = index.get("languages")
+    if not isinstance(languages, dict) or not all(
+        isinstance(entry, dict) and isinstance(entry.get("file"), str) for entry in languages.values()
+    ):
+        raise CulturalDataError(f"{path}: 'languages' must map codes to {{'name', 'file'}} entries")
+    return languages
+
+
+class CultureStore(Mapping):
+    """
+    Read-only, lazily loaded view of the cultural database
+    
+    Only the index is read up front. Each culture file is loaded, validated and
+    frozen on first access, then kept in a bounded LRU (together with anything
+    derived from it), so startup time and memory don't grow with the number of
+    cultures.
+    """
+    
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, max_loaded: int = 64,
+                 on_load: Optional[Callable[[str, Mapping], Any]] = None):
+        """
+        Args:
+            data_dir: Directory holding index.json and the culture files
+            max_loaded: Maximum number of cultures kept in memory
+            on_load: Optional on_load(language_code, culture) -> derived data cached with the culture
+        """
+        self.data_dir = data_dir
+        self.max_loaded = max_loaded
+        self.on_load = on_load
+        self._index = _read_index(data_dir)
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, language_code: str) -> Mapping:
+        return self._entry(language_code)[0]
+    
+    def __contains__(self, language_code: object) -> bool:
+        return language_code in self._index
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def name(self, language_code: str) -> str:
+        """Get a culture's name from the index (without loading it)"""
+        return self._index[language_code].get("name", language_code.upper())
+    
+    def derived(self, language_code: str) -> Any:
+        """Get the data computed by on_load for a culture"""
+        return self._entry(language_code)[1]
+    
+    def read(self, language_code: str) -> Mapping:
+        """Read a culture without keeping it in memory (e.g. to index it)"""
+        if language_code not in self._index:
+            raise KeyError(language_code)
+        return self._load(language_code)
+    
+    def paths(self) -> List[str]:
+        """Get the culture files, in index order"""
+        return [os.path.join(self.data_dir, entry["file"]) for entry in self._index.values()]
+    
+    def loaded_languages(self) -> List[str]:
+        """Get the languages currently held in memory"""
+        with self._lock:
+            return list(self._loaded)
+    
+    def _entry(self, language_code: str) -> tuple:
+        """Get (culture, derived) from the LRU, loading the file on a miss"""
+        with self._lock:
+            entry = self._loaded.get(language_code)
+            if entry is not None:
+                self._loaded.move_to_end(language_code)
+                return entry
+        
+        if language_code not in self._index:
+            raise KeyError(language_code)
+        culture = self._load(language_code)
+        entry = (culture, self.on_load(language_code, culture) if self.on_load else None)
+        
+        with self._lock:
+            self._loaded[language_code] = entry
+            self._loaded.move_to_end(language_code)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return entry
+    
+    def _load(self, language_code: str) -> Mapping:
+        """Read, validate and freeze one culture file"""
+        path = os.path.join(self.data_dir, self._index[language_code]["file"])
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CulturalDataError(f"Can't read {path}: {e}") from e
+        errors = validate_culture(data, language_code)
+        if errors:
+            raise CulturalDataError(f"{path}: " + "; ".join(errors))
+        for field in REQUIRED_FIELDS:
+            if field != "name":
+                data.pop(field, None)
+        return freeze(data)
+
+
+def build_search_index(store: CultureStore) -> CulturalSearchIndex:
+    """Index every culture of a store, reading them one at a time without caching them"""
+    return CulturalSearchIndex((code, store.read(code)) for code in store)
+
+
+def write_search_index(data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """
+    Precompute the search index of a data directory
+    
+    Returns:
+        Path of the written file
+    """
+    store = CultureStore(data_dir)
+    data = {"schema_version": SCHEMA_VERSION, "fingerprint": fingerprint(store.paths()),
+            **build_search_index(store).to_dict()}
+    path = os.path.join(data_dir, SEARCH_INDEX_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def load_search_index(store: CultureStore) -> CulturalSearchIndex:
+    """Load the precomputed search index, or build it if it is missing or older than the culture files"""
+    try:
+        with open(os.path.join(store.data_dir, SEARCH_INDEX_FILE), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("schema_version") == SCHEMA_VERSION and data.get("fingerprint") == fingerprint(store.paths()):
+            return CulturalSearchIndex.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return build_search_index(store)
+
+
+class CulturalContextEngine:
+    """
+    Engine for providing cultural context and insights for translations
+    
+    The database is immutable once loaded: create one engine per process and
+    share it between sessions. Cultures are read from disk lazily (see CultureStore).
+    """
+    
+    __slots__ = ("cultural_database", "_search_index", "_search_lock")
+    
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, max_loaded: int = 64):
+        # The (language, mode) insight bundles are built once, when a culture is loaded
+        self.cultural_database = CultureStore(data_dir, max_loaded, on_load=self._build_language_insights)
+        self._search_index = None
+        self._search_lock = threading.Lock()
+    
+    def search(self, query: str, limit: int = 10, languages: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Full-text search over greetings, business etiquette, taboos, gestures and dining
+        
+        Args:
+            query: Free text, e.g. 'OK sign offensive' (accent- and case-insensitive)
+            limit: Maximum number of results
+            languages: Optional language codes to restrict the search to
+        
+        Returns:
+            Ranked results with 'language', 'name', 'field', 'text' and 'score'
+        """
+        if self._search_index is None:
+            with self._search_lock:
+                # Loaded once, on the first search, without loading any culture into memory
+                if self._search_index is None:
+                    self._search_index = load_search_index(self.cultural_database)
+        if languages is not None:
+            languages = [normalize_language_code(code) for code in languages]
+        return self._search_index.search(query, limit, languages)
+    
+    @classmethod
+    def _build_language_insights(cls, language_code: str, culture: Mapping) -> Mapping:
+        """Precompute the insight bundle of every conversation mode for one culture"""
+        return MappingProxyType({
+            mode: cls._build_insights(language_code, culture, mode) for mode in CONVERSATION_MODES
+        })
+    
+    def get_cultural_context(self, language_code: str, context_type: str = "general") -> Mapping:
+        """
+        Get cultural context for a specific language
+        
+        Args:
+            language_code: ISO 639-1 language code (e.g., 'fr', 'es', 'de'); aliases and
+                regional variants ('zh-cn', 'pt-BR') are normalized
+            context_type: Type of context ('greetings', 'business', 'dining', 'gestures', 'taboos')
+        
+        Returns:
+            Dictionary with cultural insights
+        """
+        language_code = normalize_language_code(language_code)
+        if language_code not in self.cultural_database:
+            return {
+                "message": f"Cultural context not available for {language_code}",
+                "tip": "Use English cultural norms as a safe default"
+            }
+        
+        culture = self.cultural_database[language_code]
+        
+        if context_type == "general":
+            return culture
+        elif context_type in culture:
+            return {
+                "language": culture["name"],
+                "context": culture[context_type]
+            }
+        else:
+            return culture
+    
+    def get_context_for_conversation(self, source_lang: str, target_lang: str, mode: str = "casual") -> Mapping:
+        """
+        Get relevant cultural context for a conversation
+        
+        Args:
+            source_lang: Source language code
+            target_lang: Target language code
+            mode: Conversation mode ('casual', 'business', 'travel', 'academic')
+        
+        Returns:
+            Contextual cultural insights (read-only, shared - copy before modifying)
+        """
+        language_code = normalize_language_code(target_lang)
+        if language_code in self.cultural_database:
+            insights = self.cultural_database.derived(language_code).get(mode)
+            if insights is not None:
+                return insights
+        # Unknown language or mode: nothing precomputed, build the (small) bundle on demand
+        return self._build_insights(target_lang, self.get_cultural_context(target_lang), mode)
+    
+    @staticmethod
+    def _build_insights(target_lang: str, target_culture: Mapping, mode: str) -> Mapping:
+        """Build the frozen insight bundle for a culture and conversation mode"""
+        insights = {
+            "target_language": target_culture.get("name", target_lang),
+            "mode": mode,
+            "tips": []
+        }
+        
+        if mode == "casual":
+            if "greetings" in target_culture:
+                insights["tips"].append(f"Greetings: {target_culture['greetings'].get('tips', '')}")
+            if "gestures" in target_culture:
+                insights["tips"].append(f"Gestures: {target_culture['gestures'].get('positive', '')}")
+        
+        elif mode == "business":
+            if "business" in target_culture:
+                insights["tips"].append(f"Business etiquette: {target_culture['business'].get('etiquette', '')}")
+                insights["tips"].append(f"Tips: {target_culture['business'].get('tips', '')}")
+            if "greetings" in target_culture:
+                formal_greetings = target_culture['greetings'].get('formal', [])
+                if formal_greetings:
+                    insights["tips"].append(f"Formal greetings: {', '.join(formal_greetings[:3])}")
+        
+        elif mode == "travel":
+            if "taboos" in target_culture:
+                insights["tips"].append(f"Important taboos: {', '.join(target_culture['taboos'][:2])}")
+            if "dining" in target_culture:
+                insights["tips"].append(f"Dining: {target_culture.get('dining', '')}")
+        
+        # Always include key taboos
+        if "taboos" in target_culture and len(target_culture["taboos"]) > 0:
+            insights["key_taboo"] = target_culture["taboos"][0]
+        
+        return freeze(insights)
+    
+    def get_all_supported_languages(self) -> List[str]:
+        """Get list of all languages with cultural context"""
+        return list(self.cultural_database.keys())
+    
+    def get_language_name(self, language_code: str) -> str:
+        """Get full language name from code"""
+        language_code = normalize_language_code(language_code)
+        if language_code in self.cultural_database:
+            return self.cultural_database.name(language_code)
+        return language_code.upper()
+
+
+# Example usage
+if __name__ == "__main__":
+    # python -m speakeasy.cultural_context --build-search-index : precompute the search index
+    if "--build-search-index" in sys.argv:
+        print(f"Wrote {write_search_index()}")
+        sys.exit(0)
+    
+    # python -m speakeasy.cultural_context --validate : check every data file against the schema
+    if "--validate" in sys.argv:
+        problems = validate_data_dir()
+        for file_name, errors in problems.items():
+            for error in errors:
+                print(f"{file_name}: {error}")
+        print("OK" if not problems else f"{len(problems)} invalid file(s)")
+        sys.exit(1 if problems else 0)
+    
+    engine = CulturalContextEngine()
+    
+    # Test getting cultural context
+    print("=== French Business Context ===")
+    context = engine.get_context_for_conversation("en", "fr", "business")
+    print(json.dumps(thaw(context), indent=2, ensure_ascii=False))
+    
+    print("\n=== Japanese Greetings ===")
+    greetings = engine.get_cultural_context("ja", "greetings")
+    print(json.dumps(thaw(greetings), indent=2, ensure_ascii=False))
+    
+    print("\n=== Supported Languages ===")
+    print(engine.get_all_supported_languages())
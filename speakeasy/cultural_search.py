@@ -0,0 +1,174 @@
+"""
+Cultural Search Module for SpeakEasy Translator
+Inverted full-text index (BM25 ranking) over the cultural database
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Fields indexed for every culture: (field, sub-field or None, label shown in results)
+SEARCH_FIELDS = (
+    ("greetings", "formal", "Formal greetings"),
+    ("greetings", "informal", "Informal greetings"),
+    ("greetings", "tips", "Greetings"),
+    ("business", "etiquette", "Business etiquette"),
+    ("business", "tips", "Business tips"),
+    ("taboos", None, "Taboo"),
+    ("gestures", "positive", "Gestures (positive)"),
+    ("gestures", "negative", "Gestures (negative)"),
+    ("dining", None, "Dining"),
+)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it of on or that the their them "
+    "they this to what when where which who why with".split()
+)
+
+WORD = re.compile(r"\w+")
+CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Precomputed index stored next to the culture files (python -m speakeasy.cultural_context --build-search-index)
+SEARCH_INDEX_FILE = "search_index.json"
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents ('Enchanté' -> 'enchante')"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into search terms
+
+    Accent-folded words without stopwords and with a light plural folding;
+    CJK runs become character bigrams since they have no spaces.
+    """
+    tokens = []
+    for word in WORD.findall(fold(text)):
+        if CJK.fullmatch(word):
+            tokens.extend(word[i:i + 2] for i in range(max(1, len(word) - 1)))
+            continue
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def fingerprint(paths: Iterable[str]) -> str:
+    """Digest of the contents of the indexed files (tells whether a saved index is stale)"""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class CulturalSearchIndex:
+    """
+    Inverted index over cultural entries
+
+    Each greeting, tip, taboo, gesture and dining note is one document. Postings map
+    a term to (document id, term frequency) pairs, so a query only touches the
+    documents that contain its terms. The index can be saved as JSON (to_dict) and
+    loaded back without reading any culture (from_dict).
+    """
+
+    def __init__(self, cultures: Iterable[Tuple[str, Mapping]]):
+        """
+        Args:
+            cultures: (language_code, culture) pairs to index
+        """
+        self.documents: List[Tuple[str, str, str, str]] = []  # (language, name, label, text)
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for language_code, culture in cultures:
+            for text, label in self._entries(culture):
+                doc_id = len(self.documents)
+                tokens = tokenize(text)
+                self.documents.append((language_code, culture.get("name", language_code), label, text))
+                self.lengths.append(len(tokens))
+                for term, count in Counter(tokens).items():
+                    self.postings[term].append((doc_id, count))
+
+        self.postings = dict(self.postings)
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form of the index"""
+        return {"documents": self.documents, "lengths": self.lengths, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "CulturalSearchIndex":
+        """Rebuild an index saved with to_dict"""
+        index = cls(())
+        index.documents = [tuple(document) for document in data["documents"]]
+        index.lengths = list(data["lengths"])
+        index.postings = {term: [tuple(posting) for posting in postings] for term, postings in data["postings"].items()}
+        index.average_length = sum(index.lengths) / len(index.lengths) if index.lengths else 0.0
+        return index
+
+    @staticmethod
+    def _entries(culture: Mapping) -> Iterable[Tuple[str, str]]:
+        """Yield (text, label) for every indexed field of a culture"""
+        for field, sub_field, label in SEARCH_FIELDS:
+            value = culture.get(field)
+            if sub_field is not None:
+                value = value.get(sub_field) if isinstance(value, Mapping) else None
+            if isinstance(value, str):
+                yield value, label
+            elif isinstance(value, (list, tuple)):
+                if field == "greetings":
+                    yield ", ".join(value), label
+                else:
+                    for item in value:
+                        yield item, label
+
+    def search(self, query: str, limit: int = 10, languages: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Rank entries matching a query
+
+        Args:
+            query: Free text ('OK sign offensive')
+            limit: Maximum number of results
+            languages: Restrict results to these language codes
+
+        Returns:
+            Results sorted by relevance, each with 'language', 'name', 'field', 'text' and 'score'
+        """
+        allowed = set(languages) if languages is not None else None
+        scores = defaultdict(float)
+        total = len(self.documents)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings:
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / self.average_length)
+                scores[doc_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+
+        candidates = scores.items()
+        if allowed is not None:
+            candidates = [(doc_id, score) for doc_id, score in candidates if self.documents[doc_id][0] in allowed]
+
+        results = []
+        for doc_id, score in heapq.nlargest(limit, candidates, key=lambda item: item[1]):
+            language_code, name, label, text = self.documents[doc_id]
+            results.append({"language": language_code, "name": name, "field": label, "text": text,
+                            "score": round(score, 3)})
+        return results
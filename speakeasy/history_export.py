@@ -0,0 +1,123 @@
+"""
+History Export Module for SpeakEasy Translator
+Streams conversation history to CSV, JSONL or Parquet in bounded-size chunks
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import time
+from typing import BinaryIO, Dict, List
+
+from .history_store import HISTORY_COLUMNS, format_timestamp
+
+# Parquet needs pyarrow (optional - CSV and JSONL always work), imported on first Parquet export
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet") if PARQUET_AVAILABLE else ("csv", "jsonl")
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export_history(history, out: BinaryIO, export_format: str = "csv", chunk_size: int = 1000,
+                   **filters) -> Dict:
+    """
+    Stream history entries to a binary file object
+
+    Rows are read from the history store and written one chunk at a time, so memory
+    stays bounded by `chunk_size` whatever the history size.
+
+    Args:
+        history: ConversationHistory or SessionHistory (anything with iter_chunks)
+        out: Binary file object to write to
+        export_format: 'csv', 'jsonl' or 'parquet'
+        chunk_size: Rows per chunk (and per Parquet row group)
+        **filters: History filters (source_lang, target_lang, mode, since, until)
+
+    Returns:
+        Dictionary with 'rows', 'bytes', 'seconds' and 'rows_per_sec'
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format} (expected {', '.join(EXPORT_FORMATS)})")
+
+    started = time.perf_counter()
+    start_position = out.tell()
+    chunks = history.iter_chunks(chunk_size, **filters)
+
+    if export_format == "parquet":
+        rows = _write_parquet(chunks, out)
+    else:
+        rows = _write_text(chunks, out, export_format)
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "bytes": out.tell() - start_position,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+    }
+
+
+def _write_text(chunks, out: BinaryIO, export_format: str) -> int:
+    """Write CSV or JSONL chunks"""
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    rows = 0
+    try:
+        writer = None
+        if export_format == "csv":
+            writer = csv.DictWriter(text, fieldnames=HISTORY_COLUMNS)
+            writer.writeheader()
+        for chunk in chunks:
+            for row in chunk:
+                row["timestamp"] = format_timestamp(row["timestamp"])
+            if writer is not None:
+                writer.writerows(chunk)
+            else:
+                text.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk))
+            rows += len(chunk)
+        text.flush()
+    finally:
+        # Leave the caller's file object open
+        text.detach()
+    return rows
+
+
+def _parquet_schema():
+    """Parquet schema with dictionary-encoded language and mode columns"""
+    import pyarrow as pa
+    codes = pa.dictionary(pa.int16(), pa.string())
+    return pa.schema([
+        ("timestamp", pa.timestamp("s")),
+        ("original", pa.string()),
+        ("translation", pa.string()),
+        ("source_lang", codes),
+        ("target_lang", codes),
+        ("mode", codes),
+    ])
+
+
+def _write_parquet(chunks, out: BinaryIO) -> int:
+    """Write one Parquet row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _parquet_schema()
+    rows = 0
+    with pq.ParquetWriter(out, schema, compression="zstd", use_dictionary=True) as writer:
+        for chunk in chunks:
+            columns: Dict[str, List] = {name: [row[name] for row in chunk] for name in HISTORY_COLUMNS}
+            table = pa.table({
+                "timestamp": pa.array(columns["timestamp"], pa.int64()).cast(pa.timestamp("s")),
+                "original": pa.array(columns["original"], pa.string()),
+                "translation": pa.array(columns["translation"], pa.string()),
+                "source_lang": pa.array(columns["source_lang"], pa.string()).dictionary_encode().cast(schema.field("source_lang").type),
+                "target_lang": pa.array(columns["target_lang"], pa.string()).dictionary_encode().cast(schema.field("target_lang").type),
+                "mode": pa.array(columns["mode"], pa.string()).dictionary_encode().cast(schema.field("mode").type),
+            }, schema=schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    return rows
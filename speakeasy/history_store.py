@@ -0,0 +1,471 @@
+"""
+History Store Module for SpeakEasy Translator
+Compact, append-only columnar conversation history
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = ["timestamp", "original", "translation", "source_lang", "target_lang", "mode"]
+
+DEFAULT_HISTORY_PATH = os.getenv(
+    "SPEAKEASY_HISTORY_PATH", os.path.join(".speakeasy", "history.sqlite3")
+)
+
+
+class ConversationHistory:
+    """
+    Columnar conversation history for one session
+
+    Language and mode codes are interned into a small code table and stored as
+    integer ids, timestamps as integer epoch seconds, texts in plain lists. Every
+    column is append-only; once `max_entries` (or `max_text_chars` characters of
+    text) is exceeded the oldest block is dropped (or spilled to a JSONL file) so
+    memory stays bounded. `version` changes on every write, which lets callers
+    cache derived views.
+    """
+
+    def __init__(self, max_entries: int = 1000, spill_path: Optional[str] = None,
+                 max_text_chars: Optional[int] = None):
+        """
+        Args:
+            max_entries: Entries kept in memory
+            spill_path: Optional JSONL file receiving entries dropped from memory
+            max_text_chars: Optional limit on the characters of text kept in memory
+        """
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self.max_text_chars = max_text_chars
+        self.version = 0
+        self.spilled = 0
+        self._chars = 0
+
+        self._codes: List[str] = []
+        self._code_ids: Dict[str, int] = {}
+        self._timestamps = array("q")
+        self._source = array("H")
+        self._target = array("H")
+        self._mode = array("H")
+        self._original: List[str] = []
+        self._translation: List[str] = []
+        self._dataframe = None
+        self._dataframe_version = -1
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __bool__(self) -> bool:
+        return len(self._timestamps) > 0
+
+    @property
+    def total(self) -> int:
+        """Number of entries ever recorded (in memory + spilled)"""
+        return self.spilled + len(self)
+
+    def _code(self, value: str) -> int:
+        """Intern a language/mode code"""
+        code_id = self._code_ids.get(value)
+        if code_id is None:
+            code_id = len(self._codes)
+            self._codes.append(sys.intern(value))
+            self._code_ids[value] = code_id
+        return code_id
+
+    def append(self, original: str, translation: str, source_lang: str, target_lang: str, mode: str,
+               timestamp: Optional[float] = None) -> None:
+        """Record a translation"""
+        self._timestamps.append(int(timestamp if timestamp is not None else time.time()))
+        self._source.append(self._code(source_lang))
+        self._target.append(self._code(target_lang))
+        self._mode.append(self._code(mode))
+        self._original.append(original)
+        self._translation.append(translation)
+        self._chars += len(original) + len(translation)
+        self.version += 1
+
+        if len(self) > self.max_entries:
+            # Drop a whole block at once so trimming the arrays stays amortized
+            self._evict(max(1, self.max_entries // 10) + len(self) - self.max_entries - 1)
+        if self.max_text_chars is not None and self._chars > self.max_text_chars:
+            # Down to 90% of the limit, keeping at least the latest entry
+            count, excess = 0, self._chars - self.max_text_chars * 9 // 10
+            while count < len(self) - 1 and excess > 0:
+                excess -= len(self._original[count]) + len(self._translation[count])
+                count += 1
+            self._evict(count)
+
+    def _evict(self, count: int) -> None:
+        """Remove the `count` oldest entries, spilling them first if configured"""
+        if self.spill_path:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in self.rows(0, count):
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._chars -= sum(len(text) for text in self._original[:count]) + sum(
+            len(text) for text in self._translation[:count])
+        for column in (self._timestamps, self._source, self._target, self._mode, self._original, self._translation):
+            del column[:count]
+        self.spilled += count
+
+    def row(self, index: int) -> Dict:
+        """Get one entry as a dictionary"""
+        return {
+            "timestamp": self._timestamps[index],
+            "original": self._original[index],
+            "translation": self._translation[index],
+            "source_lang": self._codes[self._source[index]],
+            "target_lang": self._codes[self._target[index]],
+            "mode": self._codes[self._mode[index]],
+        }
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Iterate over entries [start, stop) in insertion order, without copying the columns"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(max(0, start), stop):
+            yield self.row(index)
+
+    def page(self, page: int = 0, page_size: int = 20, newest_first: bool = True) -> List[Dict]:
+        """Get one page of entries (newest first by default)"""
+        if newest_first:
+            stop = len(self) - page * page_size
+            return [self.row(index) for index in range(stop - 1, max(stop - page_size, 0) - 1, -1)]
+        return list(self.rows(page * page_size, (page + 1) * page_size))
+
+    def _matches(self, index: int, source_lang: Optional[str], target_lang: Optional[str], mode: Optional[str],
+                 since: Optional[int], until: Optional[int]) -> bool:
+        """Check an entry against the query filters"""
+        return ((source_lang is None or self._codes[self._source[index]] == source_lang)
+                and (target_lang is None or self._codes[self._target[index]] == target_lang)
+                and (mode is None or self._codes[self._mode[index]] == mode)
+                and (since is None or self._timestamps[index] >= since)
+                and (until is None or self._timestamps[index] < until))
+
+    def query(self, page: int = 0, page_size: int = 20, source_lang: Optional[str] = None,
+              target_lang: Optional[str] = None, mode: Optional[str] = None,
+              since: Optional[int] = None, until: Optional[int] = None) -> List[Dict]:
+        """Get one page of entries matching the filters, newest first"""
+        if source_lang is target_lang is mode is since is until is None:
+            return self.page(page, page_size)
+        matching = (i for i in range(len(self) - 1, -1, -1)
+                    if self._matches(i, source_lang, target_lang, mode, since, until))
+        return [self.row(i) for i in islice(matching, page * page_size, (page + 1) * page_size)]
+
+    def count(self, source_lang: Optional[str] = None, target_lang: Optional[str] = None,
+              mode: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None) -> int:
+        """Count entries matching the filters"""
+        if source_lang is target_lang is mode is since is until is None:
+            return len(self)
+        return sum(1 for i in range(len(self)) if self._matches(i, source_lang, target_lang, mode, since, until))
+
+    def iter_chunks(self, chunk_size: int = 1000, source_lang: Optional[str] = None,
+                    target_lang: Optional[str] = None, mode: Optional[str] = None,
+                    since: Optional[int] = None, until: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Iterate over entries matching the filters in chunks, oldest first"""
+        chunk = []
+        for index in range(len(self)):
+            if self._matches(index, source_lang, target_lang, mode, since, until):
+                chunk.append(self.row(index))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def language_pairs(self) -> List[Tuple[str, str]]:
+        """Get the distinct (source, target) pairs present in the history"""
+        return sorted({(self._codes[s], self._codes[t]) for s, t in zip(self._source, self._target)})
+
+    def since(self, version: int) -> List[Dict]:
+        """Get the entries appended after a previously seen `version` (still in memory)"""
+        added = min(self.version - version, len(self))
+        return list(self.rows(len(self) - added)) if added > 0 else []
+
+    def to_dataframe(self):
+        """Build a pandas DataFrame of the in-memory entries (cached until the next write)"""
+        if self._dataframe_version != self.version:
+            import pandas as pd
+
+            self._dataframe = pd.DataFrame({
+                "timestamp": [format_timestamp(t) for t in self._timestamps],
+                "original": self._original,
+                "translation": self._translation,
+                "source_lang": pd.Categorical.from_codes(self._source.tolist(), categories=self._codes),
+                "target_lang": pd.Categorical.from_codes(self._target.tolist(), categories=self._codes),
+                "mode": pd.Categorical.from_codes(self._mode.tolist(), categories=self._codes),
+            }, columns=HISTORY_COLUMNS)
+            self._dataframe_version = self.version
+        return self._dataframe
+
+    def clear(self) -> None:
+        """Remove every in-memory entry"""
+        for column in (self._timestamps, self._source, self._target, self._mode, self._original, self._translation):
+            del column[:]
+        self.spilled = 0
+        self._chars = 0
+        self.version += 1
+
+    def __getstate__(self) -> Dict:
+        # The DataFrame is a cache: don't serialize it
+        state = self.__dict__.copy()
+        state["_dataframe"], state["_dataframe_version"] = None, -1
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        # Histories spilled by earlier versions have no text limit
+        state.setdefault("max_text_chars", None)
+        state.setdefault("_chars", sum(map(len, state["_original"])) + sum(map(len, state["_translation"])))
+        self.__dict__.update(state)
+
+
+class SQLiteHistoryStore:
+    """
+    Durable history shared by every session of the process
+
+    SQLite in WAL mode, indexed on (session, timestamp) and (session, language
+    pair, timestamp). Appends are buffered and written in batches (when the
+    buffer is full, when it gets old, or before any read), so translate_text
+    never waits on a disk transaction. A failed write keeps its rows buffered
+    for the next attempt (up to `max_buffered` rows) and is only logged: the
+    history never fails a translation.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_PATH, batch_size: int = 32, flush_interval: float = 2.0,
+                 max_buffered: int = 10000):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY,
+                session TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                original TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                mode TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_session_time ON history(session, timestamp)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_session_pair ON history(session, source_lang, target_lang, timestamp)"
+        )
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple] = []
+        # Last write sequence number per session, so views can tell when to re-read
+        self._writes = 0
+        self._versions: Dict[str, int] = {}
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="speakeasy-history", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def session(self, session_id: str) -> "SessionHistory":
+        """Get the history view of one session"""
+        return SessionHistory(self, session_id)
+
+    def append(self, session_id: str, original: str, translation: str, source_lang: str, target_lang: str,
+               mode: str, timestamp: Optional[float] = None) -> None:
+        """Buffer a translation for the next batch write"""
+        row = (session_id, int(timestamp if timestamp is not None else time.time()),
+               original, translation, source_lang, target_lang, mode)
+        with self._lock:
+            self._buffer.append(row)
+            self._bump(session_id)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._flush_quietly()
+
+    def _bump(self, session_id: str) -> None:
+        """Record a change to a session's entries (called with the lock held)"""
+        self._writes += 1
+        self._versions[session_id] = self._writes
+
+    def version(self, session_id: str) -> int:
+        """Get a number that changes whenever a session's entries change"""
+        return self._versions.get(session_id, 0)
+
+    def flush(self) -> None:
+        """
+        Write buffered entries in one transaction
+
+        Raises:
+            sqlite3.Error: If the write failed (the entries stay buffered)
+        """
+        with self._lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO history (session, timestamp, original, translation, source_lang, target_lang, "
+                        "mode) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error:
+                # Back in front of the buffer for the next flush, dropping the oldest beyond max_buffered
+                self._buffer = rows[max(0, len(rows) - self.max_buffered):]
+                raise
+
+    def _flush_quietly(self) -> None:
+        """Flush, logging a failure instead of raising it"""
+        try:
+            self.flush()
+        except sqlite3.Error as error:
+            METRICS.inc("speakeasy_history_write_errors_total")
+            logger.warning("History write failed, %d entries kept for retry: %s", len(self._buffer), error)
+
+    def _flush_periodically(self) -> None:
+        """Background flusher bounding how long an entry stays buffered"""
+        while not self._closed.wait(self.flush_interval):
+            self._flush_quietly()
+
+    @staticmethod
+    def _where(session_id: str, source_lang, target_lang, mode, since, until) -> Tuple[str, list]:
+        """Build the WHERE clause for the query filters"""
+        clauses, params = ["session = ?"], [session_id]
+        for column, value in (("source_lang", source_lang), ("target_lang", target_lang), ("mode", mode)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(int(until))
+        return " AND ".join(clauses), params
+
+    def query(self, session_id: str, page: int = 0, page_size: int = 20, source_lang: Optional[str] = None,
+              target_lang: Optional[str] = None, mode: Optional[str] = None,
+              since: Optional[int] = None, until: Optional[int] = None) -> List[Dict]:
+        """Get one page of a session's entries matching the filters, newest first"""
+        self._flush_quietly()
+        where, params = self._where(session_id, source_lang, target_lang, mode, since, until)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history WHERE {where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size],
+            )
+            return [dict(zip(HISTORY_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def count(self, session_id: str, source_lang: Optional[str] = None, target_lang: Optional[str] = None,
+              mode: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None) -> int:
+        """Count a session's entries matching the filters"""
+        self._flush_quietly()
+        where, params = self._where(session_id, source_lang, target_lang, mode, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+
+    def iter_chunks(self, session_id: str, chunk_size: int = 1000, source_lang: Optional[str] = None,
+                    target_lang: Optional[str] = None, mode: Optional[str] = None,
+                    since: Optional[int] = None, until: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Iterate over a session's entries matching the filters in chunks, oldest first
+
+        Uses keyset pagination on the row id, so each chunk is an indexed range scan
+        and only one chunk is held in memory at a time.
+        """
+        self._flush_quietly()
+        where, params = self._where(session_id, source_lang, target_lang, mode, since, until)
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM history WHERE {where} AND id > ? "
+                    "ORDER BY id LIMIT ?",
+                    params + [last_id, chunk_size],
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [dict(zip(HISTORY_COLUMNS, row[1:])) for row in rows]
+
+    def language_pairs(self, session_id: str) -> List[Tuple[str, str]]:
+        """Get the distinct (source, target) pairs of a session"""
+        self._flush_quietly()
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT DISTINCT source_lang, target_lang FROM history WHERE session = ? ORDER BY 1, 2",
+                (session_id,),
+            )]
+
+    def clear(self, session_id: str) -> None:
+        """Delete every entry of a session"""
+        self._flush_quietly()
+        with self._lock, self._conn:
+            # Entries that couldn't be written yet must not come back after the next flush
+            self._buffer = [row for row in self._buffer if row[0] != session_id]
+            self._conn.execute("DELETE FROM history WHERE session = ?", (session_id,))
+            self._bump(session_id)
+
+    def close(self) -> None:
+        """Flush pending entries and stop the background flusher"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flush_quietly()
+
+
+class SessionHistory:
+    """History of one session in a SQLiteHistoryStore (same interface as ConversationHistory)"""
+
+    def __init__(self, store: SQLiteHistoryStore, session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def version(self) -> int:
+        return self.store.version(self.session_id)
+
+    def append(self, original: str, translation: str, source_lang: str, target_lang: str, mode: str,
+               timestamp: Optional[float] = None) -> None:
+        self.store.append(self.session_id, original, translation, source_lang, target_lang, mode, timestamp)
+
+    def query(self, page: int = 0, page_size: int = 20, **filters) -> List[Dict]:
+        return self.store.query(self.session_id, page, page_size, **filters)
+
+    def count(self, **filters) -> int:
+        return self.store.count(self.session_id, **filters)
+
+    def iter_chunks(self, chunk_size: int = 1000, **filters) -> Iterator[List[Dict]]:
+        return self.store.iter_chunks(self.session_id, chunk_size, **filters)
+
+    def language_pairs(self) -> List[Tuple[str, str]]:
+        return self.store.language_pairs(self.session_id)
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+
+
+def format_timestamp(timestamp: int) -> str:
+    """Format an epoch timestamp the way the UI shows it"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
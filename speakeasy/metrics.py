@@ -0,0 +1,253 @@
+"""
+Metrics Module for SpeakEasy Translator
+Per-stage timing spans, counters, Prometheus text export and a structured JSON log
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Histogram buckets (seconds) for stage durations
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+INF_LABEL = 'le="+Inf"'
+
+# Samples kept per stage for the live percentiles
+WINDOW_SIZE = 1024
+
+_trace = contextvars.ContextVar("speakeasy_trace", default=None)
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Tuple, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Histogram:
+    """Cumulative buckets for Prometheus plus a sliding window for percentiles"""
+
+    __slots__ = ("counts", "total", "count", "window")
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self.window = deque(maxlen=WINDOW_SIZE)
+
+    def observe(self, seconds: float) -> None:
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.total += seconds
+        self.count += 1
+        self.window.append(seconds)
+
+
+class MetricsRegistry:
+    """
+    In-process metrics shared by every session
+
+    Counters and duration histograms are keyed by name and labels. Timings come
+    from spans; a span opened inside a trace (one translate_text call) is also
+    added to that trace, which is written as one JSON line to the log file when
+    the trace ends.
+    """
+
+    def __init__(self, log_path: Optional[str] = None):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], _Histogram] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a duration"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, stage: str, **attributes) -> Iterator[Dict]:
+        """
+        Time a stage ('speakeasy_stage_seconds{stage=...}')
+
+        Yields a dictionary the caller can add attributes to (e.g. a status code);
+        it ends up in the current trace's JSON log line.
+        """
+        record = {"stage": stage, **attributes}
+        started = time.perf_counter()
+        error = None
+        try:
+            yield record
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe("speakeasy_stage_seconds", seconds, stage=stage)
+            record["ms"] = round(seconds * 1000, 2)
+            if error is not None:
+                record["error"] = error
+                self.inc("speakeasy_stage_errors_total", stage=stage)
+            trace = _trace.get()
+            if trace is not None:
+                trace["spans"].append(record)
+
+    def timed(self, stage: str, fn: Callable) -> Callable:
+        """Wrap fn so that every call is a span"""
+        def wrapper(*args, **kwargs):
+            with self.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Dict]:
+        """
+        Group the spans of one request
+
+        Spans opened in this context (and in tasks submitted with a copy of it) are
+        collected; the whole trace is a span itself and is logged as JSON on exit.
+        """
+        trace = {"trace": name, "ts": round(time.time(), 3), **attributes, "spans": []}
+        token = _trace.set(trace)
+        try:
+            with self.span(name) as record:
+                yield trace
+        finally:
+            _trace.reset(token)
+            trace["ms"] = record["ms"]
+            if "error" in record:
+                trace["error"] = record["error"]
+            self._log(trace)
+
+    def _log(self, trace: Dict) -> None:
+        if not self.log_path:
+            return
+        try:
+            line = json.dumps(trace, ensure_ascii=False, default=str)
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass
+
+    def percentiles(self, name: str = "speakeasy_stage_seconds") -> Dict[str, Dict]:
+        """
+        Live percentiles of a duration metric per label set
+
+        Returns:
+            Label value -> {'count', 'p50', 'p95', 'p99'} (milliseconds, over the last samples)
+        """
+        with self._lock:
+            windows = {labels: (histogram.count, sorted(histogram.window))
+                       for (metric, labels), histogram in self._histograms.items() if metric == name}
+        result = {}
+        for labels, (count, samples) in sorted(windows.items()):
+            label = ",".join(value for _, value in labels) or name
+            pick = lambda q: samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))] * 1000  # noqa: E731
+            result[label] = {"count": count, "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+        return result
+
+    def counters(self) -> Dict[str, float]:
+        """Counter values as 'name{labels}' -> value"""
+        with self._lock:
+            return {name + _format_labels(labels): value for (name, labels), value in sorted(self._counters.items())}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (list(h.counts), h.total, h.count)) for key, h in self._histograms.items())
+
+        current = None
+        for (name, labels), value in counters:
+            if name != current:
+                current = name
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        current = None
+        for (name, labels), (counts, total, count) in histograms:
+            if name != current:
+                current = name
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            for bound, bucket_count in zip(DURATION_BUCKETS, counts):
+                bucket_labels = _format_labels(labels, 'le="%s"' % bound)
+                lines.append(f"{name}_bucket{bucket_labels} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, INF_LABEL)} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def start_metrics_server(registry: "MetricsRegistry", port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics (Prometheus text) on a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="speakeasy-metrics", daemon=True).start()
+    return server
+
+
+# Process-wide registry (the JSON log is enabled with SPEAKEASY_METRICS_LOG=<path>)
+METRICS = MetricsRegistry(log_path=os.getenv("SPEAKEASY_METRICS_LOG") or None)
+METRICS.describe("speakeasy_stage_seconds", "Duration of each translation stage")
+METRICS.describe("speakeasy_stage_errors_total", "Stages that raised")
+METRICS.describe("speakeasy_cache_requests_total", "Translation cache lookups by result")
+METRICS.describe("speakeasy_memory_requests_total", "Translation memory lookups by result (exact, fuzzy, miss)")
+METRICS.describe("speakeasy_upstream_responses_total", "Upstream HTTP responses by provider and status")
+METRICS.describe("speakeasy_openai_tokens_total", "OpenAI tokens by kind")
+METRICS.describe("speakeasy_openai_invalid_responses_total", "OpenAI completions with unusable JSON by call")
+METRICS.describe("speakeasy_http_requests_total", "HTTP service requests by route and status")
+METRICS.describe("speakeasy_http_request_seconds", "HTTP service response time by route")
+METRICS.describe("speakeasy_session_spills_total", "Session values written to disk by reason (budget, idle)")
+METRICS.describe("speakeasy_session_rehydrations_total", "Spilled session values loaded back")
+METRICS.describe("speakeasy_history_write_errors_total", "Failed history batch writes (entries kept for retry)")
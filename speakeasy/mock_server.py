@@ -0,0 +1,243 @@
+"""
+Mock Server Module for SpeakEasy Translator
+Local HTTP stand-in for the MyMemory and OpenAI APIs with configurable latency and errors
+
+Usage:
+    python -m speakeasy.mock_server --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+
+    MYMEMORY_URL=http://127.0.0.1:8765/get OPENAI_BASE_URL=http://127.0.0.1:8765/v1 \\
+    OPENAI_API_KEY=mock streamlit run app_lite.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+CURRENT_TRANSLATION = re.compile(r"Current translation \([^)]*\): (.*)")
+SEGMENTS = re.compile(r"Segments \(JSON array\): (\[.*\])")
+
+
+def mock_translate(text: str, dest_lang: str) -> str:
+    """Deterministic fake translation ('[fr] Hello')"""
+    return f"[{dest_lang}] {text}"
+
+
+class MockConfig:
+    """Latency and failure behaviour of the mock upstreams"""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 20.0, error_rate: float = 0.0,
+                 daily_chars: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Base latency of every response
+            jitter_ms: Mean of an exponential extra delay (gives a realistic long tail)
+            error_rate: Probability of answering 5xx
+            daily_chars: MyMemory quota; once spent, /get reports quotaFinished
+            seed: Seed for reproducible latencies and errors
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.daily_chars = daily_chars
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"mymemory": 0, "openai": 0, "errors": 0, "chars": 0}
+
+    def delay(self) -> float:
+        with self.lock:
+            extra = self.random.expovariate(1.0 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + extra) / 1000
+
+    def fail(self) -> bool:
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.stats["errors"] += 1
+        return failed
+
+    def count(self, provider: str, chars: int = 0) -> bool:
+        """Count a request; False if it goes over the MyMemory quota"""
+        with self.lock:
+            self.stats[provider] += 1
+            self.stats["chars"] += chars
+            return self.daily_chars is None or self.stats["chars"] <= self.daily_chars
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Serves MyMemory's GET /get and OpenAI's POST /v1/chat/completions"""
+
+    protocol_version = "HTTP/1.1"
+    config: MockConfig = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            with self.config.lock:
+                return self._send_json(200, dict(self.config.stats))
+        if url.path != "/get":
+            return self._send_json(404, {"error": "not found"})
+
+        query = parse_qs(url.query)
+        text = query.get("q", [""])[0]
+        src_lang, _, dest_lang = query.get("langpair", ["|"])[0].partition("|")
+        time.sleep(self.config.delay())
+        within_quota = self.config.count("mymemory", len(text))
+        if self.config.fail():
+            return self._send_json(503, {"responseStatus": 503, "responseDetails": "SERVICE UNAVAILABLE"})
+        if not within_quota:
+            return self._send_json(200, {
+                "responseStatus": 429, "quotaFinished": True,
+                "responseDetails": "MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS FOR TODAY",
+                "responseData": {"translatedText": "MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS FOR TODAY"},
+            })
+
+        translation = mock_translate(text, dest_lang)
+        self._send_json(200, {
+            "responseStatus": 200,
+            "responseDetails": "",
+            "quotaFinished": False,
+            "responseData": {"translatedText": translation, "match": 0.85},
+            "matches": [{"segment": text, "translation": translation, "quality": "74", "match": 0.85,
+                         "source": src_lang, "target": dest_lang}],
+        })
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/v1/chat/completions":
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "invalid JSON"}})
+
+        time.sleep(self.config.delay())
+        self.config.count("openai")
+        if self.config.fail():
+            return self._send_json(500, {"error": {"message": "mock upstream error", "type": "server_error"}})
+
+        content, prompt_tokens = self._completion(request)
+        completion_tokens = len(content) // 4 + 1
+        model = request.get("model", "mock")
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            return self._stream(content, model, usage if include_usage else None)
+        self._send_json(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    @staticmethod
+    def _completion(request: Dict) -> Tuple[str, int]:
+        """Answer the SpeakEasy prompts deterministically"""
+        messages = request.get("messages") or []
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        prompt_tokens = len(prompt) // 4 + 1
+        current = CURRENT_TRANSLATION.search(prompt)
+        segments = SEGMENTS.search(prompt)
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+
+        if segments:
+            texts = json.loads(segments.group(1))
+            dest_lang = re.search(r"to (\S+?)\.", prompt)
+            dest_lang = dest_lang.group(1) if dest_lang else "xx"
+            return json.dumps({"translations": [mock_translate(text, dest_lang) for text in texts]}), prompt_tokens
+        if json_mode:
+            translation = current.group(1).strip() if current else ""
+            return json.dumps({"translation": translation, "insight": "Mock cultural insight."}), prompt_tokens
+        if current:
+            return current.group(1).strip(), prompt_tokens
+        return "Mock cultural insight.", prompt_tokens
+
+    def _stream(self, content: str, model: str, usage: Optional[Dict] = None) -> None:
+        """Send the completion as server-sent events, a few words at a time (then the usage, if given)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = content.split(" ")
+        for i in range(0, len(words), 3):
+            piece = " ".join(words[i:i + 3]) + (" " if i + 3 < len(words) else "")
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.config.delay() / 10)
+        if usage is not None:
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None
+                      ) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the mock server on a background thread
+
+    Args:
+        port: 0 picks a free port
+
+    Returns:
+        (server, base_url) tuple; MyMemory is at base_url + '/get', OpenAI at base_url + '/v1'.
+        Call server.shutdown() to stop it.
+    """
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="speakeasy-mock", daemon=True).start()
+    return server, f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="SpeakEasy mock MyMemory / OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Base latency of every response")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Mean extra (exponential) latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx answer")
+    parser.add_argument("--daily-chars", type=int, help="MyMemory quota before quotaFinished")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.daily_chars, args.seed)
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Mock MyMemory: http://{args.host}:{args.port}/get")
+    print(f"Mock OpenAI:   http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
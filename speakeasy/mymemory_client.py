@@ -0,0 +1,291 @@
+"""
+MyMemory Client Module for SpeakEasy Translator
+Pooled HTTP client with timeouts, bounded retries and response parsing
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from .metrics import METRICS
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged_call
+
+# Can point to a local stand-in (see mock_server.py)
+MYMEMORY_URL = os.getenv("MYMEMORY_URL", "https://api.mymemory.translated.net/get")
+
+# HTTP statuses worth retrying (transient upstream failures)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# requests is imported by the first client, not at module import
+requests = None
+
+
+def _import_requests() -> None:
+    global requests
+    if requests is None:
+        import requests as module
+        requests = module
+
+
+# Successful requests needed before the hedge delay (a latency percentile) is trusted
+HEDGE_MIN_SAMPLES = 20
+
+
+class MyMemoryError(Exception):
+    """Raised when MyMemory can't provide a translation"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class MyMemoryQuotaError(MyMemoryError):
+    """Raised when the daily MyMemory quota is exhausted"""
+
+
+def parse_response(data: Dict) -> Dict:
+    """
+    Parse a MyMemory /get response
+
+    Args:
+        data: Decoded JSON body
+
+    Returns:
+        Dictionary with 'translation', 'match', 'matches' and 'quota_finished'
+
+    Raises:
+        MyMemoryQuotaError: If the daily quota is exhausted
+        MyMemoryError: For any other error status or malformed body
+    """
+    if not isinstance(data, dict):
+        raise MyMemoryError("Malformed MyMemory response")
+
+    try:
+        status = int(data.get("responseStatus", 0))
+    except (TypeError, ValueError):
+        status = 0
+    details = data.get("responseDetails") or ""
+    response_data = data.get("responseData") or {}
+    translation = response_data.get("translatedText") or ""
+    quota_finished = bool(data.get("quotaFinished"))
+
+    # MyMemory sometimes reports an exhausted quota inside translatedText with a 200 status
+    if quota_finished or status == 429 or translation.startswith("MYMEMORY WARNING"):
+        raise MyMemoryQuotaError(details or translation or "MyMemory daily quota exhausted", status)
+    if status != 200:
+        raise MyMemoryError(details or f"MyMemory error (status {status})", status)
+    if not translation:
+        raise MyMemoryError("MyMemory returned an empty translation", status)
+
+    try:
+        match = float(response_data.get("match") or 0.0)
+    except (TypeError, ValueError):
+        match = 0.0
+
+    return {
+        "translation": translation,
+        "match": match,
+        "matches": data.get("matches") or [],
+        "quota_finished": quota_finished,
+    }
+
+
+class MyMemoryClient:
+    """
+    Thread-safe MyMemory client shared by every session
+
+    Connections are kept alive in a pool, every request has connect/read timeouts,
+    and failed requests are retried with jittered exponential backoff. Retries are
+    limited per request and by a global retry budget, so an upstream outage can't
+    multiply the load on it. With a rate limiter, every attempt pays for its
+    characters from the shared 'mymemory' quota first.
+
+    With a circuit breaker, outages (unreachable, timeouts, 5xx) open the circuit and
+    later calls fail at once instead of waiting for their own timeouts. With `hedge`,
+    a request still running after the recent p95 latency gets one duplicate and the
+    first response wins; hedges spend the same budget as retries.
+    """
+
+    def __init__(self, base_url: str = MYMEMORY_URL, email: Optional[str] = None,
+                 connect_timeout: float = 3.05, read_timeout: float = 10.0, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_cap: float = 2.0, pool_size: int = 20,
+                 retry_budget_ratio: float = 0.2, retry_budget_max: float = 10.0,
+                 limiter: Optional[RateLimiter] = None, breaker: Optional[CircuitBreaker] = None,
+                 hedge: bool = False, hedge_percentile: float = 95.0):
+        self.base_url = base_url
+        self.email = email if email is not None else os.getenv("MYMEMORY_EMAIL", "")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_max = retry_budget_max
+        self.limiter = limiter
+        self.breaker = breaker
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.latency = LatencyTracker()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="speakeasy-hedge") if hedge else None
+
+        _import_requests()
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._retry_tokens = retry_budget_max
+        self._stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "errors": 0, "quota_errors": 0,
+                       "short_circuited": 0}
+
+    def translate(self, text: str, src_lang: str, dest_lang: str) -> Dict:
+        """
+        Translate text with MyMemory
+
+        Returns:
+            Parsed response (see parse_response)
+
+        Raises:
+            MyMemoryQuotaError: If the quota is exhausted (reported by MyMemory or by the rate limiter)
+            MyMemoryError: If no translation could be fetched
+        """
+        params = {"q": text, "langpair": f"{src_lang}|{dest_lang}"}
+        if self.email:
+            params["de"] = self.email
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._retry_tokens = min(self.retry_budget_max, self._retry_tokens + self.retry_budget_ratio)
+
+        if self.breaker is not None:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError as e:
+                with self._lock:
+                    self._stats["short_circuited"] += 1
+                raise MyMemoryError(str(e)) from e
+
+        started = time.monotonic()
+        try:
+            if self._hedge_executor is not None and len(self.latency) >= HEDGE_MIN_SAMPLES:
+                delay = self.latency.percentile(self.hedge_percentile)
+                result, winner = hedged_call(self._hedge_executor, self._fetch, (text, params), delay,
+                                             lambda: self._take_retry_token("hedges"))
+                if winner == "hedge":
+                    with self._lock:
+                        self._stats["hedge_wins"] += 1
+            else:
+                result = self._fetch(text, params)
+        except MyMemoryError as e:
+            if self.breaker is not None:
+                if self._is_outage(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+            raise
+        except BaseException:
+            # Anything unexpected still ends the call (and a half-open probe) as a failure
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+
+        self.latency.record(time.monotonic() - started)
+        if self.breaker is not None:
+            self.breaker.record_success()
+        return result
+
+    @staticmethod
+    def _is_outage(error: MyMemoryError) -> bool:
+        """Whether an error means MyMemory itself is failing (not a quota or a bad request)"""
+        if isinstance(error, MyMemoryQuotaError):
+            return False
+        return error.status is None or error.status >= 500
+
+    def _fetch(self, text: str, params: Dict) -> Dict:
+        """One logical request: HTTP attempts with bounded retries"""
+        attempt = 0
+        while True:
+            self._acquire(text)
+            try:
+                response = self._get(params)
+                if response.status_code != 200:
+                    raise MyMemoryError(f"MyMemory HTTP {response.status_code}", response.status_code)
+                try:
+                    data = response.json()
+                except ValueError:
+                    raise MyMemoryError("MyMemory returned invalid JSON", response.status_code)
+                return parse_response(data)
+            except MyMemoryQuotaError:
+                with self._lock:
+                    self._stats["quota_errors"] += 1
+                if self.limiter is not None:
+                    self.limiter.exhaust("mymemory")
+                raise
+            except (requests.RequestException, MyMemoryError) as e:
+                if isinstance(e, MyMemoryError):
+                    retryable = e.status in RETRYABLE_STATUSES
+                else:
+                    # Broken connections are transient; redirects loops, bad URLs and the like are not
+                    retryable = isinstance(e, (requests.ConnectionError, requests.Timeout,
+                                               requests.exceptions.ChunkedEncodingError))
+                if not retryable or attempt >= self.max_retries or not self._take_retry_token():
+                    with self._lock:
+                        self._stats["errors"] += 1
+                    if isinstance(e, MyMemoryError):
+                        raise
+                    raise MyMemoryError(f"MyMemory request failed: {e}") from e
+                attempt += 1
+                time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt)))
+
+    def _get(self, params: Dict) -> "requests.Response":
+        """One HTTP attempt, timed and counted by status"""
+        with METRICS.span("mymemory_request") as span:
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                span["status"] = response.status_code
+            except requests.Timeout:
+                span["status"] = "timeout"
+                raise
+            except requests.ConnectionError:
+                span["status"] = "connection_error"
+                raise
+            finally:
+                METRICS.inc("speakeasy_upstream_responses_total", provider="mymemory",
+                            status=span.get("status", "error"))
+        return response
+
+    def _acquire(self, text: str) -> None:
+        """Take the request's characters from the shared quota"""
+        if self.limiter is None:
+            return
+        try:
+            self.limiter.acquire("mymemory", {"chars": len(text)})
+        except RateLimitExceeded as e:
+            with self._lock:
+                self._stats["quota_errors"] += 1
+            raise MyMemoryQuotaError(f"MyMemory quota: {e}", 429) from e
+
+    def _take_retry_token(self, counter: str = "retries") -> bool:
+        """Spend one token from the retry budget (for a retry or a hedge)"""
+        with self._lock:
+            if self._retry_tokens < 1:
+                return False
+            self._retry_tokens -= 1
+            self._stats[counter] += 1
+            return True
+
+    def stats(self) -> Dict:
+        """Get request/retry/hedge/error counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self.session.close()
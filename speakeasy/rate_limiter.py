@@ -0,0 +1,419 @@
+"""
+Rate Limiter Module for SpeakEasy Translator
+Per-provider token buckets (characters, requests, tokens) with priority classes
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Union
+
+# Priority classes: lower goes first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Longest a request is allowed to queue before it is rejected (backpressure)
+DEFAULT_MAX_WAIT = {INTERACTIVE: 2.0, BATCH: 60.0}
+
+# Daily quota usage shared by every process on this machine (UI, batch CLI, HTTP service)
+DEFAULT_QUOTA_PATH = os.getenv("SPEAKEASY_QUOTA_PATH", os.path.join(".speakeasy", "quota.sqlite3"))
+
+_priority = contextvars.ContextVar("speakeasy_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the requests made inside the block (and in tasks submitted with its context) at a priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """Priority class of the current context"""
+    return _priority.get()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough OpenAI token count (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than allowed for its quota"""
+
+    def __init__(self, provider: str, bucket: str, retry_after: float):
+        if retry_after == float("inf"):
+            message = f"request exceeds the {provider} {bucket} limit"
+        else:
+            message = f"{provider} {bucket} limit reached (retry in {retry_after:.0f}s)"
+        super().__init__(message)
+        self.provider = provider
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously
+
+    Used for per-minute limits (a bucket refilled over 60s). A bucket starts full,
+    so over any `period` it may grant up to twice its capacity: daily quotas use
+    DailyQuota instead. Not thread-safe on its own (RateLimiter holds the provider
+    lock).
+    """
+
+    def __init__(self, capacity: float, period: float):
+        """
+        Args:
+            capacity: Maximum tokens (the quota)
+            period: Seconds needed to refill an empty bucket
+        """
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.consumed = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` tokens are available on top of `reserve` (inf if that exceeds the capacity)"""
+        if amount + reserve > self.capacity:
+            return float("inf")
+        self._refill(now)
+        if self.tokens - reserve >= amount:
+            return 0.0
+        return (amount + reserve - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= amount
+        self.consumed += amount
+
+    def drain(self, now: float) -> None:
+        """Empty the bucket (the provider told us the quota is gone)"""
+        self._refill(now)
+        self.tokens = 0.0
+
+
+class DailyQuota:
+    """
+    Quota that resets at every UTC day boundary (every `period` seconds since the epoch)
+
+    Never grants more than `capacity` per window, like the provider's own daily
+    quota. With a `db_path`, the usage of the current window is kept in SQLite and
+    shared by every process using that file, so the UI, the batch CLI and the HTTP
+    service draw from one quota (concurrent processes may overshoot it by at most
+    one request each). Same interface as TokenBucket.
+    """
+
+    def __init__(self, capacity: float, period: float = 86400, db_path: Optional[str] = None,
+                 name: str = "quota"):
+        """
+        Args:
+            capacity: Units allowed per window
+            period: Window length in seconds
+            db_path: Optional SQLite file sharing the usage between processes
+            name: Key of this quota in the database (e.g. 'mymemory.chars')
+        """
+        self.capacity = float(capacity)
+        self.period = period
+        self.name = name
+        self.consumed = 0.0
+        self._window = -1
+        self._used = 0.0
+        self._conn = self._connect(db_path) if db_path else None
+
+    @staticmethod
+    def _connect(db_path: str) -> Optional[sqlite3.Connection]:
+        """Open the usage table (local counting if the database can't be opened)"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS quota_usage (
+                    name TEXT NOT NULL,
+                    day INTEGER NOT NULL,
+                    used REAL NOT NULL,
+                    PRIMARY KEY (name, day)
+                )"""
+            )
+            conn.commit()
+            return conn
+        except sqlite3.Error:
+            return None
+
+    @property
+    def tokens(self) -> float:
+        return max(0.0, self.capacity - self._used)
+
+    def _refill(self, now: float) -> None:
+        window = int(time.time() // self.period)
+        if window != self._window:
+            self._window, self._used = window, 0.0
+        if self._conn is not None:
+            try:
+                row = self._conn.execute("SELECT used FROM quota_usage WHERE name = ? AND day = ?",
+                                         (self.name, window)).fetchone()
+                self._used = row[0] if row else 0.0
+            except sqlite3.Error:
+                pass
+
+    def _add(self, amount: float, at_least: float = 0.0) -> None:
+        """Record usage in the shared table"""
+        if self._conn is None:
+            return
+        try:
+            with self._conn:
+                self._conn.execute("INSERT OR IGNORE INTO quota_usage (name, day, used) VALUES (?, ?, 0)",
+                                   (self.name, self._window))
+                self._conn.execute("UPDATE quota_usage SET used = MAX(used + ?, ?) WHERE name = ? AND day = ?",
+                                   (amount, at_least, self.name, self._window))
+                # Older windows are no longer needed
+                self._conn.execute("DELETE FROM quota_usage WHERE name = ? AND day < ?", (self.name, self._window))
+        except sqlite3.Error:
+            pass
+
+    def wait_time(self, amount: float, now: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` units are available on top of `reserve` (inf if that exceeds the capacity)"""
+        if amount + reserve > self.capacity:
+            return float("inf")
+        self._refill(now)
+        if self.capacity - self._used - reserve >= amount:
+            return 0.0
+        return max(0.0, (self._window + 1) * self.period - time.time())
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self._used += amount
+        self.consumed += amount
+        self._add(amount)
+
+    def drain(self, now: float) -> None:
+        """Use up the current window (the provider told us the quota is gone)"""
+        self._refill(now)
+        self._used = max(self._used, self.capacity)
+        self._add(0.0, self.capacity)
+
+
+class _Provider:
+    """Buckets, wait queue and counters of one provider"""
+
+    def __init__(self, buckets: Dict[str, Union[TokenBucket, DailyQuota]]):
+        self.buckets = buckets
+        self.condition = threading.Condition()
+        self.queue = []
+        self.paused_until = 0.0
+        self.stats = {
+            "acquired": 0,
+            "rejected": 0,
+            "exhausted": 0,
+            "waits": {name: {"count": 0, "total": 0.0, "max": 0.0} for name in PRIORITY_NAMES.values()},
+        }
+
+
+class RateLimiter:
+    """
+    Shared rate limiter for the upstream providers
+
+    Each provider has one bucket per limited unit (e.g. MyMemory 'chars' per day,
+    OpenAI 'requests' and 'tokens' per minute). Requests queue per provider in
+    priority order, so interactive requests are always served before batch ones;
+    a request whose wait would exceed its priority's maximum is rejected right
+    away with RateLimitExceeded instead of piling up behind the quota. Batch
+    requests also leave a reserve of every bucket untouched, so a large job can't
+    spend the quota the UI needs.
+    """
+
+    def __init__(self, max_wait: Optional[Dict[int, float]] = None, batch_reserve: float = 0.1):
+        """
+        Args:
+            max_wait: Priority -> maximum queueing time in seconds (see DEFAULT_MAX_WAIT)
+            batch_reserve: Fraction of each bucket that only interactive requests may use
+        """
+        self.max_wait = dict(DEFAULT_MAX_WAIT, **(max_wait or {}))
+        self.batch_reserve = batch_reserve
+        self._providers: Dict[str, _Provider] = {}
+        self._sequence = itertools.count()
+
+    def add_provider(self, name: str, limits: Dict[str, Union[tuple, TokenBucket, DailyQuota]]) -> None:
+        """
+        Register a provider
+
+        Args:
+            name: Provider name ('mymemory', 'openai')
+            limits: Bucket name -> (capacity, period in seconds) for a TokenBucket, e.g.
+                {'requests': (500, 60)}, or a bucket such as DailyQuota(5000)
+        """
+        self._providers[name] = _Provider({
+            bucket: limit if not isinstance(limit, tuple) else TokenBucket(*limit) for bucket, limit in limits.items()
+        })
+
+    def acquire(self, provider: str, costs: Dict[str, float], priority: Optional[int] = None,
+                timeout: Optional[float] = None) -> float:
+        """
+        Wait until every bucket of a provider can pay for a request, then take the tokens
+
+        Args:
+            provider: Provider name (unknown providers are not limited)
+            costs: Bucket name -> amount, e.g. {'requests': 1, 'tokens': 350}
+            priority: INTERACTIVE or BATCH (defaults to the current context's priority)
+            timeout: Maximum wait in seconds (defaults to the priority's maximum)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the request can't be served within the timeout
+        """
+        state = self._providers.get(provider)
+        if state is None:
+            return 0.0
+        priority = current_priority() if priority is None else priority
+        timeout = self.max_wait.get(priority, DEFAULT_MAX_WAIT[BATCH]) if timeout is None else timeout
+
+        started = time.monotonic()
+        deadline = started + timeout
+        ticket = (priority, next(self._sequence))
+        with state.condition:
+            heapq.heappush(state.queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if state.queue[0] == ticket:
+                        reserve = self.batch_reserve if priority >= BATCH else 0.0
+                        bucket, wait = self._longest_wait(state, costs, now, reserve)
+                        if wait == 0.0:
+                            for name, amount in costs.items():
+                                if name in state.buckets:
+                                    state.buckets[name].take(amount, now)
+                            return self._record_wait(state, priority, now - started)
+                        if now + wait > deadline:
+                            state.stats["rejected"] += 1
+                            raise RateLimitExceeded(provider, bucket, wait)
+                        state.condition.wait(wait)
+                    else:
+                        # Someone with a higher priority (or earlier) is ahead
+                        if now >= deadline:
+                            state.stats["rejected"] += 1
+                            raise RateLimitExceeded(provider, "queue", 0.0)
+                        state.condition.wait(deadline - now)
+            finally:
+                if ticket in state.queue:
+                    state.queue.remove(ticket)
+                    heapq.heapify(state.queue)
+                state.condition.notify_all()
+
+    @staticmethod
+    def _longest_wait(state: _Provider, costs: Dict[str, float], now: float, reserve: float):
+        """Bucket that needs the longest wait and that wait"""
+        worst, longest = "", 0.0
+        if state.paused_until > now:
+            worst, longest = "retry-after", state.paused_until - now
+        for name, amount in costs.items():
+            bucket = state.buckets.get(name)
+            if bucket is None:
+                continue
+            wait = bucket.wait_time(amount, now, bucket.capacity * reserve)
+            if wait > longest:
+                worst, longest = name, wait
+        return worst, longest
+
+    @staticmethod
+    def _record_wait(state: _Provider, priority: int, waited: float) -> float:
+        state.stats["acquired"] += 1
+        waits = state.stats["waits"][PRIORITY_NAMES.get(priority, "batch")]
+        waits["count"] += 1
+        waits["total"] += waited
+        waits["max"] = max(waits["max"], waited)
+        return waited
+
+    def exhaust(self, provider: str, bucket: Optional[str] = None, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after the provider itself reported a quota or rate-limit error
+
+        Args:
+            bucket: Bucket to drain (all of them if omitted and no retry_after is given)
+            retry_after: Pause the provider for this many seconds instead of draining
+        """
+        state = self._providers.get(provider)
+        if state is None:
+            return
+        with state.condition:
+            now = time.monotonic()
+            if retry_after is not None:
+                state.paused_until = max(state.paused_until, now + retry_after)
+            else:
+                for name, token_bucket in state.buckets.items():
+                    if bucket is None or name == bucket:
+                        token_bucket.drain(now)
+            state.stats["exhausted"] += 1
+
+    def stats(self) -> Dict:
+        """
+        Get quota usage and queue metrics per provider
+
+        Returns:
+            Provider -> {'buckets': {name: {'capacity', 'available', 'consumed'}}, 'queued',
+            'acquired', 'rejected', 'exhausted', 'waits': {priority: {'count', 'avg', 'max'}}}
+        """
+        result = {}
+        for name, state in self._providers.items():
+            with state.condition:
+                now = time.monotonic()
+                buckets = {}
+                for bucket_name, bucket in state.buckets.items():
+                    bucket._refill(now)
+                    buckets[bucket_name] = {"capacity": bucket.capacity, "available": bucket.tokens,
+                                            "consumed": bucket.consumed}
+                waits = {
+                    priority: {"count": w["count"], "avg": w["total"] / w["count"] if w["count"] else 0.0,
+                               "max": w["max"]}
+                    for priority, w in state.stats["waits"].items()
+                }
+                result[name] = {"buckets": buckets, "queued": len(state.queue), "acquired": state.stats["acquired"],
+                                "rejected": state.stats["rejected"], "exhausted": state.stats["exhausted"],
+                                "waits": waits}
+        return result
+
+
+def create_rate_limiter(mymemory_email: Optional[str] = None, share: float = 1.0,
+                        quota_path: Optional[str] = DEFAULT_QUOTA_PATH) -> RateLimiter:
+    """
+    Build a limiter with the providers' documented free-tier limits
+
+    Environment overrides: MYMEMORY_DAILY_CHARS, OPENAI_RPM, OPENAI_TPM.
+
+    Args:
+        share: Fraction of the per-minute limits granted to this limiter (processes that split
+            them), and of the daily quota when it isn't shared through quota_path
+        quota_path: SQLite file holding the daily quota usage of every process (None: this process only)
+    """
+    email = mymemory_email if mymemory_email is not None else os.getenv("MYMEMORY_EMAIL", "")
+    # MyMemory: 5000 chars/day anonymous, 50000 with a contact email
+    daily_chars = int(os.getenv("MYMEMORY_DAILY_CHARS", 50000 if email else 5000))
+    if not quota_path:
+        daily_chars = daily_chars * share
+
+    limiter = RateLimiter()
+    limiter.add_provider("mymemory", {"chars": DailyQuota(max(1, int(daily_chars)), db_path=quota_path,
+                                                          name="mymemory.chars")})
+    limiter.add_provider("openai", {
+        "requests": (max(1, int(int(os.getenv("OPENAI_RPM", 500)) * share)), 60),
+        "tokens": (max(1, int(int(os.getenv("OPENAI_TPM", 200000)) * share)), 60),
+    })
+    return limiter
@@ -0,0 +1,185 @@
+"""
+Resilience Module for SpeakEasy Translator
+Circuit breakers, latency tracking and hedged requests for the upstream providers
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the provider's circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is failing - circuit open (next probe in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker
+
+    Closed: calls go through and consecutive failures are counted. After
+    `failure_threshold` of them the circuit opens and every call is refused at once
+    (no waiting for a timeout). After `recovery_timeout` it turns half-open and lets
+    `half_open_max_calls` probes through: a successful probe closes it, a failed
+    one opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update(time.monotonic())
+            return self._state
+
+    def _update(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def allow(self) -> None:
+        """
+        Reserve a call slot
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with its probes in flight)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._update(now)
+            if self._state == OPEN or (self._state == HALF_OPEN and self._probes >= self.half_open_max_calls):
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name, max(0.0, self._opened_at + self.recovery_timeout - now))
+            if self._state == HALF_OPEN:
+                self._probes += 1
+            self._stats["calls"] += 1
+
+    def release(self) -> None:
+        """Give back a slot reserved by allow() for a call that was not made"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+            self._stats["calls"] -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable, *args, is_failure: Callable[[Exception], bool] = lambda e: True, **kwargs):
+        """
+        Run fn through the breaker
+
+        Args:
+            is_failure: Whether an exception counts against the provider's health
+                (e.g. a quota error doesn't mean the provider is down)
+
+        Raises:
+            CircuitOpenError: If the circuit is open; otherwise whatever fn raised
+        """
+        self.allow()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict:
+        """Get the state and 'calls', 'failures', 'rejected', 'opened' counters"""
+        with self._lock:
+            self._update(time.monotonic())
+            return dict(self._stats, state=self._state)
+
+
+class LatencyTracker:
+    """Sliding window of recent successful latencies"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of the window, None while it is empty"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+def hedged_call(executor: ThreadPoolExecutor, fn: Callable, args: tuple, delay: float,
+                allow_hedge: Callable[[], bool] = lambda: True):
+    """
+    Run fn(*args), firing one duplicate if it hasn't answered after `delay` seconds
+
+    The first successful response wins; the loser keeps running in the background
+    and its result is dropped. If both fail, the last error is raised.
+
+    Args:
+        executor: Pool running the attempts
+        allow_hedge: Checked before firing the duplicate (e.g. a hedge budget)
+
+    Returns:
+        (result, winner) tuple; winner is None if no duplicate was fired, otherwise
+        'primary' or 'hedge' depending on which attempt answered first
+    """
+    # Attempts keep the caller's context (e.g. its rate-limit priority)
+    first = executor.submit(contextvars.copy_context().run, fn, *args)
+    done, _ = wait([first], timeout=delay)
+    if done or not allow_hedge():
+        return first.result(), None
+
+    pending = {first, executor.submit(contextvars.copy_context().run, fn, *args)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), "primary" if future is first else "hedge"
+            error = future.exception()
+    raise error
@@ -0,0 +1,133 @@
+"""
+Segmentation Module for SpeakEasy Translator
+Script-aware sentence/paragraph splitting that preserves the original layout
+"""
+
+import re
+from typing import List, Tuple
+
+# MyMemory rejects queries above 500 bytes (UTF-8); backends report their own limit
+DEFAULT_MAX_BYTES = 500
+
+# Blank lines separate paragraphs
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+# Sentence boundaries:
+# - CJK full-width terminators end a sentence even without a following space
+# - Latin / Arabic / Devanagari terminators must be followed by whitespace
+SENTENCE_BREAK = re.compile(
+    r"[。！？]+[」』”’）)]*(?P<cjk>\s*)"
+    r"|[.!?…؟۔।]+[\"'”’»)\]]*(?P<space>\s+)"
+)
+
+# Abbreviations that don't end a sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "e.g", "i.e", "mme", "mlle", "sr", "sra", "nr"}
+
+# Preferred places to cut a sentence that is still too long
+CLAUSE_BREAK = re.compile(r"[,;:，、；：،]\s*|\s+")
+
+
+def byte_length(text: str) -> int:
+    """Length of text in UTF-8 bytes (what upstream size limits count)"""
+    return len(text.encode("utf-8"))
+
+
+def split_segments(text: str, max_bytes: int = DEFAULT_MAX_BYTES) -> List[Tuple[str, bool]]:
+    """
+    Split text into translatable segments and verbatim separators
+
+    Consecutive sentences of a paragraph are packed into one segment as long as it
+    stays within max_bytes, so that short sentences don't cost one request each.
+
+    Args:
+        text: Input text
+        max_bytes: Maximum UTF-8 size of a translatable segment
+
+    Returns:
+        List of (piece, translatable) tuples; joining every piece gives back the input
+    """
+    pieces = []
+    position = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        pieces.extend(_pack(_split_paragraph(text[position:match.start()], max_bytes), max_bytes))
+        pieces.append((match.group(), False))
+        position = match.end()
+    pieces.extend(_pack(_split_paragraph(text[position:], max_bytes), max_bytes))
+    return pieces
+
+
+def _pack(pieces: List[Tuple[str, bool]], max_bytes: int) -> List[Tuple[str, bool]]:
+    """Merge consecutive sentences (and the spaces between them) up to max_bytes"""
+    packed = []
+    for piece, translatable in pieces:
+        if (translatable and len(packed) >= 2 and packed[-2][1] and not packed[-1][1]
+                and byte_length(packed[-2][0]) + byte_length(packed[-1][0]) + byte_length(piece) <= max_bytes):
+            separator = packed.pop()[0]
+            packed[-1] = (packed[-1][0] + separator + piece, True)
+        elif translatable and packed and packed[-1][1] and byte_length(packed[-1][0] + piece) <= max_bytes:
+            packed[-1] = (packed[-1][0] + piece, True)
+        else:
+            packed.append((piece, translatable))
+    return packed
+
+
+def _split_paragraph(paragraph: str, max_bytes: int) -> List[Tuple[str, bool]]:
+    """Split a paragraph into sentences"""
+    pieces = []
+    stripped = paragraph.lstrip()
+    if len(stripped) < len(paragraph):
+        pieces.append((paragraph[:len(paragraph) - len(stripped)], False))
+    paragraph = stripped
+
+    position = 0
+    for match in SENTENCE_BREAK.finditer(paragraph):
+        end = match.start("cjk") if match.group("cjk") is not None else match.start("space")
+        sentence = paragraph[position:end]
+        if _ends_with_abbreviation(sentence):
+            continue
+        _append_sentence(sentence, max_bytes, pieces)
+        if end < match.end():
+            pieces.append((paragraph[end:match.end()], False))
+        position = match.end()
+
+    rest = paragraph[position:]
+    trailing = rest[len(rest.rstrip()):]
+    if rest.rstrip():
+        _append_sentence(rest.rstrip(), max_bytes, pieces)
+    if trailing:
+        pieces.append((trailing, False))
+    return pieces
+
+
+def _ends_with_abbreviation(sentence: str) -> bool:
+    """Check whether a Latin-script sentence candidate ends with a known abbreviation"""
+    if not sentence.endswith("."):
+        return False
+    words = sentence[:-1].rsplit(None, 1)
+    return bool(words) and words[-1].lower() in ABBREVIATIONS
+
+
+def _append_sentence(sentence: str, max_bytes: int, pieces: list) -> None:
+    """Append a sentence, cutting it at clause boundaries if it is too long"""
+    while byte_length(sentence) > max_bytes:
+        # Number of characters that fit in max_bytes
+        max_chars = len(sentence.encode("utf-8")[:max_bytes].decode("utf-8", "ignore"))
+        cut = 0
+        for match in CLAUSE_BREAK.finditer(sentence, 0, max_chars):
+            if match.end() <= max_chars:
+                cut = match.end()
+        if cut == 0:
+            cut = max_chars
+        head = sentence[:cut].rstrip()
+        rest = sentence[cut:].lstrip()
+        pieces.append((head, True))
+        if len(head) + len(rest) < len(sentence):
+            pieces.append((sentence[len(head):len(sentence) - len(rest)], False))
+        sentence = rest
+    if sentence:
+        pieces.append((sentence, True))
+
+
+def join_segments(pieces: List[Tuple[str, bool]]) -> str:
+    """Reassemble segments (translated or not) in their original layout"""
+    return "".join(piece for piece, _ in pieces)
@@ -0,0 +1,412 @@
+"""
+Server Module for SpeakEasy Translator
+Headless HTTP JSON service over the translation core (asyncio front end, bounded worker pool)
+
+Endpoints:
+    POST /translate        {"text", "src", "dest", "mode"?, "ai"?}
+    POST /translate/batch  {"texts": [...], "src", "dest", "mode"?, "ai"?}
+    GET  /culture/{lang}   ?context=greetings|business|dining|gestures|taboos
+    GET  /health, GET /metrics
+
+Usage:
+    python -m speakeasy.server --port 8080 --workers 16 --processes 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .core import SpeakEasy
+from .cultural_context import CONVERSATION_MODES
+from .metrics import METRICS
+from .mymemory_client import MyMemoryError, MyMemoryQuotaError
+from .rate_limiter import BATCH, INTERACTIVE, create_rate_limiter, request_priority
+
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 1024 * 1024
+MAX_TEXT_CHARS = 10000
+MAX_BATCH_SIZE = 100
+
+
+class HTTPError(Exception):
+    """Raised by request handlers to answer with an error status"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class TranslationServer:
+    """
+    HTTP/1.1 JSON front end over one SpeakEasy
+
+    The event loop only parses requests and writes responses; translations are
+    blocking, so they run on a bounded thread pool. At most `max_pending`
+    translations may wait for or occupy a worker - beyond that requests get an
+    immediate 503 instead of queueing without bound. Every request has a deadline
+    (504 when it passes) and connections stay open between requests until they
+    have been idle for `keepalive_timeout` seconds.
+    """
+
+    def __init__(self, translator: Optional[SpeakEasy] = None, workers: int = 16, max_pending: int = 256,
+                 request_timeout: float = 30.0, keepalive_timeout: float = 5.0):
+        """
+        Args:
+            translator: Shared core (default: a new SpeakEasy without durable history)
+            workers: Threads running translations
+            max_pending: Translations admitted at once (running + queued)
+            request_timeout: Seconds before a request is answered with 504
+            keepalive_timeout: Seconds an idle connection is kept open
+        """
+        self.translator = translator if translator is not None else SpeakEasy(history_path=None)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speakeasy-server")
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._routes = {
+            ("POST", "/translate"): self._translate,
+            ("POST", "/translate/batch"): self._translate_batch,
+            ("GET", "/health"): self._health,
+            ("GET", "/metrics"): self._metrics,
+        }
+
+    # ---- worker pool ----
+
+    def _admit(self, count: int) -> None:
+        """Reserve `count` pending slots, or refuse the request"""
+        with self._pending_lock:
+            if self._pending + count > self.max_pending:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server overloaded", {"Retry-After": "1"})
+            self._pending += count
+
+    def _release(self, _future=None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def _run_all(self, calls: List[Tuple[Callable, tuple]], timeout: Optional[float] = None) -> List:
+        """
+        Run blocking calls on the worker pool
+
+        Slots are released when a call actually finishes (not when the request times
+        out), so abandoned work still counts against `max_pending`.
+
+        Args:
+            timeout: Seconds left before the 504 (default `request_timeout`), for handlers
+                that run several steps under one deadline
+
+        Returns:
+            One result or exception per call, in order
+
+        Raises:
+            HTTPError: 503 if the pool is saturated, 504 if the deadline passes
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        if timeout <= 0:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Translation timed out")
+        self._admit(len(calls))
+        futures = []
+        for fn, args in calls:
+            future = self.executor.submit(fn, *args)
+            future.add_done_callback(self._release)
+            futures.append(asyncio.wrap_future(future))
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Translation timed out")
+
+    def _translate_one(self, text: str, src: str, dest: str, mode: str, ai_enabled: bool, priority: int) -> Dict:
+        with request_priority(priority):
+            return self.translator.translate(text, src, dest, mode, ai_enabled=ai_enabled)
+
+    def _prefetch(self, texts: List[str], src: str, dest: str, mode: str) -> int:
+        with request_priority(BATCH):
+            return self.translator.pipeline.prefetch(texts, src, dest, mode)
+
+    # ---- handlers ----
+
+    def _parse_request(self, body: bytes, field: str) -> Tuple[Dict, str, str, str, bool]:
+        """Decode and validate a translation request body"""
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        src, dest = request.get("src"), request.get("dest")
+        if not isinstance(src, str) or not isinstance(dest, str) or not src or not dest:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'src' and 'dest' language codes are required")
+        mode = request.get("mode", "casual")
+        if mode not in CONVERSATION_MODES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"'mode' must be one of {', '.join(CONVERSATION_MODES)}")
+        if field not in request:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{field}' is required")
+        ai = request.get("ai", True)
+        if not isinstance(ai, bool):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'ai' must be true or false")
+        ai_enabled = ai and self.translator.ai_available
+        return request, src, dest, mode, ai_enabled
+
+    @staticmethod
+    def _check_text(text) -> None:
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Texts must be non-empty strings")
+        if len(text) > MAX_TEXT_CHARS:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Texts are limited to {MAX_TEXT_CHARS} characters")
+
+    @staticmethod
+    def _raise_for(error: Exception) -> None:
+        """Map a translation failure to an HTTP error"""
+        if isinstance(error, MyMemoryQuotaError):
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, str(error), {"Retry-After": "60"})
+        if isinstance(error, MyMemoryError):
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, str(error))
+        raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Translation failed: {error}")
+
+    async def _translate(self, body: bytes, query: Dict) -> Dict:
+        request, src, dest, mode, ai_enabled = self._parse_request(body, "text")
+        self._check_text(request["text"])
+        result, = await self._run_all([(self._translate_one,
+                                        (request["text"], src, dest, mode, ai_enabled, INTERACTIVE))])
+        if isinstance(result, Exception):
+            self._raise_for(result)
+        return result
+
+    async def _translate_batch(self, body: bytes, query: Dict) -> Dict:
+        # One deadline for the prefetch and the fan-out together
+        deadline = time.monotonic() + self.request_timeout
+        request, src, dest, mode, ai_enabled = self._parse_request(body, "texts")
+        texts = request["texts"]
+        if not isinstance(texts, list) or not texts:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'texts' must be a non-empty list")
+        if len(texts) > MAX_BATCH_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Batches are limited to {MAX_BATCH_SIZE} texts")
+        for text in texts:
+            self._check_text(text)
+
+        # A batching backend fetches the base translations in a few requests; each text then hits the cache
+        if self.translator.pipeline.batching:
+            await self._run_all([(self._prefetch, (texts, src, dest, mode))], deadline - time.monotonic())
+        # Batch requests yield their quota to interactive ones
+        results = await self._run_all([(self._translate_one, (text, src, dest, mode, ai_enabled, BATCH))
+                                       for text in texts], deadline - time.monotonic())
+        items = []
+        for result in results:
+            if isinstance(result, Exception):
+                items.append({"error": str(result)})
+            else:
+                items.append({"translation": result["translation"], "insight": result["insight"],
+                              "memory_match": result["memory_match"], "cached": result["cached"]})
+        context = self.translator.cultural_engine.get_context_for_conversation(src, dest, mode)
+        return {"results": items, "failed": sum("error" in item for item in items), "cultural_context": context}
+
+    async def _culture(self, language: str, query: Dict) -> Dict:
+        context_type = query.get("context", ["general"])[0]
+        context = self.translator.cultural_engine.get_cultural_context(language, context_type)
+        if "message" in context and "name" not in context:
+            raise HTTPError(HTTPStatus.NOT_FOUND, context["message"])
+        return context
+
+    async def _health(self, body: bytes, query: Dict) -> Dict:
+        with self._pending_lock:
+            pending = self._pending
+        return {"status": "ok", "pending": pending, "max_pending": self.max_pending,
+                "ai": self.translator.ai_available}
+
+    async def _metrics(self, body: bytes, query: Dict) -> str:
+        return METRICS.render_prometheus()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, object, Dict[str, str], str]:
+        """Route one request; returns (status, payload, extra headers, route label)"""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        route = url.path
+        try:
+            if url.path.startswith("/culture/") and len(url.path) > len("/culture/"):
+                route = "/culture/{lang}"
+                if method != "GET":
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET", {"Allow": "GET"})
+                return HTTPStatus.OK, await self._culture(unquote(url.path[len("/culture/"):]), query), {}, route
+            handler = self._routes.get((method, url.path))
+            if handler is None:
+                allowed = [m for m, path in self._routes if path == url.path]
+                if allowed:
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {allowed[0]}", {"Allow": allowed[0]})
+                route = "other"
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {url.path}")
+            return HTTPStatus.OK, await handler(body, query), {}, route
+        except HTTPError as e:
+            return e.status, {"error": str(e)}, e.headers, route
+
+    # ---- HTTP/1.1 ----
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes, idles out or asks to close"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = await self._read_headers(reader)
+                except (ValueError, asyncio.TimeoutError):
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request"}, False)
+                    break
+                if "transfer-encoding" in headers:
+                    await self._respond(writer, HTTPStatus.NOT_IMPLEMENTED,
+                                        {"error": "Chunked bodies are not supported"}, False)
+                    break
+                length = headers.get("content-length", "0").strip()
+                # int() would also take "-1", "+1" or "1_000"
+                if not length.isdigit() or not length.isascii():
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False)
+                    break
+                body = await asyncio.wait_for(reader.readexactly(length), self.request_timeout) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                started = time.perf_counter()
+                status, payload, extra, route = await self._dispatch(method, target, body)
+                METRICS.observe("speakeasy_http_request_seconds", time.perf_counter() - started, route=route)
+                METRICS.inc("speakeasy_http_requests_total", route=route, status=str(int(status)))
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+            if not line.strip():
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise ValueError("Too many headers")
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool,
+                       extra: Optional[Dict[str, str]] = None) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            # Cultural data is read-only (MappingProxyType / tuples)
+            body = json.dumps(payload, ensure_ascii=False, default=dict).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keep_alive else "close")]
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        lines.extend(f"{name}: {value}" for name, value in (extra or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, sock: socket.socket) -> None:
+        """Accept connections on a bound, listening socket until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.translator.close()
+
+
+def _interrupt(signum, frame):
+    """SIGTERM handler: stop like Ctrl-C so that cleanup runs"""
+    raise KeyboardInterrupt
+
+
+def _serve_process(sock: socket.socket, processes: int, options: Dict) -> None:
+    """Run one server process on the shared socket (quotas are split between processes)"""
+    signal.signal(signal.SIGTERM, _interrupt)
+    translator = SpeakEasy(history_path=None, limiter=create_rate_limiter(share=1 / processes))
+    server = TranslationServer(translator, **options)
+    try:
+        asyncio.run(server.serve(sock))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def run(host: str = "127.0.0.1", port: int = 8080, processes: int = 1, **options) -> None:
+    """
+    Serve until interrupted
+
+    With several processes the listening socket is bound once and inherited by
+    forked workers, which the kernel load-balances; each process has its own
+    worker pool, cache tier in memory and 1/processes of the provider quotas.
+    The SQLite cache file is shared.
+    """
+    sock = socket.create_server((host, port), backlog=1024)
+    if processes <= 1 or not hasattr(os, "fork"):
+        _serve_process(sock, 1, options)
+        return
+
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_process(sock, processes, options)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    sock.close()
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="SpeakEasy HTTP translation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--processes", type=int, default=1, help="Server processes sharing the port")
+    parser.add_argument("--workers", type=int, default=16, help="Translation threads per process")
+    parser.add_argument("--max-pending", type=int, default=256, help="Admitted translations per process")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request deadline in seconds")
+    parser.add_argument("--keepalive", type=float, default=5.0, help="Idle keep-alive timeout in seconds")
+    args = parser.parse_args(argv)
+
+    print(f"SpeakEasy service: http://{args.host}:{args.port} ({args.processes} process(es))", flush=True)
+    run(args.host, args.port, args.processes, workers=args.workers, max_pending=args.max_pending,
+        request_timeout=args.timeout, keepalive_timeout=args.keepalive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Session Store Module for SpeakEasy Translator
+Per-session state with a memory budget, spilling idle sessions to SQLite
+"""
+
+import copyreg
+import io
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import METRICS
+
+DEFAULT_SESSION_PATH = os.getenv(
+    "SPEAKEASY_SESSION_PATH", os.path.join(".speakeasy", "sessions.sqlite3")
+)
+DEFAULT_BUDGET_BYTES = int(os.getenv("SPEAKEASY_SESSION_BUDGET_KB", 512)) * 1024
+DEFAULT_IDLE_SECONDS = float(os.getenv("SPEAKEASY_SESSION_IDLE_SECONDS", 900))
+# Values used this recently are never spilled for the budget (the app reads them on every rerun)
+DEFAULT_RESIDENT_SECONDS = 60.0
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    Deep size of a value in bytes (approximate)
+
+    Read-only mappings (MappingProxyType) are shared process-wide data, such as the
+    precomputed cultural contexts, so they count as zero.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen or isinstance(value, MappingProxyType):
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool, array)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, seen) for item in value)
+    getstate = getattr(type(value), "__getstate__", None)
+    if getstate is not None and getstate is not getattr(object, "__getstate__", None):
+        # Only what would be serialized (e.g. no cached DataFrame)
+        return size + estimate_size(value.__getstate__(), seen)
+    if hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value), seen)
+    return size
+
+
+def _dumps(value: Any) -> bytes:
+    """Compressed pickle; read-only mappings are stored as plain dicts"""
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[MappingProxyType] = lambda m: (dict, (dict(m),))
+    pickler.dump(value)
+    return zlib.compress(buffer.getvalue())
+
+
+class _Session:
+    """Bookkeeping of one session (values in LRU order, sizes and their total, last uses, spilled keys)"""
+
+    __slots__ = ("values", "sizes", "versions", "total", "used", "spilled", "last_access")
+
+    def __init__(self, spilled: set):
+        self.values: "OrderedDict[str, Any]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.versions: Dict[str, Any] = {}
+        self.total = 0
+        self.used: Dict[str, float] = {}
+        self.spilled = spilled
+        self.last_access = time.monotonic()
+
+    def touch(self, key: str) -> None:
+        self.values.move_to_end(key)
+        self.last_access = self.used[key] = time.monotonic()
+
+    def measure(self, key: str) -> None:
+        """Record the deep size of a value, and its version if it changes in place"""
+        value = self.values[key]
+        size = estimate_size(value)
+        self.total += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+        self.versions[key] = getattr(value, "version", None)
+
+    def forget(self, key: str) -> None:
+        """Drop a value's bookkeeping once it left memory"""
+        self.total -= self.sizes.pop(key, 0)
+        self.versions.pop(key, None)
+        self.used.pop(key, None)
+
+
+class SessionStore:
+    """
+    Memory-bounded state of every browser session
+
+    Each session holds a few values (last translation and its cultural context,
+    the in-memory history fallback...). Their deep size is measured when they are
+    written or rehydrated, and kept as a running total per session; a value
+    changed in place is measured again only when its `version` attribute (as on
+    ConversationHistory) has changed:
+
+    - over `budget_bytes`, the session's least recently used values are written
+      to disk until it fits again. Values used in the last `resident_seconds`
+      stay in memory, so that those read on every rerun aren't spilled and
+      rehydrated each time: a session whose live values exceed the budget stays
+      over it, and callers bound large values themselves;
+    - after `idle_seconds` without access, the whole session is written to disk
+      and dropped from memory.
+
+    Spilled values are zlib-compressed pickles in a SQLite table, rehydrated one
+    by one when the session reads them again, including after a restart. A
+    spilled value is a snapshot: read values again instead of keeping references
+    across writes of other values.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_SESSION_PATH, budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS, sweep_interval: float = 30.0,
+                 retention_seconds: float = 7 * 24 * 3600, resident_seconds: float = DEFAULT_RESIDENT_SECONDS):
+        """
+        Args:
+            db_path: SQLite file of spilled values (None keeps everything in memory)
+            budget_bytes: Memory budget of one session
+            idle_seconds: Inactivity after which a session is spilled
+            sweep_interval: Minimum seconds between idle sweeps
+            retention_seconds: Age after which spilled values are deleted
+            resident_seconds: Values used this recently are not spilled for the budget
+        """
+        self.db_path = db_path
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.resident_seconds = resident_seconds
+        self.sweep_interval = sweep_interval
+        self.retention_seconds = retention_seconds
+
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self._stats = {"spilled_values": 0, "spilled_sessions": 0, "rehydrated": 0}
+        self._conn = self._connect()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the spill table (memory-only if the database can't be opened)"""
+        if not self.db_path:
+            return None
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS session_values (
+                    session_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    spilled_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, key)
+                )"""
+            )
+            conn.commit()
+            return conn
+        except sqlite3.Error:
+            return None
+
+    def session(self, session_id: str) -> "SessionState":
+        """
+        Get the state of a session (created, or reattached to its spilled values)
+
+        Cheap enough to call several times per run: the session is marked active,
+        values changed in place since they were measured are measured again, and the
+        session is brought back under its budget.
+        """
+        with self._lock:
+            record = self._record(session_id)
+            record.last_access = time.monotonic()
+            for key, value in record.values.items():
+                version = getattr(value, "version", None)
+                if version is not None and version != record.versions.get(key):
+                    record.measure(key)
+            self._enforce_budget(session_id, record)
+        self._maybe_sweep()
+        return SessionState(self, session_id)
+
+    def _record(self, session_id: str) -> _Session:
+        record = self._sessions.get(session_id)
+        if record is None:
+            spilled = set()
+            if self._conn is not None:
+                try:
+                    spilled = {row[0] for row in self._conn.execute(
+                        "SELECT key FROM session_values WHERE session_id = ?", (session_id,))}
+                except sqlite3.Error:
+                    pass
+            record = self._sessions[session_id] = _Session(spilled)
+        return record
+
+    # ---- values ----
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            record = self._record(session_id)
+            record.last_access = time.monotonic()
+            if key in record.values:
+                record.touch(key)
+                return record.values[key]
+            if key in record.spilled:
+                value = self._rehydrate(session_id, record, key)
+                if value is not None:
+                    record.touch(key)
+                    self._enforce_budget(session_id, record)
+                    return value
+            return default
+
+    def set(self, session_id: str, key: str, value: Any) -> None:
+        with self._lock:
+            record = self._record(session_id)
+            record.last_access = time.monotonic()
+            self._discard_spilled(session_id, record, key)
+            record.values[key] = value
+            record.touch(key)
+            record.measure(key)
+            self._enforce_budget(session_id, record)
+
+    def delete(self, session_id: str, key: str) -> None:
+        with self._lock:
+            record = self._record(session_id)
+            record.values.pop(key, None)
+            record.forget(key)
+            self._discard_spilled(session_id, record, key)
+
+    def keys(self, session_id: str) -> List[str]:
+        with self._lock:
+            record = self._record(session_id)
+            return list(record.values) + sorted(record.spilled - set(record.values))
+
+    # ---- spill / rehydrate ----
+
+    def _spill(self, session_id: str, record: _Session, key: str) -> bool:
+        """Write one value to disk and drop it from memory"""
+        if self._conn is None:
+            return False
+        try:
+            blob = _dumps(record.values[key])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_values (session_id, key, value, spilled_at) VALUES (?, ?, ?, ?)",
+                (session_id, key, blob, time.time())
+            )
+            self._conn.commit()
+        except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        del record.values[key]
+        record.forget(key)
+        record.spilled.add(key)
+        self._stats["spilled_values"] += 1
+        return True
+
+    def _rehydrate(self, session_id: str, record: _Session, key: str) -> Any:
+        """Load one spilled value back into memory"""
+        try:
+            row = self._conn.execute("SELECT value FROM session_values WHERE session_id = ? AND key = ?",
+                                     (session_id, key)).fetchone()
+            value = pickle.loads(zlib.decompress(row[0])) if row else None
+        except (sqlite3.Error, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            value = None
+        self._discard_spilled(session_id, record, key)
+        if value is None:
+            return None
+        record.values[key] = value
+        record.measure(key)
+        self._stats["rehydrated"] += 1
+        METRICS.inc("speakeasy_session_rehydrations_total")
+        return value
+
+    def _discard_spilled(self, session_id: str, record: _Session, key: str) -> None:
+        if key in record.spilled:
+            record.spilled.discard(key)
+            try:
+                self._conn.execute("DELETE FROM session_values WHERE session_id = ? AND key = ?", (session_id, key))
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def _enforce_budget(self, session_id: str, record: _Session) -> None:
+        """Spill least recently used values, except the resident ones, until the session fits"""
+        resident_since = time.monotonic() - self.resident_seconds
+        while record.total > self.budget_bytes and record.values:
+            key = next(iter(record.values))
+            # Values are in LRU order: the following ones were all used even more recently
+            if record.used.get(key, 0.0) >= resident_since:
+                break
+            if not self._spill(session_id, record, key):
+                break
+            METRICS.inc("speakeasy_session_spills_total", reason="budget")
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Spill every session idle for `idle_seconds` and forget it in memory
+
+        Returns:
+            Number of sessions spilled
+        """
+        now = time.monotonic() if now is None else now
+        spilled = 0
+        with self._lock:
+            for session_id, record in list(self._sessions.items()):
+                if now - record.last_access < self.idle_seconds:
+                    continue
+                for key in list(record.values):
+                    self._spill(session_id, record, key)
+                # Values that couldn't be written stay in memory
+                if not record.values:
+                    del self._sessions[session_id]
+                    spilled += 1
+            self._stats["spilled_sessions"] += spilled
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM session_values WHERE spilled_at < ?",
+                                       (time.time() - self.retention_seconds,))
+                    self._conn.commit()
+                except sqlite3.Error:
+                    pass
+        if spilled:
+            METRICS.inc("speakeasy_session_spills_total", spilled, reason="idle")
+        return spilled
+
+    # ---- reporting ----
+
+    def footprints(self) -> List[Dict]:
+        """Memory footprint of every session in memory, largest first"""
+        now = time.monotonic()
+        with self._lock:
+            rows = [{
+                "session": session_id,
+                "bytes": record.total,
+                "values": len(record.values),
+                "spilled": len(record.spilled),
+                "idle_seconds": round(now - record.last_access, 1),
+            } for session_id, record in self._sessions.items()]
+        return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+    def stats(self) -> Dict:
+        """Totals ('sessions', 'bytes', 'budget_bytes', 'spilled_values', 'spilled_sessions', 'rehydrated')"""
+        with self._lock:
+            total = sum(record.total for record in self._sessions.values())
+            return {"sessions": len(self._sessions), "bytes": total, "budget_bytes": self.budget_bytes,
+                    **self._stats}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SessionState(MutableMapping):
+    """Dictionary view of one session's values in a SessionStore"""
+
+    def __init__(self, store: SessionStore, session_id: str):
+        self._store = store
+        self.session_id = session_id
+
+    def __getitem__(self, key: str) -> Any:
+        missing = object()
+        value = self._store.get(self.session_id, key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._store.set(self.session_id, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._store.delete(self.session_id, key)
+
+    def __contains__(self, key) -> bool:
+        # Doesn't rehydrate spilled values
+        return key in self._store.keys(self.session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.keys(self.session_id))
+
+    def __len__(self) -> int:
+        return len(self._store.keys(self.session_id))
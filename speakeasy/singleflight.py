@@ -0,0 +1,110 @@
+"""
+Single-Flight Module for SpeakEasy Translator
+Coalesces concurrent identical calls into one upstream call whose result is shared
+"""
+
+import threading
+from typing import Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    __slots__ = ("done", "result", "error", "aborted", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.aborted = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-process request coalescing
+
+    The first caller for a key (the leader) runs the function; callers arriving with
+    the same key while it is running wait for it and get the same result (or the same
+    exception) instead of starting their own call. Nothing is remembered once the
+    call returns - that is the cache's job.
+
+    Only errors (Exception subclasses) are shared. When the leader is interrupted
+    by anything else (KeyboardInterrupt, a Streamlit stop/rerun of its session), the
+    waiters are woken up and retry, one of them becoming the new leader.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "executions": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[object, bool]:
+        """
+        Run fn(*args, **kwargs) unless an identical call is already in flight
+
+        Args:
+            key: Identity of the call (callers with equal keys share one execution)
+
+        Returns:
+            (result, shared) tuple; shared is True when the result came from another caller's call
+
+        Raises:
+            The Exception fn raised, in the leader and in every waiting caller; other
+            BaseExceptions only in the leader
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    leader = False
+                else:
+                    call = self._calls[key] = _Call()
+                    self._stats["executions"] += 1
+                    leader = True
+
+            if leader:
+                break
+            call.done.wait()
+            if call.aborted:
+                continue
+            with self._lock:
+                self._stats["shared"] += 1
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.aborted = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """
+        Get coalescing counters
+
+        Returns:
+            Dictionary with 'calls', 'executions', 'shared' (upstream calls saved) and 'in_flight'
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
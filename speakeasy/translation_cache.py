@@ -0,0 +1,201 @@
+"""
+Translation Cache Module for SpeakEasy Translator
+Two-tier cache (in-memory LRU + SQLite on disk) shared by all sessions
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "SPEAKEASY_CACHE_PATH", os.path.join(".speakeasy", "translation_cache.sqlite3")
+)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookups (Unicode NFKC + collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def make_cache_key(text: str, src_lang: str, dest_lang: str, mode: str) -> str:
+    """Build the cache key for a translation request"""
+    return "\x1f".join((normalize_text(text), src_lang.lower(), dest_lang.lower(), mode))
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache
+
+    The memory tier is a bounded LRU; the disk tier is a SQLite table that
+    survives restarts and is shared by every Streamlit session of the process.
+    Entries are dictionaries (base translation, AI-enhanced translation, AI insight)
+    serialized as JSON on disk.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_memory_entries: int = 2048,
+                 max_disk_entries: int = 100_000, ttl_seconds: float = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+        self._conn = self._connect()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier (memory-only if the database can't be opened)"""
+        if not self.db_path:
+            return None
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations(accessed_at)")
+            conn.commit()
+            return conn
+        except sqlite3.Error:
+            return None
+
+    def get(self, text: str, src_lang: str, dest_lang: str, mode: str) -> Optional[Dict]:
+        """
+        Look up a cached translation
+
+        Returns:
+            The cached entry, or None on a miss (or an expired entry)
+        """
+        key = make_cache_key(text, src_lang, dest_lang, mode)
+        now = time.time()
+
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created_at, value = item
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return dict(value)
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, created_at FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        if now - row[1] <= self.ttl_seconds:
+                            self._conn.execute(
+                                "UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key)
+                            )
+                            self._conn.commit()
+                            value = json.loads(row[0])
+                            self._remember(key, row[1], value)
+                            self._stats["disk_hits"] += 1
+                            return dict(value)
+                        self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                        self._conn.commit()
+                        self._stats["expired"] += 1
+                except (sqlite3.Error, ValueError):
+                    pass
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, text: str, src_lang: str, dest_lang: str, mode: str, entry: Dict,
+            ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a translation entry in both tiers
+
+        Args:
+            ttl_seconds: Shorter lifetime for this entry (default: the cache TTL)
+        """
+        key = make_cache_key(text, src_lang, dest_lang, mode)
+        now = time.time()
+        value = dict(entry)
+        # Entries expire ttl_seconds after created_at: a shorter lifetime is an earlier creation
+        created_at = now if ttl_seconds is None else now - max(0.0, self.ttl_seconds - ttl_seconds)
+
+        with self._lock:
+            self._remember(key, created_at, value)
+
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), created_at, now),
+                )
+                self._conn.commit()
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 256:
+                    self._trim_disk(now)
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key: str, created_at: float, value: Dict) -> None:
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _trim_disk(self, now: float) -> None:
+        """Drop expired rows and the least recently used rows above the size limit"""
+        self._writes_since_trim = 0
+        cursor = self._conn.execute(
+            "DELETE FROM translations WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self._stats["expired"] += max(cursor.rowcount, 0)
+        cursor = self._conn.execute(
+            """DELETE FROM translations WHERE key IN (
+                SELECT key FROM translations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_disk_entries,),
+        )
+        self._stats["evictions"] += max(cursor.rowcount, 0)
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM translations")
+                    self._conn.commit()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            return stats
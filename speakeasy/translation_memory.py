@@ -0,0 +1,460 @@
+"""
+Translation Memory Module for SpeakEasy Translator
+Local fuzzy translation memory (character n-gram MinHash index per language pair)
+"""
+
+import hashlib
+import importlib.util
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cultural_search import fold
+from .translation_cache import normalize_text
+
+DEFAULT_MEMORY_PATH = os.getenv(
+    "SPEAKEASY_TM_PATH", os.path.join(".speakeasy", "translation_memory.sqlite3")
+)
+# 1.0 reuses exact matches only; fuzzy reuse (e.g. 0.9) is opt-in
+DEFAULT_THRESHOLD = float(os.getenv("SPEAKEASY_TM_THRESHOLD", "1"))
+DEFAULT_MAX_SEGMENTS = int(os.getenv("SPEAKEASY_TM_MAX_SEGMENTS", "1000000"))
+DEFAULT_TTL_SECONDS = 90 * 24 * 3600
+
+NGRAM = 3
+# 12 bands of 4 rows: near-duplicates (n-gram Jaccard >= 0.75) share a band 99% of
+# the time, unrelated sentences (Jaccard ~0.1) about once in a thousand
+BANDS = 12
+ROWS = 4
+NUM_HASHES = BANDS * ROWS
+MAX_CANDIDATES = 8
+MAX_BUCKET_ROWS = 256
+# Shorter inputs are only served on exact matches: one edited character is already 10%
+MIN_FUZZY_CHARS = 20
+# MyMemory entries below this quality (0-100) are not kept
+MIN_SEED_QUALITY = 70
+
+NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+# Words of accent-folded text, keeping contractions ("can't", "n'est") whole
+WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+# Accent-folded negation words (en, fr, es, it, pt, de, nl); "-n't" and "n'-" forms are matched separately
+NEGATIONS = {
+    "not", "no", "never", "none", "nothing", "nobody", "nor", "cannot", "without",
+    "ne", "pas", "jamais", "rien", "personne", "aucun", "aucune", "sans", "non",
+    "nunca", "nada", "nadie", "ningun", "ninguno", "ninguna", "tampoco", "sin",
+    "mai", "niente", "nessuno", "nessuna", "senza", "nao", "nem", "nenhum", "nenhuma", "sem",
+    "nicht", "kein", "keine", "keinen", "keinem", "keiner", "nie", "niemals", "nichts", "ohne",
+    "niet", "geen", "nooit",
+}
+MASK64 = (1 << 64) - 1
+
+# Fixed seed: signatures are stored on disk and must not change between runs
+_rng = random.Random(0x5EA5E)
+HASH_A = [_rng.getrandbits(64) | 1 for _ in range(NUM_HASHES)]
+HASH_B = [_rng.getrandbits(64) for _ in range(NUM_HASHES)]
+del _rng
+
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+_np = None
+
+
+def shingles(text: str) -> List[int]:
+    """Hashes of the accent-folded character n-grams of a text"""
+    folded = " " + fold(normalize_text(text)) + " "
+    grams = {folded[i:i + NGRAM] for i in range(max(1, len(folded) - NGRAM + 1))}
+    return [zlib.crc32(gram.encode("utf-8")) for gram in grams]
+
+
+def minhash(hashes: List[int]) -> List[int]:
+    """
+    MinHash signature of a set of shingle hashes
+
+    Uses multiply-shift hashing ((a * x + b) mod 2^64) >> 32; vectorized with numpy
+    when it is installed, with identical results in pure Python.
+    """
+    global _np
+    if NUMPY_AVAILABLE:
+        if _np is None:
+            import numpy
+            _np = numpy
+        x = _np.array(hashes, dtype=_np.uint64)
+        a = _np.array(HASH_A, dtype=_np.uint64)[:, None]
+        b = _np.array(HASH_B, dtype=_np.uint64)[:, None]
+        return ((a * x + b) >> _np.uint64(32)).min(axis=1).tolist()
+    return [min(((a * x + b) & MASK64) >> 32 for x in hashes) for a, b in zip(HASH_A, HASH_B)]
+
+
+def band_keys(pair: str, signature: List[int]) -> List[int]:
+    """LSH bucket keys (signed 64-bit, as stored by SQLite) of a signature"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f">B{ROWS}I", band, *rows), digest_size=8,
+                                 key=pair.encode("utf-8")[:64]).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between two strings, or limit + 1 once it exceeds limit
+
+    Only the diagonal band of width 2 * limit + 1 is computed, and the scan stops as
+    soon as a whole row is over the limit, so unrelated strings are rejected early.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, char in enumerate(a, 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        for j in range(low, high + 1):
+            cost = 0 if char == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost, over)
+        if min(current[max(0, low - 1):high + 1]) > limit:
+            return over
+        previous = current
+    return previous[len(b)]
+
+
+def _is_negation(word: str) -> bool:
+    return word in NEGATIONS or word.endswith(("n't", "n’t")) or word.startswith(("n'", "n’"))
+
+
+def _is_typo(old: str, new: str) -> bool:
+    """Whether a changed word looks like a spelling slip rather than another word or form"""
+    if min(len(old), len(new)) < 4 or old[0] != new[0]:
+        return False
+    # Changes at the end of a word are inflections (contract/contracts, send/sent)
+    common = 0
+    while common < min(len(old), len(new)) and old[common] == new[common]:
+        common += 1
+    if common >= min(len(old), len(new)) - 2:
+        return False
+    return bounded_edit_distance(old, new, 2) <= 2
+
+
+def same_meaning(a: str, b: str) -> bool:
+    """
+    Whether two near-duplicate texts can share a translation
+
+    Their numbers and negations must be the same, and their words may differ by at
+    most one spelling slip: "can"/"can't", "contract"/"contracts" or "Marie"/"Pierre"
+    change the translation however close the strings are.
+    """
+    if NUMBER.findall(a) != NUMBER.findall(b):
+        return False
+    words_a, words_b = WORD.findall(fold(a)), WORD.findall(fold(b))
+    if [w for w in words_a if _is_negation(w)] != [w for w in words_b if _is_negation(w)]:
+        return False
+    removed, added = Counter(words_a) - Counter(words_b), Counter(words_b) - Counter(words_a)
+    if not removed and not added:
+        return True
+    if sum(removed.values()) != 1 or sum(added.values()) != 1:
+        return False
+    return _is_typo(next(iter(removed)), next(iter(added)))
+
+
+def similarity(a: str, b: str, threshold: float = 0.0) -> float:
+    """Edit-distance similarity (1 - distance / longest length), 0.0 if below threshold"""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    limit = int((1.0 - threshold) * longest)
+    distance = bounded_edit_distance(a, b, limit)
+    return 0.0 if distance > limit else 1.0 - distance / longest
+
+
+def _same_language(tag: Optional[str], lang: str) -> bool:
+    """Whether a MyMemory language tag ('en-GB') is the language code lang ('en', 'zh-cn')"""
+    if not isinstance(tag, str) or not tag:
+        return False
+    return tag.lower().split("-")[0] == lang.lower().split("-")[0]
+
+
+class TranslationMemory:
+    """
+    Fuzzy translation memory shared by every session
+
+    Segments are stored per language pair in SQLite with a MinHash/LSH index over
+    their character trigrams. A lookup hashes the input once, probes BANDS index
+    entries and verifies the few best candidates with a bounded edit distance, so
+    it costs a handful of B-tree lookups whatever the size of the memory.
+
+    Fuzzy matches are only reused below a threshold under 1.0 and when they pass
+    same_meaning(). The memory keeps at most max_segments, dropping the least
+    recently used ones and those unused for ttl_seconds.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_MEMORY_PATH, threshold: float = DEFAULT_THRESHOLD,
+                 max_segments: int = DEFAULT_MAX_SEGMENTS, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Args:
+            db_path: SQLite file (None keeps the memory in RAM)
+            threshold: Minimum edit-distance similarity (0-1) served without a network call
+                (1.0: exact matches only)
+            max_segments: Segments kept, least recently used ones first out
+            ttl_seconds: Segments unused for this long are dropped
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_segments = max_segments
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"exact": 0, "fuzzy": 0, "misses": 0, "added": 0, "evicted": 0}
+        self._writes_since_trim = 0
+        self._used: Dict[int, float] = {}
+        self._conn = self._connect()
+        self._segments = self._conn.execute("SELECT COUNT(*) FROM tm_segments").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, falling back to RAM if the file can't be opened"""
+        if self.db_path:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                return self._init_schema(sqlite3.connect(self.db_path, check_same_thread=False))
+            except (OSError, sqlite3.Error):
+                pass
+        return self._init_schema(sqlite3.connect(":memory:", check_same_thread=False))
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS tm_segments (
+                id INTEGER PRIMARY KEY,
+                pair TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (pair, source)
+            )"""
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tm_segments)")}
+        if "used_at" not in columns:
+            conn.execute("ALTER TABLE tm_segments ADD COLUMN used_at REAL")
+            conn.execute("UPDATE tm_segments SET used_at = updated_at")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tm_segments_used ON tm_segments(used_at)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS tm_bands (
+                band INTEGER NOT NULL,
+                segment_id INTEGER NOT NULL,
+                PRIMARY KEY (band, segment_id)
+            ) WITHOUT ROWID"""
+        )
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _pair(src_lang: str, dest_lang: str) -> str:
+        return f"{src_lang.lower()}|{dest_lang.lower()}"
+
+    def lookup(self, text: str, src_lang: str, dest_lang: str) -> Optional[Dict]:
+        """
+        Find the closest stored segment
+
+        Returns:
+            Dictionary with 'translation', 'score' (similarity, 1.0 for an exact match),
+            'source' (the stored segment) and 'origin', or None below the threshold
+        """
+        source = normalize_text(text)
+        if not source:
+            return None
+        pair = self._pair(src_lang, dest_lang)
+
+        fuzzy = len(source) >= MIN_FUZZY_CHARS and self.threshold < 1.0
+        keys = band_keys(pair, minhash(shingles(source))) if fuzzy else []
+
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT id, target, origin FROM tm_segments WHERE pair = ? AND source = ?",
+                                         (pair, source)).fetchone()
+                if row is not None:
+                    self._stats["exact"] += 1
+                    self._touch(row[0])
+                    return {"translation": row[1], "score": 1.0, "source": source, "origin": row[2]}
+                candidates = self._candidates(pair, keys) if keys else []
+            except sqlite3.Error:
+                candidates = []
+
+        best = None
+        for segment_id, candidate, target, origin in candidates:
+            if not same_meaning(source, candidate):
+                continue
+            score = similarity(source, candidate, self.threshold)
+            if score >= self.threshold and (best is None or score > best["score"]):
+                best = {"id": segment_id, "translation": target, "score": score, "source": candidate,
+                        "origin": origin}
+
+        with self._lock:
+            self._stats["fuzzy" if best is not None else "misses"] += 1
+            if best is not None:
+                try:
+                    self._touch(best.pop("id"))
+                except sqlite3.Error:
+                    pass
+        return best
+
+    def _touch(self, segment_id: int) -> None:
+        """Mark a segment as just used (caller holds the lock); used_at is written in batches"""
+        self._used[segment_id] = time.time()
+        if len(self._used) >= 256:
+            self._flush_used()
+
+    def _flush_used(self) -> None:
+        used, self._used = self._used, {}
+        self._conn.executemany("UPDATE tm_segments SET used_at = ? WHERE id = ?",
+                               [(used_at, segment_id) for segment_id, used_at in used.items()])
+        self._conn.commit()
+
+    def _candidates(self, pair: str, keys: List[int]) -> List[Tuple[int, str, str, str]]:
+        """Segments sharing the most LSH buckets with the query (caller holds the lock)"""
+        hits = Counter()
+        for key in keys:
+            # Crowded buckets (very common phrasings) say little: only their newest rows count
+            hits.update(row[0] for row in self._conn.execute(
+                "SELECT segment_id FROM tm_bands WHERE band = ? ORDER BY segment_id DESC LIMIT ?",
+                (key, MAX_BUCKET_ROWS)))
+        ids = [segment_id for segment_id, _ in hits.most_common(MAX_CANDIDATES)]
+        if not ids:
+            return []
+        # Filtering on pair in SQL would make SQLite scan the (pair, source) index instead
+        rows = {row[0]: (row[0],) + row[2:] for row in self._conn.execute(
+            f"SELECT id, pair, source, target, origin FROM tm_segments WHERE id IN ({','.join('?' * len(ids))})",
+            ids) if row[1] == pair}
+        return [rows[segment_id] for segment_id in ids if segment_id in rows]
+
+    def add(self, text: str, translation: str, src_lang: str, dest_lang: str, origin: str = "pipeline") -> None:
+        """Store a completed translation (replaces the previous translation of the same text)"""
+        self.add_many([(text, translation)], src_lang, dest_lang, origin)
+
+    def add_matches(self, matches: Iterable[Dict], src_lang: str, dest_lang: str) -> int:
+        """
+        Store the translation-memory matches of a MyMemory response
+
+        Matches never replace an existing segment. Low-quality ones, and those whose own
+        'source'/'target' languages are not src_lang/dest_lang (MyMemory also returns
+        matches of other pairs and of the reverse direction), are skipped.
+
+        Returns:
+            Number of matches kept
+        """
+        rows = []
+        for match in matches or ():
+            try:
+                quality = float(match.get("quality") or 0)
+            except (AttributeError, TypeError, ValueError):
+                continue
+            if not (_same_language(match.get("source"), src_lang) and _same_language(match.get("target"), dest_lang)):
+                continue
+            if quality >= MIN_SEED_QUALITY and match.get("segment") and match.get("translation"):
+                rows.append((match["segment"], match["translation"]))
+        return self.add_many(rows, src_lang, dest_lang, origin="mymemory", replace=False)
+
+    def add_many(self, rows: Iterable[Tuple[str, str]], src_lang: str, dest_lang: str,
+                 origin: str = "pipeline", replace: bool = True) -> int:
+        """
+        Store (text, translation) pairs in one transaction
+
+        Args:
+            replace: Overwrite the translation of segments already stored
+
+        Returns:
+            Number of new segments
+        """
+        pair = self._pair(src_lang, dest_lang)
+        now = time.time()
+        prepared = []
+        for text, translation in rows:
+            source = normalize_text(text)
+            if source and translation:
+                prepared.append((source, translation, band_keys(pair, minhash(shingles(source)))))
+
+        added = 0
+        with self._lock:
+            try:
+                for source, translation, keys in prepared:
+                    row = self._conn.execute("SELECT id FROM tm_segments WHERE pair = ? AND source = ?",
+                                             (pair, source)).fetchone()
+                    if row is not None:
+                        if replace:
+                            self._conn.execute(
+                                "UPDATE tm_segments SET target = ?, origin = ?, updated_at = ?, used_at = ? WHERE id = ?",
+                                (translation, origin, now, now, row[0]))
+                        continue
+                    cursor = self._conn.execute(
+                        "INSERT INTO tm_segments (pair, source, target, origin, updated_at, used_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (pair, source, translation, origin, now, now))
+                    self._conn.executemany("INSERT OR IGNORE INTO tm_bands (band, segment_id) VALUES (?, ?)",
+                                           [(key, cursor.lastrowid) for key in keys])
+                    added += 1
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                return 0
+            self._stats["added"] += added
+            self._segments += added
+            self._writes_since_trim += added
+            if self._segments > self.max_segments or self._writes_since_trim >= 256:
+                self._trim(now)
+        return added
+
+    def _trim(self, now: float) -> None:
+        """Drop the segments unused for ttl_seconds, then the least recently used above max_segments"""
+        self._writes_since_trim = 0
+        try:
+            self._flush_used()
+            expired = self._conn.execute("SELECT id, pair, source FROM tm_segments WHERE used_at < ?",
+                                         (now - self.ttl_seconds,)).fetchall()
+            self._delete(expired)
+            self._segments = self._conn.execute("SELECT COUNT(*) FROM tm_segments").fetchone()[0]
+            overflow = self._segments - self.max_segments
+            if overflow > 0:
+                # Evict a little more than needed so that trimming doesn't run on every write
+                oldest = self._conn.execute("SELECT id, pair, source FROM tm_segments ORDER BY used_at LIMIT ?",
+                                            (overflow + self.max_segments // 100,)).fetchall()
+                self._delete(oldest)
+                self._segments -= len(oldest)
+            self._conn.commit()
+        except sqlite3.Error:
+            self._conn.rollback()
+
+    def _delete(self, rows: List[Tuple[int, str, str]]) -> None:
+        """Delete segments and their LSH entries (the band keys are recomputed from the source)"""
+        for segment_id, pair, source in rows:
+            self._conn.executemany("DELETE FROM tm_bands WHERE band = ? AND segment_id = ?",
+                                   [(key, segment_id) for key in band_keys(pair, minhash(shingles(source)))])
+            self._conn.execute("DELETE FROM tm_segments WHERE id = ?", (segment_id,))
+        self._stats["evicted"] += len(rows)
+
+    def stats(self) -> Dict:
+        """Get lookup counters and the number of stored segments"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["segments"] = self._segments
+        return stats
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            try:
+                self._flush_used()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
@@ -0,0 +1,448 @@
+"""
+Translation Pipeline Module for SpeakEasy Translator
+Runs the MyMemory lookup, AI enhancement and AI insight stages concurrently
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ai_enhancement import AIEnhancer
+from .backends import TranslationBackend, create_backend
+from .metrics import METRICS
+from .mymemory_client import MyMemoryClient
+from .rate_limiter import RateLimiter
+from .segmentation import DEFAULT_MAX_BYTES, byte_length, join_segments, split_segments
+from .singleflight import SingleFlight
+from .translation_cache import TranslationCache, make_cache_key
+from .translation_memory import TranslationMemory
+
+# Cache mode used for per-sentence base translations of long inputs
+SEGMENT_MODE = "segment"
+
+# Marks the end of the partial translations of a request
+_DONE = object()
+
+# Lifetime of entries whose AI stages failed: the enhancement is retried soon after
+DEGRADED_TTL_SECONDS = 300
+
+
+class TranslationPipeline:
+    """
+    Concurrent translation pipeline
+
+    The AI insight does not depend on the translation, so it starts right away;
+    the AI enhancement is chained after the base translation. Both AI stages are
+    optional: once their deadline passes the pipeline stops waiting and falls back
+    (base translation / no insight) instead of blocking the UI.
+
+    With `single_call`, enhancement and insight are requested together in one
+    structured completion chained after the base translation (half the OpenAI
+    requests, one shared prompt) instead of two parallel completions.
+
+    Cache misses go through a single-flight layer: identical requests arriving while
+    one is already running (e.g. a whole team translating the same announcement)
+    wait for it and share its result instead of calling MyMemory and OpenAI again.
+
+    With a translation memory, inputs close enough to a segment translated before
+    take its base translation locally instead of calling the backend, and every
+    fetched base translation is added to the memory.
+
+    With a backend that batches natively (`fetch_batch`), prefetch() fetches the
+    base translations of many short texts in a few requests before they are
+    translated one by one.
+    """
+
+    def __init__(self, fetch_translation: Callable, enhance: Optional[Callable] = None,
+                 insight: Optional[Callable] = None, cache: Optional[TranslationCache] = None,
+                 stream_enhance: Optional[Callable] = None, combined: Optional[Callable] = None,
+                 single_call: bool = False, max_workers: int = 8, enhance_timeout: float = 8.0, insight_timeout: float = 8.0,
+                 max_chunk_bytes: int = DEFAULT_MAX_BYTES, segment_concurrency: int = 4,
+                 memory: Optional[TranslationMemory] = None, fetch_batch: Optional[Callable] = None,
+                 batch_size: int = 20, estimate_cost: Optional[Callable] = None):
+        """
+        Args:
+            fetch_translation: fetch_translation(text, src_lang, dest_lang) -> base translation (raises on failure)
+            enhance: enhance(text, translation, src_lang, dest_lang, mode) -> improved translation
+            insight: insight(text, src_lang, dest_lang, mode) -> cultural insight or None
+            cache: Optional shared translation cache
+            stream_enhance: stream_enhance(text, translation, src_lang, dest_lang, mode, deadline) -> iterator
+                of partial enhanced translations, the last one being final (raises past the deadline)
+            combined: combined(text, translation, src_lang, dest_lang, mode) -> {'translation', 'insight'}
+            single_call: Use `combined` instead of separate enhance/insight calls (when not streaming)
+            max_workers: Size of the thread pool running the AI stages
+            enhance_timeout: Seconds to wait for the enhancement once the base translation is ready
+            insight_timeout: Seconds to wait for the insight, counted from the start of the request
+            max_chunk_bytes: Inputs larger than this (UTF-8) are split into sentences before translation
+            segment_concurrency: Maximum number of sentences translated at the same time
+            memory: Optional fuzzy translation memory consulted before the backend
+            fetch_batch: Optional fetch_batch(texts, src_lang, dest_lang) -> base translations in one
+                request (raises on failure), used by prefetch()
+            batch_size: Maximum number of texts per fetch_batch request
+            estimate_cost: Optional estimate_cost(texts) -> what fetching their base translations
+                costs (see TranslationBackend.cost), used for pre-flight estimates
+        """
+        self.fetch_translation = fetch_translation
+        self.enhance = enhance
+        self.insight = insight
+        self.cache = cache
+        self.stream_enhance = stream_enhance
+        self.combined = combined
+        self.single_call = single_call
+        self.enhance_timeout = enhance_timeout
+        self.insight_timeout = insight_timeout
+        self.max_chunk_bytes = max_chunk_bytes
+        self.memory = memory
+        self.fetch_batch = fetch_batch
+        self.batch_size = batch_size
+        self.estimate_cost = estimate_cost
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speakeasy-pipeline")
+        # Separate pool so that sentence fetches never wait behind the AI stages
+        self._segment_executor = ThreadPoolExecutor(max_workers=segment_concurrency,
+                                                    thread_name_prefix="speakeasy-segment")
+        # Requests with progress updates run here while their caller relays the partials
+        self._request_executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                    thread_name_prefix="speakeasy-request")
+        self._flight = SingleFlight()
+
+    def translate(self, text: str, src_lang: str, dest_lang: str, mode: str, ai_enabled: bool = True,
+                  on_partial: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Translate text through the cache and the concurrent stages
+
+        Args:
+            on_partial: If given, called from the calling thread with the base translation as soon
+                as it is ready, then with the enhanced translation as it streams in
+
+        Returns:
+            Dictionary with 'base', 'translation', 'insight', 'memory_match' (similarity of the
+            translation-memory segment the base came from, None if fetched), 'cached',
+            'coalesced' (result shared with an identical concurrent request) and 'timed_out'
+            (names of the AI stages that missed their deadline)
+        """
+        if self.cache is not None:
+            with METRICS.span("cache_lookup"):
+                cached = self.cache.get(text, src_lang, dest_lang, mode)
+            # An entry computed without AI is ignored once AI is available
+            if cached is not None and (cached.get("ai") or not ai_enabled):
+                METRICS.inc("speakeasy_cache_requests_total", result="hit")
+                cached.update(cached=True, coalesced=False, timed_out=[])
+                return cached
+            METRICS.inc("speakeasy_cache_requests_total", result="miss")
+        else:
+            cached = None
+
+        # Retrying the AI stages of an entry that has none reuses its base translation
+        known_base = (cached["base"], cached.get("memory_match")) if cached and cached.get("base") else None
+        key = (make_cache_key(text, src_lang, dest_lang, mode), ai_enabled)
+        if on_partial is None:
+            entry, shared = self._flight.do(key, self._translate_uncached, text, src_lang, dest_lang, mode,
+                                            ai_enabled, None, known_base)
+        else:
+            entry, shared = self._translate_with_progress(key, text, src_lang, dest_lang, mode,
+                                                          ai_enabled, on_partial, known_base)
+        if shared:
+            METRICS.inc("speakeasy_coalesced_requests_total")
+        # Every caller gets its own copy of the shared entry
+        entry = dict(entry, coalesced=shared, timed_out=list(entry["timed_out"]))
+        return entry
+
+    @property
+    def batching(self) -> bool:
+        """Whether prefetch() batches requests (a batching backend and a cache to keep the results)"""
+        return self.fetch_batch is not None and self.cache is not None
+
+    def prefetch(self, texts: List[str], src_lang: str, dest_lang: str, mode: str) -> int:
+        """
+        Fetch the base translations of several texts in batched backend requests
+
+        Texts neither cached nor in the translation memory are sent together (at most
+        `batch_size` texts and `max_chunk_bytes` per request) and cached without AI,
+        so that the following translate() calls only run the AI stages, if enabled.
+        Texts of a failed request are left to translate(), which fetches them one by one.
+
+        Returns:
+            Number of texts fetched
+        """
+        if not self.batching:
+            return 0
+        missing = []
+        for text in dict.fromkeys(texts):
+            # Long inputs are split into sentences by translate() itself
+            if not text.strip() or byte_length(text) > self.max_chunk_bytes:
+                continue
+            if self.cache.get(text, src_lang, dest_lang, mode) is not None:
+                continue
+            if self.memory is not None and self.memory.lookup(text, src_lang, dest_lang) is not None:
+                continue
+            missing.append(text)
+
+        batches, size = [], 0
+        for text in missing:
+            if not batches or len(batches[-1]) >= self.batch_size or size + byte_length(text) > self.max_chunk_bytes:
+                batches.append([])
+                size = 0
+            batches[-1].append(text)
+            size += byte_length(text)
+
+        fetched = 0
+        for batch in batches:
+            try:
+                with METRICS.span("batch_fetch"):
+                    translations = self.fetch_batch(batch, src_lang, dest_lang)
+            except Exception:
+                continue
+            for text, translation in zip(batch, translations):
+                if self.memory is not None:
+                    self.memory.add(text, translation, src_lang, dest_lang)
+                self.cache.set(text, src_lang, dest_lang, mode, {"base": translation, "translation": translation,
+                                                                 "insight": None, "ai": False, "memory_match": None})
+            fetched += len(batch)
+        return fetched
+
+    def _translate_with_progress(self, key, text: str, src_lang: str, dest_lang: str, mode: str,
+                                 ai_enabled: bool, on_partial: Callable[[str], None],
+                                 known_base: Optional[Tuple[str, Optional[float]]]) -> Tuple[Dict, bool]:
+        """
+        Run the shared call in a worker thread and relay its partials from the calling thread
+
+        on_partial (typically Streamlit calls) never runs inside the single-flight call: if
+        it raises (e.g. the session is stopped or rerun), only this caller gives up, and
+        the translation still completes for the requests sharing it.
+        """
+        partials = queue.Queue()
+        future = self._submit(self._request_executor, self._flight.do, key, self._translate_uncached,
+                              text, src_lang, dest_lang, mode, ai_enabled, partials.put, known_base)
+        future.add_done_callback(lambda _future: partials.put(_DONE))
+        for partial in iter(partials.get, _DONE):
+            on_partial(partial)
+        return future.result()
+
+    def _translate_uncached(self, text: str, src_lang: str, dest_lang: str, mode: str, ai_enabled: bool,
+                            on_partial: Optional[Callable[[str], None]],
+                            known_base: Optional[Tuple[str, Optional[float]]] = None) -> Dict:
+        """
+        Run the stages for a cache miss (only the single-flight leader gets here)
+
+        on_partial only hands the partials over (a queue drained by the calling thread).
+        known_base is a (base, memory_match) pair already cached without AI.
+
+        The entry is marked 'ai' only when the enhancement succeeded. When the AI stages
+        were wanted but failed, it is cached for DEGRADED_TTL_SECONDS only.
+        """
+        streaming = on_partial is not None and self.stream_enhance is not None
+        use_combined = ai_enabled and self.single_call and self.combined is not None and not streaming
+
+        started = time.monotonic()
+        pending = {}
+        if ai_enabled and not use_combined and self.insight is not None:
+            pending["insight"] = self._submit(self._executor, METRICS.timed("insight", self.insight),
+                                              text, src_lang, dest_lang, mode)
+
+        if known_base is not None:
+            base, memory_match = known_base
+        else:
+            with METRICS.span("base_translation"):
+                base, memory_match = self._base_translation(text, src_lang, dest_lang)
+        if on_partial is not None:
+            on_partial(base)
+
+        timed_out, failed = [], []
+        translation = base
+        ai_insight = None
+        enhanced = False
+        if use_combined:
+            pending["combined"] = self._submit(self._executor, METRICS.timed("combined", self.combined),
+                                               text, base, src_lang, dest_lang, mode)
+            combined = self._result(pending["combined"], self.enhance_timeout, {}, "combined", timed_out, failed)
+            enhanced = bool(combined.get("translation"))
+            translation = combined.get("translation") or base
+            ai_insight = combined.get("insight")
+        elif ai_enabled and streaming:
+            with METRICS.span("stream_enhance"):
+                try:
+                    # Bounded like the non-streamed enhancement, whose fallback is the base translation
+                    for partial in self.stream_enhance(text, base, src_lang, dest_lang, mode,
+                                                       deadline=self.enhance_timeout):
+                        translation = partial
+                        on_partial(partial)
+                    enhanced = True
+                except Exception:
+                    # A partial enhancement is worse than the complete base translation
+                    failed.append("stream_enhance")
+                    translation = base
+                    on_partial(base)
+        elif ai_enabled and self.enhance is not None:
+            pending["translation"] = self._submit(self._executor, METRICS.timed("enhance", self.enhance),
+                                                  text, base, src_lang, dest_lang, mode)
+            translation = self._result(pending["translation"], self.enhance_timeout, base, "enhance",
+                                       timed_out, failed)
+            enhanced = "enhance" not in timed_out and "enhance" not in failed
+        if "insight" in pending:
+            insight_deadline = max(0.0, self.insight_timeout - (time.monotonic() - started))
+            ai_insight = self._result(pending["insight"], insight_deadline, None, "insight", timed_out, failed)
+
+        entry = {"base": base, "translation": translation, "insight": ai_insight, "ai": enhanced,
+                 "memory_match": memory_match}
+        # A fuzzy memory match is reused on each lookup, never frozen in the cache under this text
+        fuzzy = memory_match is not None and memory_match < 1.0
+        if self.cache is not None and not fuzzy:
+            if timed_out:
+                self._store_late(text, src_lang, dest_lang, mode, dict(entry), pending)
+            elif enhanced or not ai_enabled:
+                self.cache.set(text, src_lang, dest_lang, mode, entry)
+            else:
+                self.cache.set(text, src_lang, dest_lang, mode, entry, ttl_seconds=DEGRADED_TTL_SECONDS)
+
+        entry.update(cached=False, timed_out=timed_out)
+        return entry
+
+    def _base_translation(self, text: str, src_lang: str, dest_lang: str) -> Tuple[str, Optional[float]]:
+        """
+        Fetch the base translation, splitting long inputs into sentences translated in parallel
+
+        Returns:
+            The base translation and its translation-memory score (None unless served from
+            the memory; for long inputs, the lowest score among their memory-served sentences)
+        """
+        if byte_length(text) <= self.max_chunk_bytes:
+            return self._fetch_base(text, src_lang, dest_lang)
+
+        pieces = split_segments(text, self.max_chunk_bytes)
+        futures = [
+            self._submit(self._segment_executor, self._translate_segment, piece, src_lang, dest_lang) if translatable else None
+            for piece, translatable in pieces
+        ]
+        results = [future.result() if future is not None else (piece, None) for future, (piece, _) in zip(futures, pieces)]
+        scores = [score for _, score in results if score is not None]
+        return join_segments([
+            (translation, translatable) for (translation, _), (_, translatable) in zip(results, pieces)
+        ]), min(scores) if scores else None
+
+    def _fetch_base(self, text: str, src_lang: str, dest_lang: str) -> Tuple[str, Optional[float]]:
+        """Take the base translation from the translation memory, else from the backend"""
+        if self.memory is None:
+            return self.fetch_translation(text, src_lang, dest_lang), None
+
+        with METRICS.span("memory_lookup"):
+            match = self.memory.lookup(text, src_lang, dest_lang)
+        if match is not None:
+            METRICS.inc("speakeasy_memory_requests_total", result="exact" if match["score"] >= 1.0 else "fuzzy")
+            return match["translation"], match["score"]
+        METRICS.inc("speakeasy_memory_requests_total", result="miss")
+
+        translation = self.fetch_translation(text, src_lang, dest_lang)
+        self.memory.add(text, translation, src_lang, dest_lang)
+        return translation, None
+
+    def _translate_segment(self, segment: str, src_lang: str, dest_lang: str) -> Tuple[str, Optional[float]]:
+        """Translate one sentence, going through the cache on its own"""
+        if self.cache is not None:
+            cached = self.cache.get(segment, src_lang, dest_lang, SEGMENT_MODE)
+            if cached is not None:
+                return cached["base"], None
+        # Long documents often repeat sentences; concurrent copies share one fetch
+        (translation, score), _ = self._flight.do(make_cache_key(segment, src_lang, dest_lang, SEGMENT_MODE),
+                                                  self._fetch_base, segment, src_lang, dest_lang)
+        if self.cache is not None and (score is None or score >= 1.0):
+            self.cache.set(segment, src_lang, dest_lang, SEGMENT_MODE, {"base": translation})
+        return translation, score
+
+    @staticmethod
+    def _submit(executor: ThreadPoolExecutor, fn: Callable, *args):
+        """Submit a stage, carrying over the caller's context (e.g. its rate-limit priority)"""
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
+    @staticmethod
+    def _result(future, timeout: float, fallback, stage: str, timed_out: list, failed: list):
+        """Wait for an optional stage, falling back on timeout, error or a None result (failure)"""
+        if future is None:
+            return fallback
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            timed_out.append(stage)
+            return fallback
+        except Exception:
+            failed.append(stage)
+            return fallback
+        if result is None:
+            failed.append(stage)
+            return fallback
+        return result
+
+    def _store_late(self, text, src_lang, dest_lang, mode, entry, pending):
+        """Cache the complete entry once the slow stages have finished in the background"""
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def on_done(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            for key, future in pending.items():
+                if future.exception() is not None or future.result() is None:
+                    continue
+                if key == "combined":
+                    entry.update({k: v for k, v in future.result().items() if v})
+                else:
+                    entry[key] = future.result()
+                if key == "translation" or (key == "combined" and future.result().get("translation")):
+                    entry["ai"] = True
+            self.cache.set(text, src_lang, dest_lang, mode, entry,
+                           ttl_seconds=None if entry["ai"] else DEGRADED_TTL_SECONDS)
+
+        for future in pending.values():
+            future.add_done_callback(on_done)
+
+    def coalescing_stats(self) -> Dict:
+        """Get single-flight counters ('calls', 'executions', 'shared', 'in_flight')"""
+        return self._flight.stats()
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
+        self._segment_executor.shutdown(wait=False)
+        self._request_executor.shutdown(wait=False)
+
+
+def create_pipeline(client: Optional[MyMemoryClient] = None, enhancer: Optional[AIEnhancer] = None,
+                    cache: Optional[TranslationCache] = None, limiter: Optional[RateLimiter] = None,
+                    backend: Optional[TranslationBackend] = None, memory: Optional[TranslationMemory] = None,
+                    **kwargs) -> TranslationPipeline:
+    """
+    Build a pipeline wired to a translation backend and OpenAI
+
+    Args:
+        client: MyMemory client (a new one is created if omitted)
+        enhancer: AI enhancer (built from OPENAI_API_KEY if omitted)
+        cache: Optional shared translation cache
+        limiter: Optional rate limiter for the client and enhancer created here
+        backend: Base translation backend (default: SPEAKEASY_BACKEND, then MyMemory)
+        memory: Optional translation memory, also seeded with the MyMemory matches
+        **kwargs: Extra TranslationPipeline options (timeouts, concurrency)
+    """
+    client = client if client is not None else MyMemoryClient(limiter=limiter)
+    enhancer = enhancer if enhancer is not None else AIEnhancer(limiter=limiter)
+    backend = backend if backend is not None else create_backend(client=client, enhancer=enhancer, memory=memory)
+    capabilities = backend.capabilities()
+    # Long inputs are cut to what the backend accepts in one request
+    kwargs.setdefault("max_chunk_bytes", capabilities["max_bytes"])
+    kwargs.setdefault("estimate_cost", backend.cost)
+    if capabilities["batch"]:
+        kwargs.setdefault("fetch_batch", backend.translate_batch)
+        kwargs.setdefault("batch_size", capabilities["max_batch"])
+    return TranslationPipeline(
+        backend.translate,
+        enhance=enhancer.enhance_translation,
+        insight=enhancer.cultural_insight,
+        cache=cache,
+        stream_enhance=enhancer.stream_enhancement,
+        combined=enhancer.enhance_with_insight,
+        memory=memory,
+        **kwargs
+    )